@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+#   Copyright (C) 2024 Rocky Bernstein <rocky@gnu.org>
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Measure what turning on each debugger event costs.
+
+A fixed set of Mathics3 workloads is timed with every event in
+TraceEventNames turned on in each of these modes:
+
+  off      no events; the pristine FunctionApplyRule.apply_function
+           (EVALUATION_APPLY) and no hooks. This is the baseline.
+  trace    TraceActivate[event -> True]: print each event.
+  filtered DebugActivate[event -> {"NoSuch`Name"}]: debug with a
+           filter that nothing matches, so we never stop.
+  shadowstack
+           like "filtered", but with "set shadowstack on", so the hooks
+           also keep the Mathics3 evaluation stack.
+  record   like "filtered", but with "set record on", so the hooks also
+           record evaluation events for the reverse-step commands.
+
+The filter is a Symbol name, so for "parse", whose filters are file
+names, it matches nothing too.
+
+For each workload, event and mode we report the best time of the
+runs, and the slowdown relative to "off".
+
+Usage:
+
+    python benchmarks/event_overhead.py [--repeat N] [--json FILE]
+        [--compare OLD.json] [--workload NAME ...] [--event NAME ...]
+        [--mode NAME ...]
+
+--json saves the results, along with the git commit they are for, and
+--compare shows how the slowdowns changed from a saved run.
+
+Debugger output is collected and thrown away, so it is in the timings
+but not on the terminal. Should something stop in the debugger anyway,
+it continues right away; the number of stops is reported.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os.path as osp
+import platform
+import subprocess
+import tempfile
+from datetime import datetime
+from time import perf_counter
+from typing import Dict, List, Optional
+
+MODES = ("off", "trace", "filtered", "shadowstack", "record")
+
+# An event filter that nothing matches.
+NO_MATCH = '{"NoSuch`Name"}'
+
+# Number of definitions in the package that the "Get" workload reads.
+PACKAGE_SIZE = 300
+
+# Workload name -> Mathics3 code. "{package}" is replaced by the path
+# of a generated package file.
+WORKLOADS: Dict[str, str] = {
+    "integrate": "Integrate[x^2 Sin[x] + 1/(1+x^2), x]",
+    "lists": (
+        "Total[Sort[Table[Mod[i^2, 7919], {i, 1, 200}]]]"
+        " + Length[Union[Flatten[Table[{i, j}, {i, 12}, {j, 12}]]]]"
+    ),
+    "rewriting": "Nest[# /. {a[n_] :> b[n + 1], b[n_] :> a[n]} &, a[0], 300]",
+    "mpmath": "N[Table[Gamma[k/3] + Zeta[k + 1/2], {k, 1, 20}], 30]",
+    "get": 'Get["{package}"]',
+}
+
+
+def write_package(dirname: str) -> str:
+    """Write a Mathics3 package with PACKAGE_SIZE definitions in
+    directory ``dirname`` and return its path."""
+    path = osp.join(dirname, "overhead_package.m")
+    with open(path, "w") as f:
+        f.write('BeginPackage["OverheadPackage`"]\n')
+        for i in range(PACKAGE_SIZE):
+            f.write(f"pkgF{i}[x_] := x^2 + {i} x - 1\n")
+            f.write(f"pkgG{i} = pkgF{i}[{i % 7}]\n")
+        f.write("EndPackage[]\n")
+    return path
+
+
+def git_commit() -> Optional[str]:
+    """Return the commit that the source tree is at, if we can tell."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=osp.dirname(osp.abspath(__file__)),
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Bench:
+    """A Mathics3 session with the debugger loaded, in which workloads
+    are timed under the different event modes."""
+
+    def __init__(self, package_path: str):
+        from mathics.session import MathicsSession
+
+        from mathics.core.rules import FunctionApplyRule
+
+        from pymathics.trepan.__main__ import EVALUATION_APPLY
+        from pymathics.trepan.batch import BatchInterface
+        from pymathics.trepan.lib import recorder, shadow_stack
+        from pymathics.trepan.tracing import get_debugger
+
+        self.package_path = package_path
+        self.session = MathicsSession()
+        self.session.evaluate('LoadModule["pymathics.trepan"]')
+        self.shadow_stack = shadow_stack
+        self.recorder = recorder
+        self.function_apply_rule = FunctionApplyRule
+        self.evaluation_apply = EVALUATION_APPLY
+
+        dbg = get_debugger()
+        dbg.settings["highlight"] = "plain"
+        dbg.settings["style"] = None
+        self.intf = BatchInterface()
+        dbg.intf[:] = [self.intf]
+
+        # Should we stop anyway, count it and go on.
+        self.stops = 0
+        processor = dbg.core.processor
+
+        def process_commands():
+            self.stops += 1
+            self.intf.take_output()
+
+        processor.process_commands = process_commands
+
+    def set_mode(self, event: str, mode: str):
+        if mode == "off":
+            return
+        if mode == "trace":
+            self.session.evaluate(f"TraceActivate[{event}->True, Prewarm->False]")
+        else:
+            self.session.evaluate(
+                f"DebugActivate[{event}->{NO_MATCH}, Prewarm->False]"
+            )
+        self.shadow_stack.enabled = mode == "shadowstack"
+        if mode == "record":
+            self.recorder.clear()
+        self.recorder.enabled = mode == "record"
+
+    def reset_mode(self):
+        # Evaluating DebugActivate[] goes through the apply hook, so
+        # if that is what is broken, it has to be put back first.
+        self.function_apply_rule.apply_function = self.evaluation_apply
+        self.shadow_stack.enabled = False
+        self.shadow_stack.clear()
+        self.recorder.enabled = False
+        self.recorder.clear()
+        self.session.evaluate("TraceActivate[Prewarm->False]")
+        self.session.evaluate("DebugActivate[Prewarm->False]")
+        self.intf.take_output()
+
+    def time_workload(self, workload: str, event: str, mode: str, repeat: int):
+        """Return the best time in seconds over ``repeat`` runs of
+        ``workload`` with ``event`` in ``mode``, and the number of times
+        we stopped."""
+        code = WORKLOADS[workload].replace("{package}", self.package_path)
+        self.stops = 0
+        times = []
+        # Some events print with print() rather than through the
+        # debugger interface. Turning "parse" tracing off is itself
+        # parsed, so that is kept off the terminal too.
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(repeat):
+                self.set_mode(event, mode)
+                try:
+                    start = perf_counter()
+                    self.session.evaluate(code)
+                    times.append(perf_counter() - start)
+                finally:
+                    self.reset_mode()
+        return min(times), self.stops
+
+
+def run(args) -> dict:
+    from pymathics.trepan.tracing import TraceEventNames
+
+    events = args.event or [name for name in TraceEventNames if name != "Debugger"]
+    modes = args.mode or [mode for mode in MODES if mode != "off"]
+    workloads = args.workload or list(WORKLOADS)
+
+    results: List[dict] = []
+    baseline: Dict[str, float] = {}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        bench = Bench(write_package(tmpdir))
+        for workload in workloads:
+            # Warm up caches, e.g. SymPy's, before the baseline run.
+            bench.time_workload(workload, "evaluation", "off", 1)
+            baseline[workload], _ = bench.time_workload(
+                workload, "evaluation", "off", args.repeat
+            )
+            print(f"{workload}: off {baseline[workload] * 1000:.1f} ms")
+            for event in events:
+                for mode in modes:
+                    entry = {"workload": workload, "event": event, "mode": mode}
+                    try:
+                        seconds, stops = bench.time_workload(
+                            workload, event, mode, args.repeat
+                        )
+                    except Exception as e:
+                        entry["error"] = f"{type(e).__name__}: {e}"
+                        print(f"  {event:12} {mode:11} error: {entry['error']}")
+                    else:
+                        entry["seconds"] = seconds
+                        entry["slowdown"] = seconds / baseline[workload]
+                        entry["stops"] = stops
+                        print(
+                            f"  {event:12} {mode:11} {seconds * 1000:9.1f} ms"
+                            f" {entry['slowdown']:7.2f}x"
+                            + (f"  ({stops} stops)" if stops else "")
+                        )
+                    results.append(entry)
+
+    return {
+        "commit": git_commit(),
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "repeat": args.repeat,
+        "baseline": baseline,
+        "results": results,
+    }
+
+
+def compare(old: dict, new: dict):
+    """Show how the slowdowns in ``new`` changed from those in ``old``."""
+    old_slowdowns = {
+        (r["workload"], r["event"], r["mode"]): r["slowdown"]
+        for r in old["results"]
+        if "slowdown" in r
+    }
+    print(f"\nslowdown at {old.get('commit')} -> {new.get('commit')}:")
+    for r in new["results"]:
+        key = (r["workload"], r["event"], r["mode"])
+        if "slowdown" not in r or key not in old_slowdowns:
+            continue
+        before, after = old_slowdowns[key], r["slowdown"]
+        change = (after - before) / before * 100
+        print(
+            f"  {key[0]:10} {key[1]:12} {key[2]:11}"
+            f" {before:7.2f}x -> {after:7.2f}x  {change:+6.1f}%"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement")
+    parser.add_argument("--json", metavar="FILE", help="save the results here")
+    parser.add_argument(
+        "--compare", metavar="FILE", help="compare with results saved earlier"
+    )
+    parser.add_argument(
+        "--workload", action="append", choices=list(WORKLOADS), help="workload to run"
+    )
+    parser.add_argument("--event", action="append", help="event to measure")
+    parser.add_argument(
+        "--mode", action="append", choices=MODES[1:], help="mode to measure"
+    )
+    args = parser.parse_args()
+
+    # Read this first, so that a bad file doesn't waste a run.
+    old = None
+    if args.compare:
+        with open(args.compare) as f:
+            old = json.load(f)
+
+    new = run(args)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(new, f, indent=1)
+            f.write("\n")
+    if old is not None:
+        compare(old, new)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+#   Copyright (C) 2024 Rocky Bernstein <rocky@gnu.org>
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Check that LoadModule["pymathics.trepan"] stays cheap.
+
+Loading the module should register the builtins and little else. The
+debugger, pygments and terminal detection are imported when the
+first event fires. In a fresh process with Mathics3 already loaded, we
+time LoadModule["pymathics.trepan"] and look at what it imported.
+
+The exit code is nonzero if the load takes longer than the budget or
+any of the packages in DEFERRED_PACKAGES got imported.
+
+Usage:
+
+    python benchmarks/import_time.py [--budget MILLISECONDS] [--runs N]
+"""
+
+import argparse
+import subprocess
+import sys
+
+# Packages that should not be imported until an event fires.
+DEFERRED_PACKAGES = (
+    "mathics_pygments",
+    "prompt_toolkit",
+    "pygments",
+    "term_background",
+    "trepan",
+    "xdis",
+)
+
+# Default budget for LoadModule["pymathics.trepan"], in milliseconds.
+# It is set well above what we measure so that it only trips on a real
+# regression, such as one of DEFERRED_PACKAGES coming back.
+DEFAULT_BUDGET_MS = 50.0
+
+RESULT_PREFIX = "load: "
+
+
+def measure_one_load():
+    """Run inside the child process. Print the load time in seconds and
+    the deferred packages that were imported."""
+    from time import perf_counter
+
+    from mathics.session import MathicsSession
+
+    session = MathicsSession()
+    before = set(sys.modules)
+    start = perf_counter()
+    session.evaluate('LoadModule["pymathics.trepan"]')
+    elapsed = perf_counter() - start
+    imported = {name.split(".")[0] for name in set(sys.modules) - before}
+    offenders = sorted(imported.intersection(DEFERRED_PACKAGES))
+    print(f"{RESULT_PREFIX}{elapsed} {','.join(offenders)}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=DEFAULT_BUDGET_MS,
+        help="maximum milliseconds allowed",
+    )
+    parser.add_argument("--runs", type=int, default=3, help="number of runs")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        measure_one_load()
+        return 0
+
+    times = []
+    offenders = set()
+    for _ in range(args.runs):
+        output = subprocess.run(
+            [sys.executable, __file__, "--child"],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        for line in output.splitlines():
+            if line.startswith(RESULT_PREFIX):
+                fields = line[len(RESULT_PREFIX) :].split(" ")
+                times.append(float(fields[0]) * 1000)
+                if len(fields) > 1 and fields[1]:
+                    offenders.update(fields[1].split(","))
+
+    best = min(times)
+    print(
+        f'LoadModule["pymathics.trepan"]: best of {args.runs} runs {best:.1f} ms, '
+        f"budget {args.budget:.1f} ms"
+    )
+    status = 0
+    if offenders:
+        print(f"imported too early: {', '.join(sorted(offenders))}")
+        status = 1
+    if best > args.budget:
+        print("over budget")
+        status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+#   Copyright (C) 2024 Rocky Bernstein <rocky@gnu.org>
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Measure how long it takes from the first debugger event to the
+debugger prompt.
+
+Each run is a fresh Python process, so that nothing the debugger
+imports has been imported before. In a run we activate debugging of
+"Plus" evaluations, evaluate 1 + 2, and measure the time from
+the start of that evaluation until the command processor asks for
+its first command. Instead of reading a command, we continue.
+
+Usage:
+
+    python benchmarks/startup.py [--runs N] [--eager] [--prewarm SECONDS]
+
+--eager ignores the command manifest, and so imports every debugger
+command up front the way it was done before commands were loaded
+lazily.
+
+--prewarm activates debugging with Prewarm -> True and waits SECONDS
+before evaluating, to see what is left over once the debugger has been
+built in the background. Without it, Prewarm -> False is used.
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+from time import perf_counter, sleep
+from typing import Optional
+
+# The child process prints other things, e.g. when the debugger exits.
+RESULT_PREFIX = "seconds to prompt: "
+
+
+def time_one_run(eager: bool, prewarm: Optional[float]) -> float:
+    """Run inside the child process. Return the number of seconds from
+    the first event to the prompt."""
+    from mathics.session import MathicsSession
+
+    session = MathicsSession()
+    session.evaluate('LoadModule["pymathics.trepan"]')
+
+    from pymathics.trepan.processor import cmdproc
+
+    if eager:
+        cmdproc.read_manifest = lambda modules: None
+
+    prompt_times = []
+
+    def process_command(self):
+        if not prompt_times:
+            prompt_times.append(perf_counter())
+        return True
+
+    cmdproc.CommandProcessor.process_command = process_command
+
+    prewarm_option = "True" if prewarm is not None else "False"
+    session.evaluate(
+        f'DebugActivate[evaluation->{{"System`Plus"}}, Prewarm->{prewarm_option}]'
+    )
+    if prewarm is not None:
+        sleep(prewarm)
+    start = perf_counter()
+    session.evaluate("1 + 2")
+    return prompt_times[0] - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="number of runs")
+    parser.add_argument(
+        "--eager", action="store_true", help="load all commands at startup"
+    )
+    parser.add_argument(
+        "--prewarm",
+        type=float,
+        metavar="SECONDS",
+        help="build the debugger in the background and wait this long",
+    )
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(f"{RESULT_PREFIX}{time_one_run(args.eager, args.prewarm)}")
+        return
+
+    child_args = [sys.executable, __file__, "--child"]
+    if args.eager:
+        child_args.append("--eager")
+    if args.prewarm is not None:
+        child_args += ["--prewarm", str(args.prewarm)]
+    times = []
+    for _ in range(args.runs):
+        output = subprocess.run(
+            child_args, check=True, capture_output=True, text=True
+        ).stdout
+        for line in output.splitlines():
+            if line.startswith(RESULT_PREFIX):
+                times.append(float(line[len(RESULT_PREFIX) :]))
+
+    print(
+        f"first event to prompt over {args.runs} runs: "
+        f"min {min(times) * 1000:.1f} ms, "
+        f"median {statistics.median(times) * 1000:.1f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
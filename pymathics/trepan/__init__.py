@@ -8,7 +8,15 @@ This debugger is based on the gdb-like <i>trepan</i> series of debuggers, <url>:
 in particular.
 """
 
-from pymathics.trepan.__main__ import DebugActivate, Debugger, TraceActivate
+from pymathics.trepan.__main__ import (
+    DebugActivate,
+    Debugger,
+    DebugPostMortem,
+    DebugProfile,
+    DebugServer,
+    DebugStackDump,
+    TraceActivate,
+)
 from pymathics.trepan.version import __version__
 
 pymathics_version_data = {
@@ -23,6 +31,10 @@ pymathics_version_data = {
 __all__ = [
     "DebugActivate",
     "Debugger",
+    "DebugPostMortem",
+    "DebugProfile",
+    "DebugServer",
+    "DebugStackDump",
     "TraceActivate",
     "pymathics_version_data",
 ]
@@ -11,13 +11,21 @@ import mathics.core.parser
 import mathics.eval.files_io.files as io_files
 import mathics.eval.tracing as tracing
 
-from mathics.core.atoms import String
+from mathics.core.atoms import Integer, Real, String
 from mathics.core.builtin import Builtin
 from mathics.core.evaluation import Evaluation
 from mathics.core.list import ListExpression
 from mathics.core.rules import FunctionApplyRule
-from mathics.core.symbols import SymbolFalse, SymbolTrue
+from mathics.core.symbols import (
+    Symbol,
+    SymbolFalse,
+    SymbolNull,
+    SymbolTrue,
+)
+from mathics.core.systemsymbols import SymbolAll, SymbolInfinity, SymbolNone
 
+from pymathics.trepan.lib import eval_functions, numpy_calls, parse_stats, scope
+from pymathics.trepan.lib.watchdog import watchdog
 from pymathics.trepan.tracing import (
     TraceEventNames,
     # apply_builtin_box_fn_traced,
@@ -25,11 +33,24 @@ from pymathics.trepan.tracing import (
     apply_builtin_fn_traced,
     call_event_debug,
     call_event_get,
+    call_event_print,
     call_trepan3k,
+    debug_eval_function,
     debug_evaluate,
+    debug_numpy_call,
+    debug_parse,
     event_filters,
+    flush_trace_repeats,
+    get_debugger,
     pre_evaluation_debugger_hook,
+    prewarm_debugger,
+    print_get_line,
+    reset_event_counts,
+    return_event_print,
+    trace_eval_function,
     trace_evaluate,
+    trace_numpy_call,
+    trace_parse,
 )
 
 from typing import Dict, Optional, Tuple
@@ -70,22 +91,46 @@ class DebugActivate(Builtin):
     $options$ include:
     <ul>
       <li>'Get':  debug Get[] calls, with Trace->True set
-      <li>'NumPy':  debug NumPy calls
+      <li>'Numpy':  debug NumPy calls made by Mathics3 modules loaded \
+      at the time; activate it again to take in modules loaded since
       <li>'SymPy': debug SymPy calls
       <li>'mpmath': debug mpmath calls
+      <li>'evalFunction': debug calls to eval_Xxx() functions of mathics.eval
+      <li>'parse': stop after each parse of Mathics3 input; a list of \
+      file names stops only after parses of input read from those files
       <li>'apply'; debug function apply calls that are <i>not</i> boxing routines
       <li>'applyBox'; debug function apply calls that <i>are</i> boxing routines
     </ul>
 
+    When some event is activated and 'Prewarm' is 'True', the default, the \
+    debugger is set up in a background thread so that it is ready by the \
+    time the first event fires.
+
+    'Timeout' -> $seconds$ enters the debugger when a top-level query has \
+    been evaluating for more than $seconds$, at the next expression it \
+    evaluates. With 'TimeoutDump' -> $file$, the Mathics3 stack of every \
+    thread is appended to $file$ instead, and evaluation goes on. Nothing \
+    is traced before a query goes over its time.
+
     >> DebugActivate[SymPy -> True]
      = ...
+
+    X> DebugActivate[Timeout -> 30, TimeoutDump -> "/tmp/stacks.log"]
+     = ...
     """
 
     messages = {
         "opttname": "mpmath name `1` is not a String",
         "opttype": "mpmath option `1` should be a boolean or a list",
+        "opttime": "Timeout `1` should be a positive number or Infinity",
+        "optdump": "TimeoutDump `1` should be a String or None",
+    }
+    options = {
+        **EVENT_OPTIONS,
+        "Prewarm": "True",
+        "Timeout": "Infinity",
+        "TimeoutDump": "None",
     }
-    options = EVENT_OPTIONS
     summary_text = """set events to go into the Mathics3 Debugger REPL"""
 
     # The function below should start with "eval"
@@ -125,6 +170,7 @@ class DebugActivate(Builtin):
                 evaluation.message("DebugActivate", "opttype", option)
                 return None, False
 
+        some_event_is_debugged = False
         for event_name in TraceEventNames:
             if event_name == "Debugger":
                 continue
@@ -141,6 +187,7 @@ class DebugActivate(Builtin):
                 option, (ListExpression, String)
             )
             if event_is_debugged:
+                some_event_is_debugged = True
                 tracing.hook_entry_fn = call_event_debug
                 tracing.hook_exit_fn = tracing.return_event_print
 
@@ -150,6 +197,24 @@ class DebugActivate(Builtin):
                     if event_is_debugged
                     else io_files.print_line_number_and_text
                 )
+            elif event_name == "evalFunction":
+                event_filters["evalFunction"] = filters
+                if event_is_debugged:
+                    eval_functions.install(debug_eval_function, filters)
+                else:
+                    eval_functions.uninstall()
+            elif event_name == "parse":
+                event_filters["parse"] = filters
+                if event_is_debugged:
+                    parse_stats.install(debug_parse)
+                else:
+                    parse_stats.uninstall()
+            elif event_name == "Numpy":
+                event_filters["Numpy"] = filters
+                if event_is_debugged:
+                    numpy_calls.install(debug_numpy_call)
+                else:
+                    numpy_calls.uninstall()
             elif event_name == "SymPy":
                 event_filters["SymPy"] = filters
                 tracing.run_sympy = (
@@ -188,6 +253,35 @@ class DebugActivate(Builtin):
             #     )
         # print("XXX", event_filters)
 
+        if some_event_is_debugged:
+            # Count events afresh, but keep the counts of the last
+            # activation when events are turned off.
+            reset_event_counts()
+
+        timeout = self.get_option(options, "Timeout", evaluation)
+        dump_path = self.get_option(options, "TimeoutDump", evaluation)
+        if timeout is SymbolInfinity or timeout.has_form("DirectedInfinity", 1):
+            timeout = None
+        elif isinstance(timeout, (Integer, Real)) and timeout.value > 0:
+            timeout = float(timeout.value)
+        else:
+            evaluation.message(self.get_name(), "opttime", timeout)
+            timeout = None
+        if isinstance(dump_path, String):
+            dump_path = dump_path.value
+        elif dump_path is SymbolNone:
+            dump_path = None
+        else:
+            evaluation.message(self.get_name(), "optdump", dump_path)
+            timeout = dump_path = None
+        watchdog.set_timeout(timeout, dump_path)
+
+        if (
+            (some_event_is_debugged or (timeout is not None and dump_path is None))
+            and self.get_option(options, "Prewarm", evaluation) == SymbolTrue
+        ):
+            prewarm_debugger()
+
 
 class Debugger(Builtin):
     """
@@ -209,12 +303,7 @@ class Debugger(Builtin):
     def eval(self, evaluation: Evaluation, options: dict):
         "Debugger[OptionsPattern[Debugger]]"
         if self.get_option(options, "trepan3k", evaluation) == SymbolTrue:
-            global dbg
-            if dbg is None:
-                from pymathics.trepan.lib.repl import DebugREPL
-
-                dbg = DebugREPL()
-
+            dbg = get_debugger()
             frame = inspect.currentframe()
             if frame is not None:
                 dbg.core.processor.curframe = frame.f_back
@@ -226,6 +315,205 @@ class Debugger(Builtin):
             call_event_debug(tracing.TraceEvent.debugger, Debugger.eval, evaluation)
 
 
+class DebugProfile(Builtin):
+    """
+    <dl>
+      <dt>'DebugProfile'[$directory$]
+      <dd>on signal SIGUSR2, start the Mathics3 profiler, or stop it and \
+      write the profile to a file in $directory$
+      <dt>'DebugProfile'[]
+      <dd>stop doing that
+    </dl>
+
+    The profiler samples the Mathics3 stack of every thread. A profile \
+    has the time spent in each Builtin function and the folded stacks, \
+    which flame graph tools take. Its file name has the process id and \
+    the time in it. Evaluation does not stop.
+
+    This is the same as the debugger command "handle USR2 profile \
+    $directory$".
+
+    X> DebugProfile["/tmp"]
+     = /tmp
+    """
+
+    messages = {
+        "signal": "Cannot set up the SIGUSR2 handler outside of the main thread.",
+    }
+    summary_text = """profile a running process, started and stopped by SIGUSR2"""
+
+    def eval_stop(self, evaluation: Evaluation):
+        "DebugProfile[]"
+        sigmgr = get_debugger().sigmgr
+        if sigmgr is None:
+            evaluation.message(self.get_name(), "signal")
+            return
+        sigmgr.set_profile("SIGUSR2", None)
+        return SymbolNull
+
+    def eval_start(self, directory: String, evaluation: Evaluation):
+        "DebugProfile[directory_String]"
+        sigmgr = get_debugger().sigmgr
+        if sigmgr is None:
+            evaluation.message(self.get_name(), "signal")
+            return
+        sigmgr.set_profile("SIGUSR2", directory.value)
+        return directory
+
+
+class DebugServer(Builtin):
+    """
+    <dl>
+      <dt>'DebugServer'[$address$]
+      <dd>send debugger input and output through a server on local socket \
+      $address$ instead of the terminal
+      <dt>'DebugServer'[]
+      <dd>stop the server and go back to the terminal
+    </dl>
+
+    $address$ is "unix:$path$" for a Unix-domain socket, or "tcp:$port$" \
+    or "tcp:localhost:$port$" for a TCP port on the local host. The \
+    address the server is listening on is returned.
+
+    Attach to the server from another terminal with:
+    <pre>
+      python -m pymathics.trepan.lib.server $address$
+    </pre>
+
+    Only the owner of a Unix-domain socket can attach to it. Any user on \
+    the host can reach a TCP port, so for one, a random token is printed, \
+    and clients must send it. The client reads it from the \
+    MATHICS3_DEBUG_TOKEN environment variable, or asks for it.
+
+    The first client to attach sends debugger commands; clients that \
+    attach after that see the debugger output. When no client is \
+    sending commands, the debugger shows stops but does not wait at them.
+
+    X> DebugServer["unix:/tmp/mathics3-debug.sock"]
+     = unix:/tmp/mathics3-debug.sock
+    """
+
+    messages = {
+        "addr": "Cannot start the debug server: `1`.",
+    }
+    summary_text = """debug through a local socket instead of the terminal"""
+
+    def eval_stop(self, evaluation: Evaluation):
+        "DebugServer[]"
+        from pymathics.trepan.lib.server import stop_server
+
+        stop_server(get_debugger())
+
+    def eval_start(self, address: String, evaluation: Evaluation):
+        "DebugServer[address_String]"
+        from pymathics.trepan.lib.server import start_server
+
+        try:
+            server = start_server(get_debugger(), address.value)
+        except (OSError, ValueError) as e:
+            evaluation.message("DebugServer", "addr", String(str(e)))
+            return
+        if server.token is not None:
+            evaluation.print_out(String(f"Debug server token: {server.token}"))
+        return String(server.address)
+
+
+class DebugPostMortem(Builtin):
+    """
+    <dl>
+      <dt>'DebugPostMortem'[True]
+      <dd>enter the debugger when a Python exception escapes an evaluation
+      <dt>'DebugPostMortem'[$file$]
+      <dd>write a post-mortem report to $file$ instead
+      <dt>'DebugPostMortem'[False]
+      <dd>let such exceptions go by, as before
+    </dl>
+
+    The debugger is entered at the Python frame the exception was \
+    raised in. A report holds the Mathics3 expression stack, the \
+    Builtin calls, a summary of the local variables of each frame, and \
+    the recorded events. It can be browsed later, without the process \
+    that wrote it, with:
+    <pre>
+      python -m pymathics.trepan.lib.postmortem $file$
+    </pre>
+
+    Either way, the exception goes on as it would have otherwise.
+
+    X> DebugPostMortem["/tmp/mathics3-postmortem.json"]
+     = /tmp/mathics3-postmortem.json
+    """
+
+    summary_text = """debug or report Python exceptions that escape an evaluation"""
+
+    def eval_debug(self, evaluation: Evaluation):
+        "DebugPostMortem[System`True]"
+        from pymathics.trepan.lib import postmortem
+
+        postmortem.install(True)
+        return SymbolTrue
+
+    def eval_off(self, evaluation: Evaluation):
+        "DebugPostMortem[System`False]"
+        from pymathics.trepan.lib import postmortem
+
+        postmortem.uninstall()
+        return SymbolFalse
+
+    def eval_report(self, path: String, evaluation: Evaluation):
+        "DebugPostMortem[path_String]"
+        from pymathics.trepan.lib import postmortem
+
+        postmortem.install(False, path.value)
+        return path
+
+
+class DebugStackDump(Builtin):
+    """
+    <dl>
+      <dt>'DebugStackDump'[$file$]
+      <dd>on signal SIGUSR1, append the Mathics3 stack of every thread \
+      to $file$ and go on
+      <dt>'DebugStackDump'[]
+      <dd>stop doing that
+    </dl>
+
+    For each thread, the heads of the expressions being evaluated are \
+    listed, newest first, with their depth, along with the Builtin \
+    functions called. With "set shadowstack on" in the debugger, how \
+    long each expression has been evaluating is listed too. Evaluation \
+    does not stop.
+
+    This is the same as the debugger command "handle USR1 dump $file$".
+
+    X> DebugStackDump["/tmp/mathics3-stacks.log"]
+     = /tmp/mathics3-stacks.log
+    """
+
+    messages = {
+        "signal": "Cannot set up the SIGUSR1 handler outside of the main thread.",
+    }
+    summary_text = """log the Mathics3 stack of each thread on SIGUSR1"""
+
+    def eval_stop(self, evaluation: Evaluation):
+        "DebugStackDump[]"
+        sigmgr = get_debugger().sigmgr
+        if sigmgr is None:
+            evaluation.message(self.get_name(), "signal")
+            return
+        sigmgr.set_dump("SIGUSR1", None)
+        return SymbolNull
+
+    def eval_start(self, path: String, evaluation: Evaluation):
+        "DebugStackDump[path_String]"
+        sigmgr = get_debugger().sigmgr
+        if sigmgr is None:
+            evaluation.message(self.get_name(), "signal")
+            return
+        sigmgr.set_dump("SIGUSR1", path.value)
+        return path
+
+
 class TraceActivate(Builtin):
     """
     <dl>
@@ -233,11 +521,32 @@ class TraceActivate(Builtin):
       <dd>Set event tracing and debugging.
     </dl>
 
+    As with 'DebugActivate', when some event is activated and 'Prewarm' \
+    is 'True', the debugger, which does the printing, is set up in the \
+    background.
+
+    With 'Scope' -> $name$, or a list of names, evaluation tracing \
+    shows only what happens while an expression with head $name$ is \
+    evaluated. 'ScopeDepth' -> $n$ limits that to $n$ levels below \
+    the expression.
+
     >> TraceActivate[SymPy -> True]
      = ...
+
+    >> TraceActivate[evaluation -> True, Scope -> "Integrate", ScopeDepth -> 2]
+     = ...
     """
 
-    options = EVENT_OPTIONS
+    messages = {
+        "scope": "Scope `1` should be All, or a name or list of names",
+        "scopedepth": "ScopeDepth `1` should be a non-negative Integer or Infinity",
+    }
+    options = {
+        **EVENT_OPTIONS,
+        "Prewarm": "True",
+        "Scope": "All",
+        "ScopeDepth": "Infinity",
+    }
     summary_text = """Set/unset tracing and debugging"""
 
     def eval(self, evaluation: Evaluation, options: dict):
@@ -279,7 +588,18 @@ class TraceActivate(Builtin):
                 evaluation.message("DebugActivate", "opttype", option)
                 return None, False
 
+        # A run of repeated lines from tracing that is now changing
+        # ends here.
+        flush_trace_repeats()
+
+        # Get these before tracing starts, so that evaluating them
+        # isn't traced.
+        scope_names, scope_levels, is_valid = self.get_scope(options, evaluation)
+        if is_valid:
+            scope.set_scope(scope_names, scope_levels)
+
         # adjust_event_handlers(self, evaluation, options)
+        some_event_is_traced = False
         for event_name in TraceEventNames:
 
             if event_name == "Debugger":
@@ -295,12 +615,30 @@ class TraceActivate(Builtin):
 
             event_is_traced = option == SymbolTrue
             if event_is_traced:
-                tracing.hook_entry_fn = tracing.call_event_print
-                tracing.hook_exit_fn = tracing.return_event_print
+                some_event_is_traced = True
+                tracing.hook_entry_fn = call_event_print
+                tracing.hook_exit_fn = return_event_print
             if event_name == "Get":
                 io_files.GET_PRINT_FN = (
-                    io_files.print_line_number_and_text if event_is_traced else None
+                    print_get_line if event_is_traced else None
                 )
+            elif event_name == "evalFunction":
+                event_filters["evalFunction"] = filters
+                if event_is_traced:
+                    eval_functions.install(trace_eval_function, filters)
+                else:
+                    eval_functions.uninstall()
+            elif event_name == "parse":
+                if event_is_traced:
+                    parse_stats.install(trace_parse)
+                else:
+                    parse_stats.uninstall()
+            elif event_name == "Numpy":
+                event_filters["Numpy"] = filters
+                if event_is_traced:
+                    numpy_calls.install(trace_numpy_call)
+                else:
+                    numpy_calls.uninstall()
             elif event_name == "SymPy":
                 event_filters["SymPy"] = filters
                 tracing.run_sympy = (
@@ -329,3 +667,52 @@ class TraceActivate(Builtin):
                 tracing.run_mpmath = (
                     tracing.run_mpmath_traced if event_is_traced else tracing.run_fast
                 )
+
+        if some_event_is_traced:
+            # Count events afresh, but keep the counts of the last
+            # activation when events are turned off.
+            reset_event_counts()
+
+        if (
+            some_event_is_traced
+            and self.get_option(options, "Prewarm", evaluation) == SymbolTrue
+        ):
+            prewarm_debugger()
+
+    def get_scope(
+        self, options: dict, evaluation: Evaluation
+    ) -> Tuple[Optional[frozenset], Optional[int], bool]:
+        """
+        Returns the fully-qualified head names in the Scope option, or
+        None if it is All; the ScopeDepth option, or None if it is
+        Infinity; and whether both options were valid.
+        """
+        option = self.get_option(options, "Scope", evaluation)
+        if option is SymbolAll:
+            scope_names = None
+        else:
+            elements = (
+                option.elements if isinstance(option, ListExpression) else (option,)
+            )
+            names = []
+            for elt in elements:
+                if isinstance(elt, String):
+                    # Follow $Context and $ContextPath, the way the
+                    # parser does for a Symbol.
+                    names.append(evaluation.definitions.lookup_name(elt.value))
+                elif isinstance(elt, Symbol):
+                    names.append(elt.get_name())
+                else:
+                    evaluation.message(self.get_name(), "scope", option)
+                    return None, None, False
+            scope_names = frozenset(names)
+
+        depth = self.get_option(options, "ScopeDepth", evaluation)
+        if depth is SymbolInfinity or depth.has_form("DirectedInfinity", 1):
+            scope_levels = None
+        elif isinstance(depth, Integer) and depth.value >= 0:
+            scope_levels = depth.value
+        else:
+            evaluation.message(self.get_name(), "scopedepth", depth)
+            return None, None, False
+        return scope_names, scope_levels, True
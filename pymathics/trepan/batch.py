@@ -0,0 +1,353 @@
+# -*- coding: utf-8 -*-
+#
+#   Copyright (C) 2024 Rocky Bernstein <rocky@gnu.org>
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Run a Mathics3 script under the debugger with nobody at the terminal.
+
+Events are set up the same way DebugActivate[] does it. Each time the
+debugger stops, a fixed list of debugger commands is run, and what the
+stop and the commands printed is appended to a report file as one line
+of JSON. Then execution continues. For example::
+
+    python -m pymathics.trepan.batch --events 'evaluation->{"System`Plus"}' \\
+        --command "backtrace -e" --command "info program" nightly.m
+
+writes stops to nightly.m.report.jsonl. Besides a record for each stop,
+there is a "start" record with the options used, and an "end" record
+with totals, so reports from several runs can go in one file.
+"""
+
+import json
+import os.path as osp
+import sys
+import time
+from argparse import ArgumentParser
+from datetime import datetime
+from typing import List, Optional
+
+from trepan.interface import TrepanInterface
+
+# Run at each stop when no commands are given.
+DEFAULT_COMMANDS = ("backtrace -e", "info program")
+
+# Event options used when no events are given.
+DEFAULT_EVENTS = "evaluation->True"
+
+
+class BatchInterface(TrepanInterface):
+    """Debugger interface for when there is nobody at the terminal.
+
+    Output is collected rather than shown, so that it can go into the
+    report. Commands come from the command processor's cmd_queue; once
+    that is used up, we continue execution.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.histfile = None
+        self.interactive = False
+        self.output_parts: List[str] = []
+
+    def close(self):
+        return
+
+    def confirm(self, prompt: str, default: bool) -> bool:
+        return default
+
+    def errmsg(self, msg: str, prefix: str = "** "):
+        self.msg(f"{prefix}{msg}")
+
+    def finalize(self, last_wishes=None):
+        return
+
+    def msg(self, msg: str):
+        self.output_parts.append(f"{msg}\n")
+
+    def msg_nocr(self, msg: str):
+        self.output_parts.append(msg)
+
+    def read_command(self, prompt: str = "") -> str:
+        return "continue"
+
+    def readline(self, prompt: str = "", add_to_history=True) -> str:
+        return "continue"
+
+    def take_output(self) -> str:
+        """Return the output collected so far, and start over."""
+        output = "".join(self.output_parts)
+        self.output_parts = []
+        return output
+
+
+class BatchReport:
+    """Command-processor hooks that run ``commands`` at each stop and
+    append a JSON record of what happened to ``report_file``.
+
+    After ``max_stops`` stops, if that is not None, stops are no longer
+    recorded and commands are no longer run.
+    """
+
+    def __init__(
+        self,
+        intf: BatchInterface,
+        commands: List[str],
+        report_file,
+        max_stops: Optional[int] = None,
+    ):
+        self.intf = intf
+        self.commands = list(commands)
+        self.report_file = report_file
+        self.max_stops = max_stops
+        self.input_line = 0
+        self.start_time = time.perf_counter()
+        self.stop_count = 0
+        self.skipped_stops = 0
+        self.record = None
+        self.command_entry = None
+
+    @property
+    def done(self) -> bool:
+        return self.max_stops is not None and self.stop_count >= self.max_stops
+
+    def install(self, proc):
+        """Add our hooks to command processor ``proc``."""
+        proc.preloop_hooks.append(self.preloop_hook)
+        proc.precmd_hooks.append(self.precmd_hook)
+        proc.postcmd_hooks.append(self.postcmd_hook)
+
+    def write(self, record: dict):
+        self.report_file.write(json.dumps(record) + "\n")
+        # Flush so that a run that dies, or is killed, still leaves
+        # the stops seen so far.
+        self.report_file.flush()
+
+    def preloop_hook(self, proc) -> bool:
+        """Start a record for the stop, and queue the commands to run.
+        Returning True skips the command loop entirely."""
+        location = self.intf.take_output()
+        if self.done:
+            self.skipped_stops += 1
+            return True
+        self.stop_count += 1
+        self.record = {
+            "type": "stop",
+            "stop": self.stop_count,
+            "time": round(time.perf_counter() - self.start_time, 6),
+            "input_line": self.input_line,
+            "event": proc.event,
+            "location": location,
+            "commands": [],
+        }
+        proc.cmd_queue.extend(self.commands)
+        return False
+
+    def precmd_hook(self, proc):
+        """Finish the command that just ran, and start an entry for the
+        next queued one, if any."""
+        self.finish_command()
+        if self.record is not None and proc.cmd_queue:
+            self.command_entry = {"command": proc.cmd_queue[0].strip()}
+
+    def postcmd_hook(self, proc):
+        """Write out the record for this stop."""
+        self.finish_command()
+        if self.record is not None:
+            # Anything printed by "continue" itself, for example.
+            trailing = self.intf.take_output()
+            if trailing:
+                self.record["trailing_output"] = trailing
+            self.write(self.record)
+            self.record = None
+
+    def finish_command(self):
+        if self.command_entry is not None:
+            self.command_entry["output"] = self.intf.take_output()
+            self.record["commands"].append(self.command_entry)
+            self.command_entry = None
+
+
+def run_script(
+    script_path: str,
+    events: str,
+    commands: List[str],
+    report_path: str,
+    max_stops: Optional[int] = None,
+    post_mortem_path: Optional[str] = None,
+) -> int:
+    """Evaluate the Mathics3 script ``script_path`` with the debugger
+    events in ``events`` active, writing a report of each stop to
+    ``report_path``. If a Python exception escapes the script and
+    ``post_mortem_path`` is given, a post-mortem report is written
+    there. Return the number of stops recorded."""
+    from mathics.core.evaluation import Evaluation
+    from mathics.core.parser import MathicsFileLineFeeder
+    from mathics.session import MathicsSession
+
+    from pymathics.trepan.tracing import get_debugger
+
+    session = MathicsSession(catch_interrupt=False)
+    session.evaluate('LoadModule["pymathics.trepan"]')
+    if post_mortem_path is not None:
+        from pymathics.trepan.lib import postmortem
+
+        postmortem.install(False, post_mortem_path)
+
+    dbg = get_debugger()
+    # There is no terminal to show colors or to ask the user
+    # anything.
+    dbg.settings["highlight"] = "plain"
+    dbg.settings["style"] = None
+    intf = BatchInterface()
+    # The command processor shares this list.
+    dbg.intf[:] = [intf]
+
+    with open(report_path, "a") as report_file:
+        report = BatchReport(intf, commands, report_file, max_stops)
+        report.install(dbg.core.processor)
+        report.write(
+            {
+                "type": "start",
+                "script": osp.abspath(script_path),
+                "events": events,
+                "commands": list(commands),
+                "max_stops": max_stops,
+                "date": datetime.now().isoformat(timespec="seconds"),
+            }
+        )
+
+        # The debugger is already built, so there is no point in
+        # prewarming it.
+        session.evaluate(f"DebugActivate[{events}, Prewarm->False]")
+
+        events_active = True
+        with open(script_path) as script_file:
+            feeder = MathicsFileLineFeeder(script_file)
+            while not feeder.empty():
+                if events_active and report.done:
+                    # Turn events off, so the rest of the script runs
+                    # at full speed.
+                    session.evaluate("DebugActivate[]")
+                    events_active = False
+                report.input_line = feeder.lineno + 1
+                # A fresh Evaluation for each query, as mathics does:
+                # formatting a result leaves is_boxing set, and while
+                # it is, evaluation events aren't seen.
+                evaluation = Evaluation(
+                    session.definitions,
+                    output=session.evaluation.output,
+                    catch_interrupt=False,
+                )
+                query = evaluation.parse_feeder(feeder)
+                if query is None:
+                    continue
+                result = evaluation.evaluate(query)
+                for out in result.out:
+                    print(out.text)
+        if events_active:
+            session.evaluate("DebugActivate[]")
+
+        report.write(
+            {
+                "type": "end",
+                "stops": report.stop_count,
+                "skipped_stops": report.skipped_stops,
+                "elapsed": round(time.perf_counter() - report.start_time, 6),
+            }
+        )
+    return report.stop_count
+
+
+def main(argv=None) -> int:
+    parser = ArgumentParser(
+        prog="python -m pymathics.trepan.batch",
+        description=(
+            "Run a Mathics3 script under the debugger without a terminal, "
+            "running debugger commands at each stop and appending what they "
+            "print to a JSON Lines report."
+        ),
+    )
+    parser.add_argument("script", metavar="SCRIPT", help="Mathics3 script to run")
+    parser.add_argument(
+        "--events",
+        default=DEFAULT_EVENTS,
+        help=(
+            "DebugActivate[] options giving the events to stop at, "
+            f"e.g. 'apply->True, mpmath->True'. The default is '{DEFAULT_EVENTS}'"
+        ),
+    )
+    parser.add_argument(
+        "--command",
+        "-c",
+        dest="commands",
+        action="append",
+        metavar="COMMAND",
+        help=(
+            "debugger command to run at each stop; may be given more than once. "
+            f"The default is: {', '.join(DEFAULT_COMMANDS)}"
+        ),
+    )
+    parser.add_argument(
+        "--command-file",
+        "-x",
+        metavar="FILE",
+        help="file of debugger commands, one per line, to run at each stop",
+    )
+    parser.add_argument(
+        "--report",
+        "-o",
+        metavar="FILE",
+        help="JSON Lines file to append the report to. The default is SCRIPT.report.jsonl",
+    )
+    parser.add_argument(
+        "--max-stops",
+        type=int,
+        metavar="N",
+        help="stop recording, and turn events off, after N stops",
+    )
+    parser.add_argument(
+        "--post-mortem",
+        metavar="FILE",
+        help=(
+            "if a Python exception escapes the script, write a post-mortem "
+            "report to FILE; browse it with python -m pymathics.trepan.lib.postmortem"
+        ),
+    )
+    args = parser.parse_args(argv)
+
+    commands = list(args.commands or [])
+    if args.command_file:
+        with open(args.command_file) as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    commands.append(line)
+    if not commands:
+        commands = list(DEFAULT_COMMANDS)
+
+    report_path = args.report or f"{args.script}.report.jsonl"
+    stop_count = run_script(
+        args.script,
+        args.events,
+        commands,
+        report_path,
+        args.max_stops,
+        args.post_mortem,
+    )
+    print(f"{stop_count} stops written to {report_path}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
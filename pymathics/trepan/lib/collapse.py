@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+#
+#   Copyright (C) 2024 Rocky Bernstein <rocky@gnu.org>
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Collapse runs of repeated trace lines.
+
+Pattern-heavy code can make evaluation tracing print the same
+"Evaluating:" and "Returning:" lines thousands of times in a row. When
+collapsing is on ("set tracecollapse", on by default), lines that
+repeat the group of lines shown just before them are not shown; once
+the run ends, a "(x 3,214)" or "(last 2 lines x 3,214)" line says how
+many times in a row the group came up.
+
+Whether a line repeats is decided before anything is formatted or
+compared in full, from a key made of the status, the recursion depth,
+and the structural hashes of the expressions, which are cached (see
+pymathics.trepan.lib.treediff). So repeats cost almost nothing.
+"""
+
+from collections import deque
+from typing import Any, Callable, Deque, List, Optional, Tuple
+
+from pymathics.trepan.lib.treediff import structural_hash
+
+# When True, evaluation tracing collapses repeated lines.
+enabled: bool = True
+
+# Largest number of lines in a group that is looked for as repeating.
+MAX_PERIOD = 4
+
+
+def line_key(status: str, depth: int, expr, orig_expr) -> Tuple[Any, ...]:
+    """Return what decides whether two trace lines are the same."""
+    if isinstance(expr, tuple):
+        # The result of a rewrite step: (new expression, whether it
+        # changed).
+        expr_hash = (structural_hash(expr[0]), expr[1])
+    else:
+        expr_hash = structural_hash(expr)
+    orig_hash = None if orig_expr is None else structural_hash(orig_expr)
+    return (status, depth, expr_hash, orig_hash)
+
+
+class RepeatCollapser:
+    """Keeps track of the last few trace lines shown, and of a run of
+    lines that repeats them.
+
+    Tracing a loop rarely repeats a single line; it repeats a group of
+    them, say an "Evaluating:" line and its "Returning:" line. So a run
+    is a repeat of the last ``period`` lines shown, for a ``period`` of
+    up to MAX_PERIOD lines.
+    """
+
+    def __init__(self):
+        # (key, indent) of the last lines shown.
+        self.recent: Deque[Tuple[Tuple[Any, ...], str]] = deque(maxlen=MAX_PERIOD)
+        self.reset()
+
+    def reset(self):
+        # Number of lines in the group that repeats; 0 when there is
+        # no run.
+        self.period = 0
+        # Lines of the run seen so far.
+        self.matched = 0
+        # Whatever is needed to show again the lines of a group that
+        # is only partly repeated.
+        self.pending: List[Any] = []
+        self.replaying = False
+
+    def is_repeat(self, key: Tuple[Any, ...], replay_args) -> bool:
+        """Return True, and count it, if the line for ``key`` continues
+        or starts a run of repeated lines. ``replay_args`` are kept in
+        case the line has to be shown after all."""
+        if self.replaying:
+            return False
+        period = self.period
+        if period:
+            if key != self.recent[self.matched % period - period][0]:
+                return False
+            self.matched += 1
+        else:
+            for period in range(1, len(self.recent) + 1):
+                if key == self.recent[-period][0]:
+                    break
+            else:
+                return False
+            self.period = period
+            self.matched = 1
+        if self.matched % period:
+            self.pending.append(replay_args)
+        else:
+            self.pending.clear()
+        return True
+
+    def new_line(
+        self,
+        key: Tuple[Any, ...],
+        indent: str,
+        msg: Callable[[str], None],
+        replay: Optional[Callable] = None,
+    ):
+        """Record that the line for ``key`` is about to be shown. First,
+        end any run of repeats."""
+        if self.period:
+            self.flush(msg, replay)
+        self.recent.append((key, indent))
+
+    def flush(self, msg: Callable[[str], None], replay: Optional[Callable] = None):
+        """Show how many times in a row the repeated group of lines came
+        up, and then, by calling ``replay``, the lines of a group that
+        only partly repeated."""
+        period, pending = self.period, self.pending
+        groups = 1 + self.matched // period if period else 0
+        indent = self.recent[-period][1] if period else ""
+        self.reset()
+        if groups > 1:
+            if period == 1:
+                msg(f"{indent}(x {groups:,})")
+            else:
+                msg(f"{indent}(last {period} lines x {groups:,})")
+        if replay is not None and pending:
+            self.replaying = True
+            try:
+                for args in pending:
+                    replay(*args)
+            finally:
+                self.replaying = False
+
+
+# The collapser used by evaluation tracing.
+collapser = RepeatCollapser()
@@ -29,6 +29,8 @@ import os
 import os.path as osp
 import sys
 import threading
+from contextlib import contextmanager
+from time import perf_counter
 from typing import Any
 
 import mathics.eval.tracing
@@ -41,10 +43,82 @@ from trepan.lib.default import START_OPTS, STOP_OPTS
 from trepan.lib.stack import count_frames
 from trepan.misc import option_set
 
-from pymathics.trepan.tracing import event_filters
+from pymathics.trepan.lib import eval_functions, numpy_calls
+from pymathics.trepan.lib.governor import governor
+from pymathics.trepan.tracing import (
+    EVENT_INDEX,
+    event_filters,
+    evaluation_is_filtered_out,
+    events_dispatched,
+    events_filtered,
+)
 from pymathics.trepan.processor.cmdproc import CommandProcessor
 
 
+class DispatchState(threading.local):
+    """Event-dispatch state that each thread has its own copy of.
+
+    Several threads can be evaluating Mathics3 expressions at once, but
+    usually only one of them is being stepped or stopped in. Keeping
+    this state per thread means threads don't have to take turns just
+    to look at an event and decide that it doesn't concern them.
+    """
+
+    def __init__(self, step_ignore: int):
+        # The event parameter of the event hook. We can however
+        # modify it, such as for breakpoints.
+        self.event = None
+
+        # The "arg" value in the callback
+        self.arg = None
+        self.event_arg = None
+
+        # The reason we have stopped, e.g. 'breakpoint hit', 'next',
+        # 'finish', 'step', or 'exception'.
+        self.stop_reason = ""
+
+        # How many step events to skip before entering the event
+        # processor? Zero (0) means stop at the next one. A negative
+        # number indicates no eventual stopping.
+        self.step_ignore = step_ignore
+
+        # If stop_level is not None, then we are next'ing or
+        # finish'ing and will ignore frames greater than stop_level.
+        # We also will cache the last frame encountered so we don't
+        # have to compute the current level all the time.
+        self.last_frame = None
+        self.last_level = 10000
+        self.stop_level = None
+        self.stop_on_finish = False
+
+        self.last_lineno = None
+        self.last_filename = None
+
+        # True while this thread is stopped in the command loop. Code
+        # run from the prompt, e.g. "eval y = 7", can fire events; this
+        # thread already holds debugger_lock then, so it can't stop
+        # again.
+        self.at_stop = False
+
+        # How many times this thread has stopped. A hook can compare
+        # it before and after dispatching an event to tell whether the
+        # event stopped.
+        self.stop_count = 0
+
+
+def thread_state_property(name: str) -> property:
+    """Return a property that reads and writes attribute ``name`` of
+    the running thread's DispatchState."""
+
+    def fget(self):
+        return getattr(self.thread_state, name)
+
+    def fset(self, value):
+        setattr(self.thread_state, name, value)
+
+    return property(fget, fset, doc=f"The running thread's {name}.")
+
+
 class DebuggerCore:
     DEFAULT_INIT_OPTS = {
         "processor": None,
@@ -75,19 +149,20 @@ class DebuggerCore:
         # lower-level trepan3k debugger.
         self.python_debugger = None
 
-        # Threading lock ensures that we don't have other traced threads
-        # running when we enter the debugger. Later we may want to have
-        # a switch to control.
+        # Only one thread at a time can be in the command loop. The
+        # lock is taken just around that; deciding whether to stop
+        # uses per-thread state in self.thread_state.
         self.debugger_lock = threading.Lock()
 
-        self.filename_cache = {}
+        # When not None, only the thread with this identifier,
+        # threading.get_ident(), stops in the debugger. Other threads
+        # test this without taking any lock.
+        self.thread_filter = None
 
-        # Initially the event parameter of the event hook.
-        # We can however modify it, such as for breakpoints
-        self.event = None
+        self.filename_cache = {}
 
-        # The "arg" value in the callback
-        self.event_arg = None
+        # Event, stepping and stop state. See DispatchState.
+        self.thread_state = DispatchState(get_option("step_ignore"))
 
         # Is debugged program currently under execution?
         self.execution_status = "Pre-execution"
@@ -100,29 +175,8 @@ class DebuggerCore:
         self.processor = CommandProcessor(self, opts=proc_opts)
         # What events are considered in stepping. Note: 'None' means *all*.
         self.step_events = None
-        # How many line events to skip before entering event processor?
-        # If stop_level is None all breaks are counted otherwise just
-        # those which less than or equal to stop_level.
-        self.step_ignore = get_option("step_ignore")
-
-        # If stop_level is not None, then we are next'ing or
-        # finish'ing and will ignore frames greater than stop_level.
-        # We also will cache the last frame and thread number encountered
-        # so we don't have to compute the current level all the time.
-        self.last_frame = None
-        self.last_level = 10000
-        self.last_thread = None
-        self.stop_level = None
-        self.stop_on_finish = False
-
-        self.last_lineno = None
-        self.last_filename = None
         self.different_line = None
 
-        # The reason we have stopped, e.g. 'breakpoint hit', 'next',
-        # 'finish', 'step', or 'exception'.
-        self.stop_reason = ""
-
         # self.trace_processor = Mtrace.PrintProcessor(self)
 
         # What routines (keyed by f_code) will we not trace into?
@@ -138,6 +192,33 @@ class DebuggerCore:
 
         return
 
+    event = thread_state_property("event")
+    arg = thread_state_property("arg")
+    event_arg = thread_state_property("event_arg")
+    stop_reason = thread_state_property("stop_reason")
+    step_ignore = thread_state_property("step_ignore")
+    last_frame = thread_state_property("last_frame")
+    last_level = thread_state_property("last_level")
+    stop_level = thread_state_property("stop_level")
+    stop_on_finish = thread_state_property("stop_on_finish")
+    last_lineno = thread_state_property("last_lineno")
+    last_filename = thread_state_property("last_filename")
+    at_stop = thread_state_property("at_stop")
+    stop_count = thread_state_property("stop_count")
+
+    @contextmanager
+    def stop_lock(self):
+        """Take debugger_lock for a stop of the running thread, and note
+        that the thread is stopped until it is given back."""
+        state = self.thread_state
+        with self.debugger_lock:
+            state.at_stop = True
+            state.stop_count += 1
+            try:
+                yield
+            finally:
+                state.at_stop = False
+
     def add_ignore(self, *frames_or_fns):
         """Add `frame_or_fn' to the list of functions that are not to
         be debugged"""
@@ -398,6 +479,74 @@ class DebuggerCore:
             pass
         return False
 
+    def is_filtered_out(self, event: str, arg) -> bool:
+        """Return True if the event filters rule out stopping for
+        ``event`` with ``arg``. Along the way, this thread's "arg" is
+        set to what "info program" should show for the event."""
+        state = self.thread_state
+        event_filter = event_filters.get(event)
+
+        # Update arg to let user see details of callback
+        # in "info program"
+        state.arg = arg
+
+        if event_filter is not None:
+            if event == "mpmath" and event_filter:
+                bound_mpmath_method, call_args = arg
+                mpmath_name = bound_mpmath_method.__func__.__name__
+                # If we have any mpmmath event filters listed, check that
+                # mpmath_name on of the names listed.
+                if mpmath_name not in event_filter and event_filter:
+                    return True
+                state.arg = (mpmath_name, bound_mpmath_method, call_args)
+                pass
+            elif event == "SymPy":
+                sympy_function, call_args = arg
+                sympy_name = sympy_function.__name__
+                # If we have any SymPy event filters listed, check that
+                # sympy_name on of the names listed.
+                if sympy_name not in event_filter and event_filter:
+                    return True
+                state.arg = (sympy_name, sympy_function, call_args)
+            elif event == "evalFunction":
+                eval_function, call_args = arg
+                # Only the functions named in the filter are hooked,
+                # so there is nothing left to filter here.
+                state.arg = (
+                    eval_functions.full_name(eval_function),
+                    eval_function,
+                    call_args,
+                )
+            elif event == "Numpy":
+                numpy_function, call_args = arg
+                # If we have any NumPy event filters listed, check that
+                # the function is one of the names listed.
+                if event_filter and not numpy_calls.name_matches(
+                    numpy_function.name, event_filter
+                ):
+                    return True
+                state.arg = (numpy_function.name, numpy_function, call_args)
+            elif event == "Get":
+                file_path, call_args = arg
+                if file_path not in event_filter and event_filter:
+                    return True
+            elif event == "parse":
+                # The filter lists the files whose input we stop after
+                # parsing.
+                record, _ = arg[1]
+                if event_filter and record.filename not in event_filter:
+                    return True
+            elif event == "evaluate-result":
+                if evaluation_is_filtered_out(event, arg[-1]):
+                    return True
+            elif event == "evaluate-entry":
+                if evaluation_is_filtered_out(event, arg[0]):
+                    return True
+            else:
+                print(f"FIXME: Unhandled event {event}")
+                return True
+        return False
+
     def trace_dispatch(self, frame, event, arg):
         """A trace event occurred. Filter or pass the information to a
         specialized event processor. Note that there may be more filtering
@@ -405,89 +554,58 @@ class DebuggerCore:
         different line). We could put that here, but since that seems
         processor-specific I think it best to distribute the checks."""
 
-        if self.ignore_filter and self.ignore_filter.is_excluded(frame):
+        thread_filter = self.thread_filter
+        if thread_filter is not None and threading.get_ident() != thread_filter:
             return self
 
-        # For now we only allow one instance in a process
-        # In Python 2.6 and beyond one can use "with threading.Lock():"
-        try:
-            self.debugger_lock.acquire()
-
-            if self.trace_hook_suspend:
-                return None
+        if self.ignore_filter and self.ignore_filter.is_excluded(frame):
+            return self
 
-            self.event = event
-            if self.debugger.settings["trace"]:
-                print_event_set = self.debugger.settings["printset"]
-                if self.event in print_event_set:
-                    self.trace_processor.event_processor(frame, self.event, arg)
-                    pass
-                pass
+        if self.trace_hook_suspend:
+            return None
 
-            if self.until_condition:
-                if not self.matches_condition(frame):
-                    return self
+        state = self.thread_state
+        if state.at_stop:
+            # An event from code run at this thread's own stop.
+            return self
+        state.event = event
+        if self.debugger.settings["trace"]:
+            print_event_set = self.debugger.settings["printset"]
+            if event in print_event_set:
+                self.trace_processor.event_processor(frame, event, arg)
                 pass
+            pass
 
-            trace_event_set = self.debugger.settings["events"]
-            if trace_event_set is None or self.event not in trace_event_set:
+        if self.until_condition:
+            if not self.matches_condition(frame):
                 return self
+            pass
 
-            event_filter = event_filters.get(event)
-
-            # Update arg to let user see details of callback
-            # in "info program"
-            self.arg = arg
-
-            if event_filter is not None:
-                if event == "mpmath" and event_filter:
-                    bound_mpmath_method, call_args = arg
-                    mpmath_name = bound_mpmath_method.__func__.__name__
-                    # If we have any mpmmath event filters listed, check that
-                    # mpmath_name on of the names listed.
-                    if mpmath_name not in event_filter and event_filter:
-                        return
-                    self.arg = (mpmath_name, bound_mpmath_method, call_args)
-                    pass
-                elif event == "SymPy":
-                    sympy_function, call_args = arg
-                    sympy_name = sympy_function.__name__
-                    # If we have any SymPy event filters listed, check that
-                    # sympy_name on of the names listed.
-                    if sympy_name not in event_filter and event_filter:
-                        return
-                    self.arg = (sympy_name, sympy_function, call_args)
-                elif event == "Get":
-                    file_path, call_args = arg
-                    if file_path not in event_filter and event_filter:
-                        return
-                elif event == "evaluate-result":
-                    orig_expr = arg[-1]
-                    # If any of the evaluation-result filters uses a short name, then we will take the
-                    # short name of the original expression.
-                    # TODO: Think about if we should allow short names in event filters or whether we should
-                    # always fill those in based on $Context or $ContextPath.
-                    use_short = all(name.find("`") == -1 for name in event_filter)
-                    if orig_expr.get_name(short=use_short) not in event_filter:
-                        return
-                elif event == "evaluate-entry":
-                    expr = arg[0]
-                    if expr.get_name() not in event_filter:
-                        return
-                else:
-                    print(f"FIXME: Unhandled event {event}")
-                    return
+        trace_event_set = self.debugger.settings["events"]
+        if trace_event_set is None or event not in trace_event_set:
+            events_filtered[EVENT_INDEX.get(event, 0)] += 1
+            return self
 
-            return self.processor.event_processor(frame, event, arg)
-        # except ReturnChanged:
-        #     raise
-        finally:
+        if self.is_filtered_out(event, arg):
+            events_filtered[EVENT_INDEX.get(event, 0)] += 1
+            return
+        events_dispatched[EVENT_INDEX.get(event, 0)] += 1
+
+        # The command processor and its interfaces are shared, so only
+        # one thread at a time gets to run debugger commands.
+        with self.stop_lock():
+            # The processor reads "event" and "arg" from us, and for
+            # it, those are the values of the thread that has stopped.
+            if governor.budget is None:
+                return self.processor.event_processor(frame, event, arg)
+
+            # Time spent at the prompt is not overhead the governor
+            # should count against the trace budget.
+            prompt_start = perf_counter()
             try:
-                self.debugger_lock.release()
-            except Exception:
-                pass
-            pass
-        pass
+                return self.processor.event_processor(frame, event, arg)
+            finally:
+                governor.add_prompt_time(perf_counter() - prompt_start)
 
     pass
 
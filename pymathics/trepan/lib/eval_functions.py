@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+#
+#   Copyright (C) 2024 Rocky Bernstein <rocky@gnu.org>
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Call a hook when the eval_Xxx() functions of mathics.eval are called.
+
+These functions do much of the real work behind Builtins, but nothing
+calls a hook for them. When the "evalFunction" event is activated, the
+``eval_`` functions defined in the loaded mathics.eval modules, or
+only those whose names are given, are made to call one:
+
+* On Python 3.12 and later, sys.monitoring PY_START events are turned
+  on for just the code of those functions. Other code runs as it
+  would without a debugger.
+
+* Before that, each function is replaced by a wrapper that calls the
+  hook first, in every loaded Mathics3 module that has it, since
+  callers usually import these functions by name.
+
+Deactivating the event undoes this.
+"""
+
+import sys
+from functools import wraps
+from types import CodeType, FunctionType, ModuleType
+from typing import Callable, Dict, List, Optional, Tuple
+
+USE_MONITORING = sys.version_info >= (3, 12)
+
+# Called as hook(function, args) when a hooked function is called.
+hook: Optional[Callable] = None
+
+# Hooked functions by their code.
+hooked: Dict[CodeType, FunctionType] = {}
+
+# (module, name, function) of each module attribute replaced by a
+# wrapper.
+replaced: List[Tuple[ModuleType, str, FunctionType]] = []
+
+# The sys.monitoring tool id we use, when we have one.
+tool_id: Optional[int] = None
+
+
+def full_name(function: FunctionType) -> str:
+    return f"{function.__module__}.{function.__qualname__}"
+
+
+def name_matches(name: str, names: List[str]) -> bool:
+    """Return True if function ``name``, e.g.
+    "mathics.eval.arithmetic.eval_Plus", is one of ``names``, given
+    either in full or without the module."""
+    return name in names or name.rpartition(".")[2] in names
+
+
+def find_eval_functions(names: Optional[List[str]] = None) -> List[FunctionType]:
+    """Return the eval_ functions defined in loaded mathics.eval modules,
+    or, if ``names`` is given, those of them that it names."""
+    functions = []
+    for module_name, module in list(sys.modules.items()):
+        if module is None or not (
+            module_name == "mathics.eval" or module_name.startswith("mathics.eval.")
+        ):
+            continue
+        for name, value in list(vars(module).items()):
+            if (
+                name.startswith("eval_")
+                and isinstance(value, FunctionType)
+                and value.__module__ == module_name
+                and (not names or name_matches(full_name(value), names))
+            ):
+                functions.append(value)
+    return functions
+
+
+def call_arguments(frame, code: CodeType) -> tuple:
+    """The arguments a function was called with, from its frame."""
+    nargs = code.co_argcount + code.co_kwonlyargcount
+    f_locals = frame.f_locals
+    return tuple(f_locals[name] for name in code.co_varnames[:nargs])
+
+
+def monitoring_start(code: CodeType, instruction_offset: int):
+    """sys.monitoring PY_START callback."""
+    function = hooked.get(code)
+    if function is not None and hook is not None:
+        hook(function, call_arguments(sys._getframe(1), code))
+
+
+def make_wrapper(function: FunctionType) -> Callable:
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        if hook is not None:
+            hook(function, args + tuple(kwargs.values()))
+        return function(*args, **kwargs)
+
+    return wrapper
+
+
+def install(function_hook: Callable, names: Optional[List[str]] = None):
+    """Call ``function_hook`` when the eval_ functions, or just those
+    in ``names``, are called."""
+    global hook
+    uninstall()
+    functions = find_eval_functions(names)
+    if not functions:
+        return
+    hook = function_hook
+    for function in functions:
+        hooked[function.__code__] = function
+    if USE_MONITORING:
+        install_monitoring()
+    else:
+        install_wrappers()
+
+
+def install_monitoring():
+    global tool_id
+    monitoring = sys.monitoring
+    for candidate in (monitoring.DEBUGGER_ID, 3, 4):
+        if monitoring.get_tool(candidate) is None:
+            tool_id = candidate
+            break
+    else:
+        # Every tool id we might use is taken.
+        install_wrappers()
+        return
+    monitoring.use_tool_id(tool_id, "Mathics3 debugger evalFunction")
+    monitoring.register_callback(
+        tool_id, monitoring.events.PY_START, monitoring_start
+    )
+    for code in hooked:
+        monitoring.set_local_events(tool_id, code, monitoring.events.PY_START)
+
+
+def install_wrappers():
+    wrappers = {id(function): make_wrapper(function) for function in hooked.values()}
+    for module_name, module in list(sys.modules.items()):
+        if module is None or not module_name.startswith("mathics"):
+            continue
+        for name, value in list(vars(module).items()):
+            wrapper = wrappers.get(id(value))
+            if wrapper is not None:
+                setattr(module, name, wrapper)
+                replaced.append((module, name, value))
+
+
+def uninstall():
+    """Stop calling the hook; put back any functions replaced."""
+    global hook, tool_id
+    hook = None
+    if tool_id is not None:
+        monitoring = sys.monitoring
+        for code in hooked:
+            monitoring.set_local_events(tool_id, code, 0)
+        monitoring.register_callback(tool_id, monitoring.events.PY_START, None)
+        monitoring.free_tool_id(tool_id)
+        tool_id = None
+    for module, name, function in replaced:
+        setattr(module, name, function)
+    replaced.clear()
+    hooked.clear()
+
+
+if __name__ == "__main__":
+    import mathics.eval.arithmetic
+    from mathics.core.atoms import Integer
+
+    install(
+        lambda function, args: print(full_name(function), args),
+        ["eval_Plus", "eval_add_numbers"],
+    )
+    print("monitoring" if tool_id is not None else f"{len(replaced)} wrappers")
+    print(mathics.eval.arithmetic.eval_add_numbers(Integer(1), Integer(2)))
+    uninstall()
+    print(mathics.eval.arithmetic.eval_add_numbers(Integer(1), Integer(2)))
@@ -1,3 +1,5 @@
+from typing import Any, Dict
+
 from mathics.builtin.patterns.basic import Blank, BlankNullSequence, BlankSequence
 from mathics.builtin.patterns.composite import Pattern, OptionsPattern
 from mathics.builtin.patterns.rules import RuleDelayed
@@ -16,14 +18,17 @@ from mathics.core.systemsymbols import (
     SymbolRule,
     SymbolRuleDelayed,
 )
-from mathics_pygments.lexer import MathematicaLexer
-from pygments import highlight
-from pygments.formatters import Terminal256Formatter
 
 # from mathics.builtin.pattern import Pattern
 
+# pygments and the Mathics3 lexer are not needed until we have something
+# to colorize, and importing them is not free. Loading this module
+# happens on LoadModule["pymathics.trepan"], so they are imported on
+# first use in pygments_format().
+mma_lexer = None
 
-mma_lexer = MathematicaLexer()
+# Style name -> Terminal256Formatter for that style
+terminal_formatters: Dict[str, Any] = {}
 
 
 def format_list(elements: tuple) -> str:
@@ -155,5 +160,20 @@ def pygments_format(mathics_str: str, style) -> str:
     """
     if style is None:
         return mathics_str
-    terminal_formatter = Terminal256Formatter(style=style)
+
+    global mma_lexer
+    from pygments import highlight
+
+    if mma_lexer is None:
+        from mathics_pygments.lexer import MathematicaLexer
+
+        mma_lexer = MathematicaLexer()
+
+    terminal_formatter = terminal_formatters.get(style)
+    if terminal_formatter is None:
+        from pygments.formatters import Terminal256Formatter
+
+        terminal_formatter = terminal_formatters[style] = Terminal256Formatter(
+            style=style
+        )
     return highlight(mathics_str, mma_lexer, terminal_formatter)
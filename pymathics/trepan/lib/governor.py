@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+#
+#   Copyright (C) 2024 Rocky Bernstein <rocky@gnu.org>
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Keep the time spent handling events within a budget.
+
+When a budget is set ("set tracebudget 10%"), the event hooks in
+pymathics.trepan.tracing ask the governor whether to handle each event,
+and report how long handling took. Time spent at the debugger prompt
+doesn't count.
+
+The governor compares the time spent in handlers with the time that
+has gone by, over windows of WINDOW_SECONDS. When handlers take more
+than the budget, it goes to the next level:
+
+  full      every event is handled
+  sampled   one event in SAMPLE_EVERY is handled
+  counters  no event is handled; events are only counted
+
+Each change is logged through the debugger, and kept in ``changes``.
+Once throttled, the governor stays throttled until the budget is set
+again.
+
+With no budget, the hooks don't call the governor at all.
+"""
+
+from collections import Counter
+from threading import Lock
+from time import perf_counter
+from typing import Callable, List, Optional, Tuple
+
+LEVELS = ("full", "sampled", "counters")
+FULL, SAMPLED, COUNTERS = range(len(LEVELS))
+
+# Length of the windows in which overhead is measured.
+WINDOW_SECONDS = 0.5
+
+# In the "sampled" level, handle one event in this many.
+SAMPLE_EVERY = 100
+
+
+class OverheadGovernor:
+    def __init__(self):
+        # Largest fraction of time, e.g. 0.1, that may be spent in
+        # event handlers. None means there is no budget.
+        self.budget: Optional[float] = None
+
+        # Called with a message for each level change.
+        self.log: Optional[Callable[[str], None]] = None
+
+        self.lock = Lock()
+        self.reset()
+
+    def reset(self):
+        """Go back to handling every event and start measuring afresh."""
+        self.level = FULL
+        self.sample_count = 0
+        # Events seen but not handled, by event name.
+        self.skipped: Counter = Counter()
+        # (seconds since the budget was set, old level, new level, overhead)
+        self.changes: List[Tuple[float, str, str, float]] = []
+        self.start_time = self.window_start = perf_counter()
+        self.handler_time = 0.0
+        self.excluded_time = 0.0
+        self.last_overhead = 0.0
+        # Total time spent at the debugger prompt.
+        self.prompt_time = 0.0
+
+    def set_budget(self, budget: Optional[float]):
+        """Set the budget, a fraction between 0 and 1, or None to
+        stop governing."""
+        with self.lock:
+            self.budget = budget
+            self.reset()
+
+    def admit(self, event_name: str) -> bool:
+        """Return True if an ``event_name`` event should be handled. If
+        not, it is counted."""
+        level = self.level
+        if level == FULL:
+            return True
+        if level == SAMPLED:
+            self.sample_count += 1
+            if self.sample_count >= SAMPLE_EVERY:
+                self.sample_count = 0
+                return True
+        self.skipped[event_name] += 1
+        return False
+
+    def start(self) -> Tuple[float, float]:
+        """Return a token to pass to charge() when a handler is done."""
+        return perf_counter(), self.prompt_time
+
+    def charge(self, token: Tuple[float, float]):
+        """Record that a handler, which got ``token`` from start() when
+        it began, is done. Time spent at the debugger prompt in between
+        is left out."""
+        start, prompt_time = token
+        now = perf_counter()
+        excluded = self.prompt_time - prompt_time
+        self.handler_time += now - start - excluded
+        self.excluded_time += excluded
+        if now - self.window_start >= WINDOW_SECONDS:
+            self.end_window(now)
+
+    def add_prompt_time(self, seconds: float):
+        """Record that ``seconds`` were spent at the debugger prompt."""
+        self.prompt_time += seconds
+
+    def end_window(self, now: float):
+        with self.lock:
+            running_time = now - self.window_start - self.excluded_time
+            if running_time <= 0 or self.budget is None:
+                return
+            overhead = self.handler_time / running_time
+            self.last_overhead = overhead
+            self.window_start = now
+            self.handler_time = self.excluded_time = 0.0
+            if overhead > self.budget and self.level < COUNTERS:
+                old_level = self.level
+                self.level += 1
+                self.changes.append(
+                    (
+                        now - self.start_time,
+                        LEVELS[old_level],
+                        LEVELS[self.level],
+                        overhead,
+                    )
+                )
+                if self.log is not None:
+                    self.log(
+                        f"Event handling took {overhead:.1%} of the time, over "
+                        f"the {self.budget:.1%} budget; going from "
+                        f"{LEVELS[old_level]} to {LEVELS[self.level]}."
+                    )
+
+    @property
+    def level_name(self) -> str:
+        return LEVELS[self.level]
+
+
+# The governor used by the event hooks.
+governor = OverheadGovernor()
+
+
+if __name__ == "__main__":
+    from time import sleep
+
+    governor.log = print
+    governor.set_budget(0.1)
+    for i in range(300):
+        sleep(0.001)  # Evaluation
+        if governor.admit("evaluation"):
+            token = governor.start()
+            sleep(0.01)  # Handling the event
+            governor.charge(token)
+    print(governor.level_name, dict(governor.skipped))
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+#
+#   Copyright (C) 2024 Rocky Bernstein <rocky@gnu.org>
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Make the NumPy calls that Mathics3 makes traceable.
+
+Mathics3 has no hook for NumPy calls the way it has tracing.run_sympy
+and tracing.run_mpmath for SymPy and mpmath calls. So, when the
+"Numpy" event is activated, the ``numpy`` (or ``np``) name in each
+loaded Mathics3 module that imported NumPy is replaced by a stand-in
+for the NumPy module. Functions gotten through it are wrapped so that
+calling them calls the event hook; anything else, e.g. numpy.ndarray
+or numpy.pi, is NumPy's own. Deactivating the event puts NumPy back.
+
+Only modules loaded when the event is activated are changed. The NumPy
+calls of a Mathics3 module imported later, e.g. by the first use of a
+builtin, are traced once the event is activated again.
+
+Methods of arrays, e.g. ``a.astype()``, are not traced.
+
+Arguments and results are summarized by shape, dtype and size;
+array contents are never formatted or copied.
+"""
+
+import sys
+from types import ModuleType
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Names under which Mathics3 modules import NumPy.
+NUMPY_NAMES = ("numpy", "np")
+
+# Called as hook(traced_function, args, kwargs) for each call, when the
+# event is active.
+hook: Optional[Callable] = None
+
+# (module, name) of each module attribute we replaced.
+patched: List[Tuple[ModuleType, str]] = []
+
+# What replaces NumPy while the event is active.
+traced_numpy: Optional["TracedModule"] = None
+
+
+class TracedFunction:
+    """A NumPy function that calls ``hook`` when called."""
+
+    __slots__ = ("fn", "name")
+
+    def __init__(self, fn: Callable, name: str):
+        self.fn = fn
+        self.name = name
+
+    def __call__(self, *args, **kwargs):
+        if hook is None:
+            return self.fn(*args, **kwargs)
+        return hook(self, args, kwargs)
+
+    def __getattr__(self, name: str):
+        # E.g. numpy.add.reduce; calls through these are not traced.
+        return getattr(self.fn, name)
+
+    def __repr__(self) -> str:
+        return f"<traced {self.name}>"
+
+
+class TracedModule:
+    """Stands in for NumPy, or for one of its submodules."""
+
+    def __init__(self, module: ModuleType):
+        self._module = module
+        self._wrapped: Dict[str, Any] = {}
+
+    def __getattr__(self, name: str):
+        try:
+            return self._wrapped[name]
+        except KeyError:
+            pass
+        value = getattr(self._module, name)
+        if isinstance(value, ModuleType):
+            if not value.__name__.startswith("numpy"):
+                return value
+            value = TracedModule(value)
+        elif callable(value) and not isinstance(value, type):
+            value = TracedFunction(value, f"{self._module.__name__}.{name}")
+        self._wrapped[name] = value
+        return value
+
+    def __repr__(self) -> str:
+        return f"<traced module {self._module.__name__}>"
+
+
+def install(call_hook: Callable):
+    """Call ``call_hook`` on the NumPy calls of loaded Mathics3 modules.
+    When already installed, modules loaded since are changed too."""
+    global hook, traced_numpy
+    import numpy
+
+    hook = call_hook
+    if traced_numpy is None:
+        traced_numpy = TracedModule(numpy)
+    for module_name, module in list(sys.modules.items()):
+        if not module_name.startswith("mathics.") or module is None:
+            continue
+        for name in NUMPY_NAMES:
+            if getattr(module, name, None) is numpy:
+                setattr(module, name, traced_numpy)
+                patched.append((module, name))
+
+
+def uninstall():
+    """Put NumPy back in the modules install() changed."""
+    global hook, traced_numpy
+    hook = None
+    traced_numpy = None
+    if not patched:
+        return
+    import numpy
+
+    for module, name in patched:
+        setattr(module, name, numpy)
+    patched.clear()
+
+
+def summarize(value) -> str:
+    """Describe ``value`` without showing, or copying, array contents."""
+    if value is None or isinstance(value, (bool, int, float, complex)):
+        return repr(value)
+    nbytes = getattr(value, "nbytes", None)
+    shape = getattr(value, "shape", None)
+    dtype = getattr(value, "dtype", None)
+    if nbytes is not None and shape is not None and dtype is not None:
+        if shape == ():
+            return f"{dtype} scalar"
+        dims = ", ".join(str(n) for n in shape)
+        return f"{dtype}[{dims}] {nbytes:,} bytes"
+    if isinstance(value, (list, tuple)):
+        return f"{type(value).__name__}[{len(value)}]"
+    if isinstance(value, str) and len(value) <= 20:
+        return repr(value)
+    return type(value).__name__
+
+
+def format_args(args: tuple, kwargs: Optional[dict] = None) -> str:
+    """Summaries of call arguments ``args`` and ``kwargs``, in parentheses."""
+    parts = [summarize(arg) for arg in args]
+    if kwargs:
+        parts.extend(f"{key}={summarize(value)}" for key, value in kwargs.items())
+    return f"({', '.join(parts)})"
+
+
+def format_result(result, seconds: float) -> str:
+    """Summary of the result of a call, and how long the call took.
+
+    An array result is marked "new" when it has its own memory, which
+    NumPy had to allocate and fill, possibly copying an argument, and
+    "view" when it uses memory of an existing array.
+    """
+    summary = summarize(result)
+    if getattr(result, "ndim", 0) and hasattr(result, "base"):
+        summary += ", view" if result.base is not None else ", new"
+    return f"{summary} in {seconds * 1000:.3f} ms"
+
+
+def name_matches(name: str, names: List[str]) -> bool:
+    """Return True if function ``name``, e.g. "numpy.random.uniform",
+    is one of ``names``, given either in full or without the module."""
+    return name in names or name.rpartition(".")[2] in names
+
+
+if __name__ == "__main__":
+    import numpy
+
+    a = numpy.zeros((3, 4))
+    print(format_args((a, [1, 2, 3]), {"axis": -1}))
+    print(format_result(a[1:], 0.0002))
+    print(format_result(a.copy(), 0.0002))
+    print(name_matches("numpy.random.uniform", ["uniform"]))
@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+#
+#   Copyright (C) 2024 Rocky Bernstein <rocky@gnu.org>
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Time Mathics3 parses and keep statistics about them.
+
+All parsing of Mathics3 input, from the front end, Get[],
+ToExpression[] and so on, goes through
+mathics.core.parser.util.parse_returning_code(). When the "parse"
+event is activated, that is replaced by a version that times the
+parse, counts the tokens read and the size of the expression that
+results, and passes a ParseRecord of that to the event hook.
+
+Besides totals, the MAX_SLOWEST slowest parses are kept, for "info
+parses".
+"""
+
+import heapq
+import time
+from typing import Callable, List, NamedTuple, Optional
+
+# The number of slowest parses kept.
+MAX_SLOWEST = 50
+
+# Length of the start of the input kept to show which input it was.
+TEXT_PREFIX_LENGTH = 40
+
+
+class ParseRecord(NamedTuple):
+    seconds: float
+    chars: int
+    tokens: int
+    # Number of expressions and atoms in the result.
+    size: int
+    filename: str
+    text: str
+
+
+# Called as hook(record, expr) after each parse, when the event is
+# active.
+hook: Optional[Callable] = None
+
+parse_count = 0
+total_seconds = 0.0
+total_chars = 0
+total_tokens = 0
+
+# A min-heap of (seconds, sequence number, record) for the slowest
+# parses.
+slowest: List[tuple] = []
+
+# The parse_returning_code() we replaced.
+untraced_parse_returning_code: Optional[Callable] = None
+
+# Tokens read by the parse in progress.
+token_count = 0
+
+
+def clear():
+    """Forget all parse statistics."""
+    global parse_count, total_seconds, total_chars, total_tokens
+    parse_count = 0
+    total_seconds = 0.0
+    total_chars = total_tokens = 0
+    slowest.clear()
+
+
+def expression_size(expr) -> int:
+    """Return the number of expressions and atoms in ``expr``, heads
+    included."""
+    size = 0
+    stack = [expr]
+    while stack:
+        element = stack.pop()
+        size += 1
+        elements = getattr(element, "elements", None)
+        if elements is not None:
+            stack.append(element.head)
+            stack.extend(elements)
+    return size
+
+
+def add_record(record: ParseRecord):
+    global parse_count, total_seconds, total_chars, total_tokens
+    parse_count += 1
+    total_seconds += record.seconds
+    total_chars += record.chars
+    total_tokens += record.tokens
+    entry = (record.seconds, parse_count, record)
+    if len(slowest) < MAX_SLOWEST:
+        heapq.heappush(slowest, entry)
+    elif record.seconds > slowest[0][0]:
+        heapq.heapreplace(slowest, entry)
+
+
+def slowest_parses(count: int) -> List[ParseRecord]:
+    """Return the ``count`` slowest parses kept, slowest first."""
+    return [entry[2] for entry in heapq.nlargest(count, slowest)]
+
+
+def format_record(record: ParseRecord) -> str:
+    return (
+        f"{record.chars:,} chars, {record.tokens:,} tokens, "
+        f"{record.size:,} nodes in {record.seconds * 1000:.3f} ms"
+    )
+
+
+def traced_parse_returning_code(definitions, feeder):
+    """parse_returning_code() that times the parse and gathers its
+    statistics."""
+    global token_count
+    token_count = 0
+    start = time.perf_counter()
+    expr, source_code = untraced_parse_returning_code(definitions, feeder)
+    seconds = time.perf_counter() - start
+    if expr is None and not source_code:
+        # Input had run out; nothing was parsed.
+        return expr, source_code
+    text = source_code[:TEXT_PREFIX_LENGTH].replace("\n", " ")
+    record = ParseRecord(
+        seconds,
+        len(source_code),
+        token_count,
+        0 if expr is None else expression_size(expr),
+        getattr(feeder, "filename", ""),
+        text,
+    )
+    add_record(record)
+    if hook is not None:
+        hook(record, expr)
+    return expr, source_code
+
+
+def install(parse_hook: Callable):
+    """Call ``parse_hook`` after each parse. Statistics start afresh."""
+    global hook, untraced_parse_returning_code
+    import mathics.core.parser.util as parser_util
+    from mathics.core.parser.parser import Parser
+
+    hook = parse_hook
+    clear()
+    if untraced_parse_returning_code is not None:
+        return
+    untraced_parse_returning_code = parser_util.parse_returning_code
+    parser_util.parse_returning_code = traced_parse_returning_code
+
+    # The parser reads a token when it has none in hand.
+    parser = parser_util.parser
+
+    def next_counting_tokens():
+        global token_count
+        if parser.current_token is None:
+            token_count += 1
+        return Parser.next(parser)
+
+    parser.next = next_counting_tokens
+
+
+def uninstall():
+    """Parse without timing or gathering statistics."""
+    global hook, untraced_parse_returning_code
+    hook = None
+    if untraced_parse_returning_code is None:
+        return
+    import mathics.core.parser.util as parser_util
+
+    parser_util.parse_returning_code = untraced_parse_returning_code
+    untraced_parse_returning_code = None
+    del parser_util.parser.next
+
+
+if __name__ == "__main__":
+    from mathics.core.definitions import Definitions
+    from mathics.core.parser import MathicsSingleLineFeeder, parse
+
+    definitions = Definitions(add_builtin=False)
+    install(lambda record, expr: print(format_record(record), record.text))
+    for code in ("1 + 2", "f[x_] := x^2 + Sin[x]", "{" + ", ".join(["a"] * 1000) + "}"):
+        parse(definitions, MathicsSingleLineFeeder(code))
+    uninstall()
+    print(parse_count, [record.chars for record in slowest_parses(2)])
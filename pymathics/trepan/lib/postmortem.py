@@ -0,0 +1,573 @@
+# -*- coding: utf-8 -*-
+#
+#   Copyright (C) 2024 Rocky Bernstein <rocky@gnu.org>
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""What to do when a Python exception escapes a Mathics3 evaluation.
+
+When post-mortem handling is on ("DebugPostMortem[...]"), the
+evaluate() methods of Evaluation and MathicsSession are wrapped. If
+an exception other than a Mathics3 interrupt comes out of one, we
+either:
+
+* enter the debugger at the frame the exception was raised in, or
+* write a post-mortem report to a file, for unattended workers where
+  nobody is at the terminal,
+
+and then let the exception go on as before.
+
+A report is a JSON object with the exception, the Python frames from
+the evaluation down to where the exception was raised, and, when they
+are being kept, the shadow stack and the recorded events ("set record
+on"). For each frame there is the Mathics3 expression or Builtin call
+it is for, if any, and a summary of its local variables. Everything is
+formatted to text when the report is written. Formatting an expression
+stops at ELEMENT_BUDGET or LOCAL_BUDGET characters, and shows at most
+MAX_ELEMENTS elements at each level, so that a huge expression on the
+stack doesn't hold up the report.
+
+Reports are browsed without the original process with::
+
+    python -m pymathics.trepan.lib.postmortem REPORT
+
+which takes "backtrace", "frame", "up", "down", "printelement" and
+"info" commands much like the debugger's.
+"""
+
+import cmd
+import json
+import linecache
+import platform
+import reprlib
+import sys
+import traceback
+from datetime import datetime
+from typing import Dict, List, Optional
+
+REPORT_VERSION = 1
+
+# Longest expression text, and local-variable summary, in a report.
+ELEMENT_BUDGET = 2000
+LOCAL_BUDGET = 200
+
+# Most local variables summarized per frame.
+MAX_LOCALS = 30
+
+# Most elements shown at each level of an expression; the rest are
+# shown as <<n>>, the way Short[] does.
+MAX_ELEMENTS = 20
+
+# Most recorded events written.
+MAX_EVENTS = 200
+
+# When True, enter the debugger on an escaping exception.
+debug_on_error: bool = False
+
+# When not None, write a report to this file on an escaping exception.
+report_path: Optional[str] = None
+
+# (class, method name, original method) for each method we wrapped.
+_wrapped: List[tuple] = []
+
+
+def cut(text: str, budget: int) -> str:
+    if len(text) > budget:
+        return f"{text[:budget]}..."
+    return text
+
+
+class OverBudget(Exception):
+    pass
+
+
+def format_bounded(element, budget: int) -> str:
+    """Format Mathics3 ``element`` the way format_element() does, but
+    stop once ``budget`` characters are written, and show at most
+    MAX_ELEMENTS elements at each level. So the time taken depends on
+    the budget, not on how big ``element`` is."""
+    from mathics.core.atoms import Integer, String
+    from mathics.core.expression import Expression
+    from mathics.core.symbols import Atom, Symbol, SymbolList
+    from mathics.core.systemsymbols import (
+        SymbolBlank,
+        SymbolBlankNullSequence,
+        SymbolBlankSequence,
+        SymbolPattern,
+        SymbolRule,
+        SymbolRuleDelayed,
+    )
+
+    from pymathics.trepan.lib.format import format_element
+
+    blanks = {
+        SymbolBlank: "_",
+        SymbolBlankSequence: "__",
+        SymbolBlankNullSequence: "___",
+    }
+    parts: List[str] = []
+    remaining = budget
+
+    def add(text: str):
+        nonlocal remaining
+        parts.append(text)
+        remaining -= len(text)
+        if remaining < 0:
+            raise OverBudget
+
+    def walk(element):
+        if isinstance(element, Symbol):
+            add(element.short_name)
+        elif isinstance(element, String):
+            add(f'"{element.value[: remaining + 1]}"')
+        elif isinstance(element, Integer) and element.value.bit_length() > 4 * budget:
+            # Converting a huge integer to decimal takes a while.
+            add(f"<<{element.value.bit_length()}-bit Integer>>")
+        elif isinstance(element, Atom):
+            add(str(element))
+        elif isinstance(element, Expression):
+            head, elements = element.head, element.elements
+            if head in (SymbolRule, SymbolRuleDelayed) and len(elements) == 2:
+                walk(elements[0])
+                add(" -> " if head is SymbolRule else " :> ")
+                walk(elements[1])
+                return
+            if head is SymbolPattern and len(elements) == 2:
+                walk(elements[0])
+                walk(elements[1])
+                return
+            blank = blanks.get(head)
+            if blank is not None:
+                add(blank)
+                for i, sub_element in enumerate(elements[:MAX_ELEMENTS]):
+                    if i:
+                        add(", ")
+                    walk(sub_element)
+                return
+            if head is SymbolList:
+                add("{")
+            else:
+                walk(head)
+                add("[")
+            for i, sub_element in enumerate(elements[:MAX_ELEMENTS]):
+                if i:
+                    add(", ")
+                walk(sub_element)
+            if len(elements) > MAX_ELEMENTS:
+                add(f", <<{len(elements) - MAX_ELEMENTS}>>")
+            add("}" if head is SymbolList else "]")
+        else:
+            # Patterns and rules, which are small.
+            add(cut(format_element(element), remaining + 1))
+
+    try:
+        walk(element)
+    except OverBudget:
+        return f"{''.join(parts)[:budget]}..."
+    return "".join(parts)
+
+
+class BoundedRepr(reprlib.Repr):
+    """reprlib.Repr that formats Mathics3 elements with
+    format_bounded(), rather than with their full repr()."""
+
+    def repr_instance(self, x, level):
+        from mathics.core.element import BaseElement
+
+        if isinstance(x, BaseElement):
+            return format_bounded(x, self.maxother)
+        return super().repr_instance(x, level)
+
+
+_local_repr = BoundedRepr()
+_local_repr.maxstring = _local_repr.maxother = LOCAL_BUDGET
+
+
+def format_value(value, budget: int) -> str:
+    """Format ``value`` as Mathics3 if it is a Mathics3 element, and as
+    Python otherwise, in at most about ``budget`` characters."""
+    from mathics.core.element import BaseElement
+
+    try:
+        if isinstance(value, BaseElement):
+            return format_bounded(value, budget)
+        return cut(_local_repr.repr(value), budget)
+    except Exception as e:
+        return f"<{type(value).__name__}: cannot format: {e}>"
+
+
+def frame_record(frame, lineno: int) -> dict:
+    """Return the report entry for Python ``frame``, stopped at line
+    ``lineno``."""
+    from mathics.core.expression import Expression
+
+    from pymathics.trepan.lib.stack import format_eval_builtin_fn, is_builtin_eval_fn
+
+    code = frame.f_code
+    record = {
+        "function": code.co_name,
+        "filename": code.co_filename,
+        "lineno": lineno,
+        "line": linecache.getline(code.co_filename, lineno, frame.f_globals).strip(),
+        "kind": "python",
+    }
+    self_obj = frame.f_locals.get("self")
+    if is_builtin_eval_fn(frame):
+        record["kind"] = "builtin"
+        try:
+            record["element"] = format_eval_builtin_fn(frame, style=None)
+        except Exception:
+            record["element"] = type(self_obj).__name__
+    elif isinstance(self_obj, Expression):
+        record["kind"] = "expression"
+        record["element"] = format_value(self_obj, ELEMENT_BUDGET)
+
+    local_items = list(frame.f_locals.items())
+    record["locals"] = {
+        name: format_value(value, LOCAL_BUDGET)
+        for name, value in local_items[:MAX_LOCALS]
+    }
+    if len(local_items) > MAX_LOCALS:
+        record["locals_omitted"] = len(local_items) - MAX_LOCALS
+    return record
+
+
+def build_report(exc_info) -> dict:
+    """Return a post-mortem report for ``exc_info``, as sys.exc_info()
+    gives it."""
+    from pymathics.trepan.lib import recorder, shadow_stack
+
+    exc_type, exc_value, tb = exc_info
+    frames = []
+    while tb is not None:
+        frames.append(frame_record(tb.tb_frame, tb.tb_lineno))
+        tb = tb.tb_next
+
+    report = {
+        "type": "postmortem",
+        "version": REPORT_VERSION,
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "exception": {
+            "type": exc_type.__name__,
+            "message": cut(str(exc_value), ELEMENT_BUDGET),
+            "traceback": traceback.format_exception(exc_type, exc_value, exc_info[2]),
+        },
+        # Oldest first, as in a Python traceback.
+        "frames": frames,
+    }
+    if shadow_stack.enabled:
+        report["shadow_stack"] = [
+            {"depth": entry.depth, "element": format_value(entry.expr, ELEMENT_BUDGET)}
+            for entry in shadow_stack.get_stack()
+        ]
+    if recorder.events:
+        report["events"] = [
+            {
+                "number": event.number,
+                "status": event.status,
+                "depth": event.depth,
+                "element": format_value(event.expr, ELEMENT_BUDGET),
+                "orig_element": (
+                    None
+                    if event.orig_expr is None
+                    else format_value(event.orig_expr, ELEMENT_BUDGET)
+                ),
+            }
+            for event in list(recorder.events)[-MAX_EVENTS:]
+        ]
+    return report
+
+
+def write_report(path: str, exc_info):
+    with open(path, "w") as f:
+        json.dump(build_report(exc_info), f, indent=1)
+        f.write("\n")
+
+
+def enter_debugger(exc_info):
+    """Enter the debugger at the frame that ``exc_info``'s exception
+    was raised in."""
+    from pymathics.trepan.tracing import get_debugger
+
+    tb = exc_info[2]
+    while tb.tb_next is not None:
+        tb = tb.tb_next
+    core = get_debugger().core
+    if core.at_stop:
+        # Raised by, or run from, this thread's own stop.
+        return
+    old_trace_hook_suspend = core.trace_hook_suspend
+    core.trace_hook_suspend = True
+    core.stop_reason = f"uncaught exception {exc_info[0].__name__}"
+    try:
+        with core.stop_lock():
+            core.processor.event_processor(tb.tb_frame, "exception", exc_info)
+    finally:
+        core.trace_hook_suspend = old_trace_hook_suspend
+
+
+def handle_exception(exc_info):
+    """Do what has been asked for with an exception that escaped an
+    evaluation, once for each exception."""
+    exc_value = exc_info[1]
+    if getattr(exc_value, "_mathics3_post_mortem_done", False):
+        return
+    try:
+        exc_value._mathics3_post_mortem_done = True
+    except AttributeError:
+        pass
+    if report_path is not None:
+        try:
+            write_report(report_path, exc_info)
+        except Exception as e:
+            print(f"Cannot write post-mortem report {report_path}: {e}", file=sys.stderr)
+        else:
+            print(f"Post-mortem report written to {report_path}", file=sys.stderr)
+    if debug_on_error:
+        enter_debugger(exc_info)
+
+
+def wrap_evaluate(method):
+    from mathics.core.interrupt import EvaluationInterrupt
+
+    def evaluate(*args, **kwargs):
+        try:
+            return method(*args, **kwargs)
+        except EvaluationInterrupt:
+            raise
+        except Exception:
+            handle_exception(sys.exc_info())
+            raise
+
+    evaluate.__doc__ = method.__doc__
+    evaluate.__wrapped__ = method
+    return evaluate
+
+
+def install(debug: bool, path: Optional[str] = None):
+    """Turn post-mortem handling on: enter the debugger if ``debug`` is
+    True, and write a report to ``path`` if that is given."""
+    global debug_on_error, report_path
+    from mathics.core.evaluation import Evaluation
+    from mathics.session import MathicsSession
+
+    debug_on_error = debug
+    report_path = path
+    if _wrapped:
+        return
+    for cls in (Evaluation, MathicsSession):
+        method = cls.evaluate
+        cls.evaluate = wrap_evaluate(method)
+        _wrapped.append((cls, "evaluate", method))
+
+
+def uninstall():
+    """Turn post-mortem handling off."""
+    global debug_on_error, report_path
+    debug_on_error = False
+    report_path = None
+    while _wrapped:
+        cls, name, method = _wrapped.pop()
+        # If something else, e.g. the evaluation watchdog, has wrapped
+        # the method since, leave our wrapper in; it does nothing now.
+        if getattr(getattr(cls, name), "__wrapped__", None) is method:
+            setattr(cls, name, method)
+
+
+class ReportBrowser(cmd.Cmd):
+    """Browse a post-mortem report with debugger-like commands."""
+
+    prompt = "(Mathics3 Post-mortem) "
+
+    def __init__(self, report: dict, stdout=None):
+        super().__init__(stdout=stdout)
+        self.report = report
+        # Newest first, as the debugger shows the stack.
+        self.frames: List[dict] = list(reversed(report["frames"]))
+        self.curindex = 0
+
+    def msg(self, text: str):
+        self.stdout.write(f"{text}\n")
+
+    def emptyline(self):
+        return False
+
+    def default(self, line: str):
+        self.msg(f'** Undefined command: "{line}". Try "help".')
+
+    def preloop(self):
+        exception = self.report["exception"]
+        self.msg(
+            f"Post-mortem report from {self.report['date']}: "
+            f"{exception['type']}: {exception['message']}"
+        )
+        if self.frames:
+            self.print_frame(self.curindex, "->")
+
+    def print_frame(self, index: int, marker: str):
+        frame = self.frames[index]
+        element = frame.get("element")
+        where = f"{frame['function']} {frame['filename']}:{frame['lineno']}"
+        self.msg(f"{marker}{index} {element}  [{where}]" if element else f"{marker}{index} {where}")
+        if marker == "->" and frame["line"]:
+            self.msg(f"    {frame['line']}")
+
+    def do_backtrace(self, arg: str):
+        """backtrace [-e | -b] [count]
+
+        Show the frames, newest first. With -e, show only the frames
+        for Mathics3 expressions; with -b, only Builtin eval functions."""
+        kind = None
+        count = None
+        for word in arg.split():
+            if word == "-e":
+                kind = "expression"
+            elif word == "-b":
+                kind = "builtin"
+            elif word.isdigit():
+                count = int(word)
+            else:
+                self.msg(f"** Bad backtrace argument: {word}")
+                return
+        shown = 0
+        for index, frame in enumerate(self.frames):
+            if kind is not None and frame["kind"] != kind:
+                continue
+            marker = "->" if index == self.curindex else "##"
+            if kind is not None:
+                marker = f"{kind[0].upper()}{'>' if index == self.curindex else ':'}"
+            self.print_frame(index, marker)
+            shown += 1
+            if count is not None and shown >= count:
+                break
+
+    do_bt = do_where = do_backtrace
+
+    def move_to(self, index: int):
+        if not 0 <= index < len(self.frames):
+            self.msg(f"** Frame number must be from 0 to {len(self.frames) - 1}.")
+            return
+        self.curindex = index
+        self.print_frame(index, "->")
+
+    def do_frame(self, arg: str):
+        """frame N
+
+        Make frame N, as numbered by "backtrace", the current frame."""
+        try:
+            self.move_to(int(arg))
+        except ValueError:
+            self.msg("** Expecting a frame number.")
+
+    def do_up(self, arg: str):
+        """up [N]
+
+        Move N frames, 1 by default, toward older frames."""
+        try:
+            self.move_to(self.curindex + int(arg or 1))
+        except ValueError:
+            self.msg("** Expecting a number of frames.")
+
+    def do_down(self, arg: str):
+        """down [N]
+
+        Move N frames, 1 by default, toward newer frames."""
+        try:
+            self.move_to(self.curindex - int(arg or 1))
+        except ValueError:
+            self.msg("** Expecting a number of frames.")
+
+    def do_printelement(self, arg: str):
+        """printelement [name]
+
+        Print the Mathics3 expression or Builtin call of the current
+        frame, or the summary of local variable "name" in it."""
+        frame = self.frames[self.curindex]
+        if not arg:
+            self.msg(frame.get("element") or "** This frame is not for a Mathics3 element.")
+            return
+        local_vars: Dict[str, str] = frame["locals"]
+        if arg not in local_vars:
+            self.msg(f"** No local variable {arg} was saved for this frame.")
+            return
+        self.msg(local_vars[arg])
+
+    do_pe = do_printelement
+
+    def do_info(self, arg: str):
+        """info locals | exception | events [count] | shadowstack
+
+        Show the local variables of the current frame, the exception
+        with its Python traceback, the last "count" recorded events, or
+        the shadow stack."""
+        words = arg.split()
+        what = words[0] if words else ""
+        if what == "locals":
+            frame = self.frames[self.curindex]
+            for name, summary in frame["locals"].items():
+                self.msg(f"{name} = {summary}")
+            if frame.get("locals_omitted"):
+                self.msg(f"... and {frame['locals_omitted']} more not saved")
+        elif what == "exception":
+            self.msg("".join(self.report["exception"]["traceback"]).rstrip())
+        elif what == "events":
+            events = self.report.get("events")
+            if not events:
+                self.msg("No events were recorded.")
+                return
+            count = int(words[1]) if len(words) > 1 and words[1].isdigit() else len(events)
+            for event in events[-count:]:
+                text = event["element"]
+                if event["orig_element"] is not None:
+                    arrow = " -> " if event["status"] == "Rewriting" else " = "
+                    text = event["orig_element"] + arrow + text
+                self.msg(
+                    f"#{event['number']} depth {event['depth']} {event['status']}: {text}"
+                )
+        elif what == "shadowstack":
+            entries = self.report.get("shadow_stack")
+            if not entries:
+                self.msg("No shadow stack was kept.")
+                return
+            for j, entry in enumerate(reversed(entries)):
+                self.msg(f"{j} ({entry['depth']}) {entry['element']}")
+        else:
+            self.msg('** Expecting "locals", "exception", "events" or "shadowstack".')
+
+    def do_quit(self, arg: str):
+        """quit
+
+        Stop browsing."""
+        return True
+
+    do_exit = do_q = do_quit
+
+    def do_EOF(self, arg: str):
+        self.msg("")
+        return True
+
+
+def browse(path: str):
+    with open(path) as f:
+        report = json.load(f)
+    if report.get("type") != "postmortem":
+        raise ValueError(f"{path} is not a post-mortem report")
+    ReportBrowser(report).cmdloop()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print(f"usage: {sys.argv[0]} REPORT")
+        sys.exit(1)
+    browse(sys.argv[1])
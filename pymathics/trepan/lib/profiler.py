@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+#
+#   Copyright (C) 2024 Rocky Bernstein <rocky@gnu.org>
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""A sampling profiler of Mathics3 evaluation, for live processes.
+
+Nothing in evaluation is hooked, so a process doesn't need tracing
+turned on, or a restart, to be profiled. Instead, while the profiler
+runs, a background thread looks at the Python frames of every other
+thread each INTERVAL seconds, with sys._current_frames(), and sorts
+them into Mathics3 expression and Builtin frames the same way the
+stack dump in pymathics.trepan.lib.stackdump does.
+
+From the samples we get:
+
+* for each Builtin eval function, the time spent in it ("total") and
+  the time spent in it with no other Builtin eval function called
+  from it ("self"), and
+* folded stacks: one line per distinct Mathics3 stack, with the
+  frames, oldest first, separated by ";" and followed by the number of
+  samples. This is the input that flame graph tools take.
+
+Times are the number of samples times the time between samples, so
+they are estimates, and short calls may be missed.
+
+The profiler is usually started and stopped by a signal ("handle USR2
+profile", or DebugProfile[]). When it stops, the profile is written to
+a file named after the process id and the time.
+"""
+
+import os
+import os.path as osp
+import sys
+import threading
+from collections import Counter
+from datetime import datetime
+from time import perf_counter, sleep
+from typing import Optional
+
+from pymathics.trepan.lib.stackdump import mathics_frames
+
+# Seconds between samples.
+INTERVAL = 0.005
+
+# Most lines in the per-Builtin table.
+MAX_BUILTINS = 50
+
+
+class SamplingProfiler:
+    def __init__(self, interval: float = INTERVAL):
+        self.interval = interval
+        self.thread: Optional[threading.Thread] = None
+        self.stop_event = threading.Event()
+        self.reset()
+
+    def reset(self):
+        # Folded stack -> number of samples.
+        self.stacks: Counter = Counter()
+        # Builtin eval function call -> samples
+        self.self_samples: Counter = Counter()
+        self.total_samples: Counter = Counter()
+        self.samples = 0
+        self.start_time = self.stop_time = 0.0
+        self.started_at: Optional[datetime] = None
+
+    @property
+    def running(self) -> bool:
+        return self.thread is not None
+
+    def start(self):
+        """Start sampling afresh."""
+        if self.running:
+            return
+        self.reset()
+        self.stop_event.clear()
+        self.started_at = datetime.now()
+        self.start_time = perf_counter()
+        self.thread = threading.Thread(
+            target=self.run, name="Mathics3 profiler", daemon=True
+        )
+        self.thread.start()
+
+    def stop(self):
+        """Stop sampling. The samples taken are kept."""
+        if not self.running:
+            return
+        self.stop_event.set()
+        # This can be called from a signal handler in the thread being
+        # profiled, so don't wait long for the sampler to notice.
+        self.thread.join(self.interval * 10)
+        self.thread = None
+        self.stop_time = perf_counter()
+
+    def run(self):
+        own_id = threading.get_ident()
+        while not self.stop_event.is_set():
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                try:
+                    self.sample(thread_id, frame)
+                except Exception:
+                    # The thread's frames changed under us; a lost
+                    # sample is better than a lost profiler.
+                    pass
+            self.samples += 1
+            sleep(self.interval)
+
+    def sample(self, thread_id: int, frame):
+        entries = mathics_frames(frame)
+        if not entries:
+            return
+        entries.reverse()
+        thread_name = thread_names().get(thread_id, str(thread_id))
+        self.stacks[";".join([thread_name] + [text for _, text in entries])] += 1
+        builtins = [text for kind, text in entries if kind == "B"]
+        if builtins:
+            self.self_samples[builtins[-1]] += 1
+            for call in set(builtins):
+                self.total_samples[call] += 1
+
+    def write(self, path: str):
+        """Write the profile to ``path``. The per-Builtin table is in
+        comment lines starting with "#", so that the rest of the file
+        can go straight to a flame graph tool."""
+        elapsed = (self.stop_time or perf_counter()) - self.start_time
+        # The time a sample stands for, measured rather than assumed,
+        # since sleeping and sampling take longer than INTERVAL.
+        seconds_per_sample = elapsed / self.samples if self.samples else 0.0
+        with open(path, "w") as f:
+            started = self.started_at or datetime.now()
+            f.write(
+                f"# Mathics3 profile of process {os.getpid()}, started"
+                f" {started.isoformat(timespec='seconds')}\n"
+                f"# {elapsed:.3f}s, {self.samples} samples"
+                f" of {seconds_per_sample * 1000:.2f}ms\n#\n"
+            )
+            f.write("#   self (s)  total (s)  Builtin eval function\n")
+            for call, total in self.total_samples.most_common(MAX_BUILTINS):
+                f.write(
+                    f"# {self.self_samples[call] * seconds_per_sample:10.3f}"
+                    f" {total * seconds_per_sample:10.3f}  {call}\n"
+                )
+            f.write("#\n# Folded stacks: frames oldest first, then samples\n")
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+def thread_names() -> dict:
+    return {thread.ident: thread.name for thread in threading.enumerate()}
+
+
+def profile_path(directory: str) -> str:
+    """Return the path in ``directory`` to write a profile of this
+    process to, now."""
+    timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    return osp.join(directory, f"mathics3-profile-{os.getpid()}-{timestamp}.txt")
+
+
+# The profiler that signals start and stop.
+profiler = SamplingProfiler()
+
+
+def toggle(directory: str) -> Optional[str]:
+    """Start the profiler if it isn't running. Otherwise stop it, write
+    the profile to a new file in ``directory`` and return its path."""
+    if not profiler.running:
+        profiler.start()
+        return None
+    profiler.stop()
+    path = profile_path(directory)
+    profiler.write(path)
+    return path
+
+
+if __name__ == "__main__":
+    from mathics.session import MathicsSession
+
+    session = MathicsSession()
+    profiler.start()
+    session.evaluate("Table[Expand[(x + y)^k], {k, 40}]; Integrate[x^2 Sin[x], x]")
+    print(toggle("."))
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+#
+#   Copyright (C) 2024 Rocky Bernstein <rocky@gnu.org>
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""A recording of Mathics3 evaluation events, for moving back through.
+
+When recording is on ("set record on"), the evaluation hooks in
+pymathics.trepan.tracing append an entry for each evaluate-entry,
+evaluate-result and rewrite event. An entry holds references to the
+expressions involved. Expressions are not changed once built, and
+share their unchanged parts, so nothing needs to be copied.
+
+Only the newest ``window`` entries are kept ("set recordwindow");
+older ones are dropped as new ones come in.
+
+The "reverse-step", "reverse-finish" and "goto" commands move a
+cursor through the entries and show the expression and depth there.
+Nothing is run again. Recording a new event moves the cursor back to
+the present.
+"""
+
+import itertools
+from collections import deque
+from typing import Any, Deque, NamedTuple, Optional
+
+from pymathics.trepan.lib.format import format_element, pygments_format
+
+# When True, the evaluation hooks record events.
+enabled: bool = False
+
+DEFAULT_WINDOW = 10000
+
+
+class RecordedEvent(NamedTuple):
+    number: int  # Event numbers count up from 1 and are never reused
+    status: str  # "Evaluating", "Returning" or "Rewriting"
+    depth: int  # evaluation.recursion_depth at the event
+    expr: Any  # The expression being evaluated, or the result
+    orig_expr: Any  # For results, the expression that was evaluated
+
+
+# The recorded events, oldest first.
+events: Deque[RecordedEvent] = deque(maxlen=DEFAULT_WINDOW)
+
+_event_numbers = itertools.count(1)
+
+# Number of the event the replay commands are at. None is the present,
+# that is, the newest event.
+cursor: Optional[int] = None
+
+
+def record(status: str, expr, depth: int, orig_expr=None):
+    """Record an evaluation event. The arguments are those that the
+    evaluation hooks get."""
+    global cursor
+    if isinstance(expr, tuple):
+        # The result of a rewrite step: (new expression, whether it
+        # changed).
+        expr, changed = expr
+        if not changed:
+            return
+        status = "Rewriting"
+    events.append(RecordedEvent(next(_event_numbers), status, depth, expr, orig_expr))
+    cursor = None
+
+
+def clear():
+    global cursor
+    events.clear()
+    cursor = None
+
+
+def set_window(size: int):
+    """Keep at most the newest ``size`` events."""
+    global events
+    events = deque(events, maxlen=size)
+
+
+def window() -> int:
+    return events.maxlen
+
+
+def evicted() -> int:
+    """Return the number of events dropped to stay within the window."""
+    if not events:
+        return 0
+    return events[0].number - 1
+
+
+def index_of(number: int) -> Optional[int]:
+    """Return the position in ``events`` of event ``number``, or None
+    if it is not recorded."""
+    if not events:
+        return None
+    index = number - events[0].number
+    if 0 <= index < len(events):
+        return index
+    return None
+
+
+def cursor_index() -> Optional[int]:
+    """Return the position in ``events`` of the cursor, or None if
+    nothing is recorded."""
+    if not events:
+        return None
+    if cursor is None:
+        return len(events) - 1
+    return index_of(cursor)
+
+
+def move_to(index: int) -> RecordedEvent:
+    """Put the cursor at position ``index`` of ``events``, and return
+    the event there."""
+    global cursor
+    event = events[index]
+    cursor = event.number
+    return event
+
+
+def enclosing_entry(index: int) -> Optional[int]:
+    """Return the position of the "Evaluating" event that started the
+    evaluation that event ``index`` is part of, or None if that
+    is no longer recorded."""
+    depth = events[index].depth
+    for i in range(index - 1, -1, -1):
+        event = events[i]
+        if event.status == "Evaluating" and event.depth < depth:
+            return i
+    return None
+
+
+def format_event(event: RecordedEvent, style) -> str:
+    """Return a one-line description of ``event``."""
+    if event.orig_expr is None:
+        text = format_element(event.expr)
+    else:
+        arrow = " -> " if event.status == "Rewriting" else " = "
+        text = format_element(event.orig_expr) + arrow + format_element(event.expr)
+    return (
+        f"#{event.number} depth {event.depth} {event.status}: "
+        f"{pygments_format(text, style)}"
+    )
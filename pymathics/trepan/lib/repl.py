@@ -21,6 +21,7 @@ This module contains the ``DebugREPL`` class
 """
 
 import sys
+import threading
 
 from term_background import is_dark_background
 from typing import Any
@@ -62,16 +63,21 @@ class DebugREPL:
 
         self.thread = None
         self.eval_string = None
+        self.completions = None  # Completions for the line being completed
         self.settings = DEBUGGER_SETTINGS.copy()
         self.settings["events"] = {
             "Get",  # Get[]
+            "Numpy",  # NumPy call
             "SymPy",  # SymPy call
             "apply",  # Builtin function call
             "evaluate-entry",  # before evaluate()
             "evaluate-result",  # after evaluate()
             "evalMethod",  # calling a built-in evaluation method Class.eval_xxx()
+            "evalFunction",  # calling an eval_Xxx() function of mathics.eval
             "debugger",  # explicit call via "Debugger"
             "mpmath",  # mpmath call
+            "parse",  # after parsing Mathics3 input
+            "watch",  # a watched Symbol's values changed
         }
         self.settings["style"] = default_style
 
@@ -112,7 +118,14 @@ class DebugREPL:
             self.program_sys_argv = None
             pass
 
-        self.sigmgr = SignalManager(self)
+        # signal.signal() can only be called from the main thread. When
+        # we are built in a background thread, see
+        # pymathics.trepan.tracing.prewarm_debugger(), the signal manager
+        # is created later by get_debugger().
+        if threading.current_thread() is threading.main_thread():
+            self.sigmgr = SignalManager(self)
+        else:
+            self.sigmgr = None
 
         # Were we requested to activate immediately?
         if get_option("activate"):
@@ -126,9 +139,13 @@ class DebugREPL:
         for `last_token`` that we are in ``state``.
         """
         if hasattr(self.core.processor, "completer"):
-            string_seen = get_line_buffer() or last_token
-            results = self.core.processor.completer(string_seen, state)
-            return results[state]
+            # readline calls us with state 0, 1, 2, ... until we return
+            # None, so work out the completions just once per line.
+            if state == 0 or self.completions is None:
+                string_seen = get_line_buffer() or last_token
+                self.completions = self.core.processor.completer(string_seen, state)
+            if state < len(self.completions):
+                return self.completions[state]
         return
 
     pass
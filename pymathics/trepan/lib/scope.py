@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+#
+#   Copyright (C) 2024 Rocky Bernstein <rocky@gnu.org>
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Limit evaluation tracing to what goes on inside some expressions.
+
+With TraceActivate[evaluation -> True, Scope -> "Integrate"], the
+evaluation trace shows only the evaluation of Integrate[...]
+expressions and of what they lead to, much as Trace[expr, form] does.
+"ScopeDepth -> n" limits it further to n levels below the expression
+that started the scope.
+
+Scope is tracked by recursion depth, for each thread on its own.
+Once an expression in scope starts to be evaluated at depth
+``state.start_depth``, the events that follow are in scope until its
+evaluation returns at that same depth. In between, events are at deeper
+levels. So trace_evaluate() lets an event through when its depth is in
+start_depth+1 .. max_depth, which it tests without calling anything
+here; admit() is called only for the other events.
+"""
+
+import sys
+import threading
+from typing import FrozenSet, Optional
+
+# Fully-qualified names of the heads whose evaluation starts a scope.
+# None means that tracing isn't scoped.
+names: Optional[FrozenSet[str]] = None
+
+# How many levels below the expression that starts the scope to trace.
+# None means all levels.
+levels: Optional[int] = None
+
+
+class ScopeState(threading.local):
+    """The scope that a thread's evaluation is in. Threads evaluate at
+    their own recursion depths, so each has its own."""
+
+    def __init__(self):
+        # The recursion depth of the expression whose evaluation
+        # started the scope we are in, and the deepest level traced.
+        # Both are -1 when we are not in a scope, so no depth is in
+        # the range.
+        self.start_depth = -1
+        self.max_depth = -1
+
+
+state = ScopeState()
+
+
+def set_scope(scope_names: Optional[FrozenSet[str]], scope_levels: Optional[int]):
+    """Trace only inside the evaluation of expressions whose head is in
+    ``scope_names``, up to ``scope_levels`` levels below them. None for
+    ``scope_names`` stops scoping."""
+    global names, levels
+    names = scope_names
+    levels = scope_levels
+    leave()
+
+
+def leave():
+    state.start_depth = state.max_depth = -1
+
+
+def admit(expr, depth: int, status: str) -> bool:
+    """Return True if an evaluation event for ``expr`` at recursion
+    depth ``depth``, which is outside start_depth+1 .. max_depth, is in
+    scope, entering or leaving the scope as needed."""
+    if state.start_depth >= 0:
+        if depth > state.start_depth:
+            # In the scope, but too deep.
+            return False
+        # The evaluation that started the scope is done. When it is
+        # the scope's "Returning:" event, that is still shown.
+        in_scope = depth == state.start_depth and status == "Returning"
+        leave()
+        if in_scope:
+            return True
+    if status != "Evaluating" or not hasattr(expr, "get_head_name"):
+        return False
+    if expr.get_head_name() not in names:
+        return False
+    state.start_depth = depth
+    state.max_depth = depth + levels if levels is not None else sys.maxsize
+    return True
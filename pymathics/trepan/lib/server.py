@@ -0,0 +1,536 @@
+# -*- coding: utf-8 -*-
+#
+#   Copyright (C) 2024 Rocky Bernstein <rocky@gnu.org>
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""A debugger interface served over a local socket.
+
+With this, a long-running Mathics3 process can be debugged from another
+terminal without the debugger owning the process's stdin and stdout.
+Any number of clients can attach. The first one is the controller:
+it gets prompts and sends debugger commands. The others are observers,
+which see everything the debugger prints. When the controller goes
+away, the client that attached next after it takes over.
+
+Every message is a frame: a 4-byte big-endian length followed by that
+many bytes of UTF-8. The first character of the text is a code from
+trepan.interfaces.comcodes, or one of the codes below, and the rest is
+the message.
+
+Each client has a bounded queue of frames and its own writer thread.
+The debugged program only ever adds to the queues, so a client that
+reads slowly, or not at all, can't hold up evaluation. If a client
+falls that far behind, frames for it are dropped, and it is told how
+many when there is room again.
+
+When no controller is attached, the debugger doesn't wait for
+commands at a stop; it continues as if "continue" had been typed.
+Observers still see the stop.
+
+Anyone who attaches can run Python code in the debugged process, so
+clients are checked. A Unix-domain socket is made readable and
+writable by its owner only. A TCP port can be reached by every user on
+the host, so the server makes up a random token, and a client's first
+frame must be an AUTH frame with it. Until then, the client is sent
+nothing; if the token is wrong, or doesn't come within AUTH_TIMEOUT
+seconds, it is disconnected. The client below reads the token from the
+environment variable in TOKEN_ENV, or asks for it.
+"""
+
+import hmac
+import os
+import queue
+import secrets
+import socket
+import struct
+import threading
+from typing import List, Optional, Tuple
+
+from trepan.interface import TrepanInterface
+from trepan.interfaces import comcodes as Mcomcodes
+
+# Codes in addition to those in trepan.interfaces.comcodes.
+CONTROLLER = "!"  # You are the controller
+OBSERVER = "o"  # You are an observer
+AUTH = "a"  # The client's token, for a TCP server
+
+FRAME_HEADER = struct.Struct(">I")
+
+# Largest frame we accept from a client. Commands are short.
+MAX_CLIENT_FRAME = 64 * 1024
+
+# How many frames a client can fall behind before we drop frames for it.
+CLIENT_QUEUE_SIZE = 1000
+
+# Commands given when there is nobody to ask.
+CONTINUE_COMMAND = "continue"
+
+DEFAULT_TCP_HOST = "127.0.0.1"
+LOCAL_TCP_HOSTS = ("127.0.0.1", "localhost", "::1")
+
+# Seconds a TCP client has to send its token.
+AUTH_TIMEOUT = 10.0
+
+# Environment variable the client reads a TCP server's token from.
+TOKEN_ENV = "MATHICS3_DEBUG_TOKEN"
+
+
+def pack_frame(code: str, text: str = "") -> bytes:
+    """Return the bytes of a frame with ``code`` and ``text``."""
+    data = (code + text).encode("utf-8")
+    return FRAME_HEADER.pack(len(data)) + data
+
+
+def recv_exact(sock: socket.socket, size: int) -> Optional[bytes]:
+    """Read exactly ``size`` bytes from ``sock``. Return None if the
+    connection is closed first."""
+    chunks = []
+    while size > 0:
+        chunk = sock.recv(min(size, 65536))
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def read_frame(sock: socket.socket) -> Optional[Tuple[str, str]]:
+    """Read a frame from ``sock`` and return its (code, text). Return
+    None when the connection is closed, or the frame is malformed."""
+    header = recv_exact(sock, FRAME_HEADER.size)
+    if header is None:
+        return None
+    (size,) = FRAME_HEADER.unpack(header)
+    if size == 0 or size > MAX_CLIENT_FRAME:
+        return None
+    data = recv_exact(sock, size)
+    if data is None:
+        return None
+    text = data.decode("utf-8", errors="replace")
+    return text[0], text[1:]
+
+
+def parse_address(address: str) -> Tuple[int, object]:
+    """Turn ``address`` into a socket family and socket address.
+
+    ``address`` is "unix:PATH", "tcp:PORT", "tcp:HOST:PORT" or just
+    PORT. TCP hosts must be the local host: the debugger can run
+    arbitrary Python code, and a token is all that guards the port.
+    """
+    if address.startswith("unix:"):
+        return socket.AF_UNIX, address[len("unix:") :]
+    if address.startswith("tcp:"):
+        address = address[len("tcp:") :]
+    host, _, port = address.rpartition(":")
+    host = host.strip("[]") or DEFAULT_TCP_HOST
+    if host not in LOCAL_TCP_HOSTS:
+        raise ValueError(f"TCP host must be the local host, not {host!r}")
+    try:
+        port_number = int(port)
+    except ValueError:
+        raise ValueError(f"bad port {port!r} in debug server address")
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    return family, (host, port_number)
+
+
+class ClientConnection:
+    """A client attached to the debug server, with the queue of frames
+    still to be sent to it and the thread that sends them."""
+
+    def __init__(self, server, sock: socket.socket, name: str):
+        self.server = server
+        self.sock = sock
+        self.name = name
+        self.frames: queue.Queue = queue.Queue(maxsize=CLIENT_QUEUE_SIZE)
+        self.dropped = 0
+        self.closed = False
+        self.writer = threading.Thread(
+            target=self.write_loop, name=f"Debug server writer {name}", daemon=True
+        )
+        self.reader = threading.Thread(
+            target=self.read_loop, name=f"Debug server reader {name}", daemon=True
+        )
+
+    def start(self):
+        self.writer.start()
+        self.reader.start()
+
+    def send(self, frame: bytes):
+        """Queue ``frame`` to be sent. This never blocks."""
+        if self.closed:
+            return
+        try:
+            if self.dropped:
+                notice = pack_frame(
+                    Mcomcodes.PRINT, f"** {self.dropped} messages dropped\n"
+                )
+                self.frames.put_nowait(notice)
+                self.dropped = 0
+            self.frames.put_nowait(frame)
+        except queue.Full:
+            self.dropped += 1
+
+    def write_loop(self):
+        while True:
+            frame = self.frames.get()
+            if frame is None:
+                break
+            try:
+                self.sock.sendall(frame)
+            except OSError:
+                break
+        self.close()
+
+    def read_loop(self):
+        while True:
+            try:
+                frame = read_frame(self.sock)
+            except OSError:
+                frame = None
+            if frame is None:
+                break
+            self.server.client_input(self, *frame)
+        self.close()
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            # Wakes up whichever of the reader and the writer is blocked.
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+        try:
+            self.frames.put_nowait(None)
+        except queue.Full:
+            pass
+        self.server.client_closed(self)
+
+
+class DebugServer:
+    """Listens on ``address`` for debugger clients. See the module
+    docstring for how clients and messages work."""
+
+    def __init__(self, address: str):
+        self.address = address
+        self.family, self.sockaddr = parse_address(address)
+        self.clients: List[ClientConnection] = []
+        self.controller: Optional[ClientConnection] = None
+        self.clients_lock = threading.Lock()
+
+        # Input from the controller: (code, text) pairs.
+        self.input: queue.Queue = queue.Queue()
+
+        # The prompt the debugger is waiting on, if any. A controller
+        # that attaches while we wait is sent it.
+        self.waiting_prompt: Optional[str] = None
+
+        # What a TCP client must send before it is let in. Unix-domain
+        # sockets are guarded by their file mode instead.
+        self.token: Optional[str] = None
+
+        self.listener = socket.socket(self.family, socket.SOCK_STREAM)
+        if self.family == socket.AF_UNIX:
+            if os.path.exists(self.sockaddr):
+                os.unlink(self.sockaddr)
+        else:
+            self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self.token = secrets.token_hex(16)
+        self.listener.bind(self.sockaddr)
+        if self.family == socket.AF_UNIX:
+            # Before listen(), so nobody else can have connected.
+            os.chmod(self.sockaddr, 0o600)
+        self.listener.listen()
+        if self.family != socket.AF_UNIX:
+            # In case port 0 was given, so the system picked one.
+            host, port = self.listener.getsockname()[:2]
+            self.address = f"tcp:{host}:{port}"
+        self.closed = False
+        self.client_count = 0
+        self.accept_thread = threading.Thread(
+            target=self.accept_loop, name="Debug server listener", daemon=True
+        )
+        self.accept_thread.start()
+
+    def accept_loop(self):
+        while not self.closed:
+            try:
+                sock, _ = self.listener.accept()
+            except OSError:
+                break
+            if self.token is None:
+                self.add_client(sock)
+            else:
+                # Wait for the token in a thread of its own, so that a
+                # client that never sends it doesn't keep others out.
+                threading.Thread(
+                    target=self.authenticate,
+                    args=(sock,),
+                    name="Debug server authentication",
+                    daemon=True,
+                ).start()
+
+    def authenticate(self, sock: socket.socket):
+        """Let the client on ``sock`` in if the first thing it sends is
+        our token, and disconnect it otherwise."""
+        try:
+            sock.settimeout(AUTH_TIMEOUT)
+            frame = read_frame(sock)
+            sock.settimeout(None)
+        except OSError:
+            frame = None
+        if (
+            frame is None
+            or frame[0] != AUTH
+            or not hmac.compare_digest(frame[1].encode(), self.token.encode())
+            or self.closed
+        ):
+            sock.close()
+            return
+        self.add_client(sock)
+
+    def add_client(self, sock: socket.socket):
+        with self.clients_lock:
+            self.client_count += 1
+            client = ClientConnection(self, sock, str(self.client_count))
+            self.clients.append(client)
+            if self.controller is None:
+                self.set_controller(client)
+            else:
+                client.send(pack_frame(OBSERVER))
+        client.start()
+
+    def set_controller(self, client: Optional[ClientConnection]):
+        """Make ``client`` the controller. Called with clients_lock held."""
+        self.controller = client
+        # Anything typed ahead by a previous controller is stale.
+        while not self.input.empty():
+            self.input.get_nowait()
+        if client is not None:
+            client.send(pack_frame(CONTROLLER))
+            if self.waiting_prompt is not None:
+                client.send(pack_frame(Mcomcodes.PROMPT, self.waiting_prompt))
+
+    def client_input(self, client: ClientConnection, code: str, text: str):
+        """Called from a client's reader thread with a frame it sent.
+        Only the controller's input counts."""
+        if client is self.controller:
+            if code == Mcomcodes.COMMAND:
+                # Let observers see what is being done.
+                self.broadcast(Mcomcodes.PRINT, text + "\n", observers_only=True)
+            self.input.put((code, text))
+
+    def client_closed(self, client: ClientConnection):
+        with self.clients_lock:
+            if client in self.clients:
+                self.clients.remove(client)
+            if client is self.controller:
+                self.set_controller(self.clients[0] if self.clients else None)
+        if self.controller is None:
+            # Wake up read_reply(), if it is waiting.
+            self.input.put((Mcomcodes.QUIT, ""))
+
+    def broadcast(self, code: str, text: str = "", observers_only: bool = False):
+        """Send a frame to every client, or just to the observers if
+        ``observers_only`` is True. This never blocks."""
+        frame = pack_frame(code, text)
+        with self.clients_lock:
+            clients = [
+                client
+                for client in self.clients
+                if not (observers_only and client is self.controller)
+            ]
+        for client in clients:
+            client.send(frame)
+
+    def read_reply(self, code: str, prompt: str) -> Optional[str]:
+        """Send ``prompt`` with ``code`` to the controller, and return
+        what it sends back. Return None if there is no controller, or it
+        goes away before answering."""
+        with self.clients_lock:
+            controller = self.controller
+            if controller is None:
+                return None
+            self.waiting_prompt = prompt if code == Mcomcodes.PROMPT else None
+            controller.send(pack_frame(code, prompt))
+        try:
+            while True:
+                reply_code, text = self.input.get()
+                if reply_code == Mcomcodes.QUIT and self.controller is None:
+                    return None
+                if reply_code in (Mcomcodes.COMMAND, Mcomcodes.CONFIRM_REPLY):
+                    return text
+        finally:
+            self.waiting_prompt = None
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self.listener.close()
+        except OSError:
+            pass
+        if self.family == socket.AF_UNIX and os.path.exists(self.sockaddr):
+            os.unlink(self.sockaddr)
+        with self.clients_lock:
+            clients = list(self.clients)
+        for client in clients:
+            client.send(pack_frame(Mcomcodes.QUIT))
+            try:
+                client.frames.put_nowait(None)
+            except queue.Full:
+                client.close()
+
+
+class ServerInterface(TrepanInterface):
+    """Debugger interface whose input and output go through a
+    DebugServer."""
+
+    def __init__(self, server: DebugServer):
+        self.server = server
+        self.input = self.output = None
+        self.histfile = None
+        self.interactive = True
+        # The interfaces to go back to when the server is stopped.
+        self.saved_intf: list = []
+
+    def close(self):
+        self.server.close()
+
+    def confirm(self, prompt: str, default: bool) -> bool:
+        code = Mcomcodes.CONFIRM_TRUE if default else Mcomcodes.CONFIRM_FALSE
+        while True:
+            reply = self.server.read_reply(code, prompt)
+            if reply is None:
+                return default
+            reply = reply.strip().lower()
+            if reply in ("y", "yes"):
+                return True
+            elif reply in ("n", "no"):
+                return False
+            elif reply == "":
+                return default
+            self.msg("Please answer y or n.")
+
+    def errmsg(self, msg: str, prefix: str = "** "):
+        self.msg(f"{prefix}{msg}")
+
+    def finalize(self, last_wishes=None):
+        self.close()
+
+    def msg(self, msg: str):
+        self.server.broadcast(Mcomcodes.PRINT, msg + "\n")
+
+    def msg_nocr(self, msg: str):
+        self.server.broadcast(Mcomcodes.PRINT, msg)
+
+    def read_command(self, prompt: str = "") -> str:
+        return self.readline(prompt)
+
+    def readline(self, prompt: str = "", add_to_history=True) -> str:
+        # Observers see the prompt too, so they can tell where a stop's
+        # output ends.
+        self.server.broadcast(Mcomcodes.PRINT, prompt, observers_only=True)
+        line = self.server.read_reply(Mcomcodes.PROMPT, prompt)
+        if line is None:
+            # Nobody is in control. Don't stop the program.
+            return CONTINUE_COMMAND
+        return line
+
+
+def start_server(dbg, address: str) -> DebugServer:
+    """Start a DebugServer on ``address`` and have debugger ``dbg``
+    talk through it instead of the interfaces it has now. If there
+    already is a server, it is stopped first."""
+    stop_server(dbg)
+    server = DebugServer(address)
+    intf = ServerInterface(server)
+    intf.saved_intf = list(dbg.intf)
+    # The command processor shares this list.
+    dbg.intf[:] = [intf]
+    return server
+
+
+def stop_server(dbg) -> bool:
+    """Stop the DebugServer that debugger ``dbg`` is using, if any, and
+    go back to the interfaces it had before. Return True if there was
+    a server to stop."""
+    intf = dbg.intf[-1]
+    if not isinstance(intf, ServerInterface):
+        return False
+    dbg.intf[:] = intf.saved_intf
+    intf.close()
+    return True
+
+
+def run_client(address: str, token: Optional[str] = None):
+    """Attach to the debug server at ``address``, show what it sends
+    and, while we are the controller, send it the lines typed in. A TCP
+    server is sent ``token``; if that is None, it is read from the
+    environment variable in TOKEN_ENV, or asked for."""
+    import sys
+
+    family, sockaddr = parse_address(address)
+    if family != socket.AF_UNIX and token is None:
+        token = os.environ.get(TOKEN_ENV)
+        if token is None:
+            import getpass
+
+            token = getpass.getpass("Debug server token: ")
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.connect(sockaddr)
+    if family != socket.AF_UNIX:
+        sock.sendall(pack_frame(AUTH, token.strip()))
+    attached = False
+    while True:
+        frame = read_frame(sock)
+        if frame is None or frame[0] == Mcomcodes.QUIT:
+            if not attached and family != socket.AF_UNIX:
+                print("** the server closed the connection; was the token right?")
+            break
+        attached = True
+        code, text = frame
+        if code == Mcomcodes.PRINT:
+            sys.stdout.write(text)
+            sys.stdout.flush()
+        elif code == CONTROLLER:
+            print("** attached as the controller")
+        elif code == OBSERVER:
+            print("** attached as an observer")
+        elif code == Mcomcodes.PROMPT:
+            try:
+                line = input(text)
+            except EOFError:
+                break
+            sock.sendall(pack_frame(Mcomcodes.COMMAND, line))
+        elif code in (Mcomcodes.CONFIRM_TRUE, Mcomcodes.CONFIRM_FALSE):
+            try:
+                line = input(f"{text}? ")
+            except EOFError:
+                line = ""
+            sock.sendall(pack_frame(Mcomcodes.CONFIRM_REPLY, line))
+    sock.close()
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) != 2:
+        print(f"usage: {sys.argv[0]} unix:PATH | tcp:[HOST:]PORT")
+        print(f"For a TCP port, the token is read from ${TOKEN_ENV}, or asked for.")
+        sys.exit(1)
+    run_client(sys.argv[1])
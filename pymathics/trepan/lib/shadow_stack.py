@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+#
+#   Copyright (C) 2024 Rocky Bernstein <rocky@gnu.org>
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""A Mathics3 evaluation "shadow" stack.
+
+Reconstructing the Mathics3 call chain from Python frames means walking
+every frame and inspecting its ``self``. When the shadow stack is
+enabled ("set shadowstack on"), the evaluation and apply hooks in
+pymathics.trepan.tracing push an entry on the way in and pop it on the
+way out instead. The Mathics3 stack is then available in O(depth) and
+without any frame introspection.
+
+Each thread has its own stack. Only the owning thread pushes and pops;
+other threads and signal handlers read a snapshot of it.
+"""
+
+import sys
+import threading
+from time import perf_counter
+from typing import Any, Dict, List, NamedTuple, Optional
+
+# When True, the evaluation and apply hooks maintain the shadow stack.
+enabled: bool = False
+
+
+class ShadowFrame(NamedTuple):
+    expr: Any  # The expression being evaluated or applied
+    head: Any  # Its head; Symbols are unique, so this compares by identity
+    depth: int  # evaluation.recursion_depth when the entry was pushed
+    start: float  # perf_counter() value when the entry was pushed
+
+
+# Thread ident -> the shadow stack of that thread; newest entry last.
+thread_stacks: Dict[int, List[ShadowFrame]] = {}
+
+_thread_local = threading.local()
+
+
+def current_stack() -> List[ShadowFrame]:
+    """Return the shadow stack for the running thread, creating and
+    registering it if this is the first time we have seen the thread."""
+    try:
+        return _thread_local.stack
+    except AttributeError:
+        stack = _thread_local.stack = []
+        thread_stacks[threading.get_ident()] = stack
+        return stack
+
+
+def push(expr, depth: int):
+    """Record that evaluation of ``expr`` has started at recursion
+    depth ``depth``. Atoms, which have no head, are not recorded."""
+    head = getattr(expr, "head", None)
+    if head is None:
+        return
+    stack = current_stack()
+
+    # If an evaluation was aborted by an exception, its return hook never
+    # ran. Anything deeper than where we are now must be such a leftover.
+    while stack and stack[-1].depth > depth:
+        stack.pop()
+    stack.append(ShadowFrame(expr, head, depth, perf_counter()))
+
+
+def pop(expr):
+    """Record that evaluation of ``expr`` has finished.
+
+    We remove the most recent entry for ``expr`` along with anything
+    pushed after it. If ``expr`` is not on the stack, for example
+    because tracing was turned on in the middle of its evaluation, the
+    stack is left alone.
+    """
+    if getattr(expr, "head", None) is None:
+        return
+    stack = current_stack()
+    for i in range(len(stack) - 1, -1, -1):
+        if stack[i].expr is expr:
+            del stack[i:]
+            return
+
+
+def get_stack(thread_id: Optional[int] = None) -> List[ShadowFrame]:
+    """Return a copy of the shadow stack of ``thread_id``, or of the
+    running thread if ``thread_id`` is None. The newest entry is last."""
+    if thread_id is None:
+        thread_id = threading.get_ident()
+    return list(thread_stacks.get(thread_id, ()))
+
+
+def get_all_stacks() -> Dict[int, List[ShadowFrame]]:
+    """Return a copy of the shadow stack of every live thread. Stacks
+    of threads that have finished are dropped along the way."""
+    live_threads = sys._current_frames()
+    for thread_id in list(thread_stacks.keys()):
+        if thread_id not in live_threads:
+            thread_stacks.pop(thread_id, None)
+    return {
+        thread_id: list(stack)
+        for thread_id, stack in list(thread_stacks.items())
+        if stack
+    }
+
+
+def clear():
+    """Empty the shadow stack of every thread."""
+    for stack in list(thread_stacks.values()):
+        stack.clear()
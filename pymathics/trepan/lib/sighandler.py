@@ -24,8 +24,11 @@
 #
 #
 import signal
+from typing import Optional
 
+from pymathics.trepan.lib import profiler
 from pymathics.trepan.lib.stack import format_stack_entry, print_expression_stack
+from pymathics.trepan.lib.stackdump import dump_all_stacks
 from trepan.lib.sighandler import (
     fatal_signals,
     SigHandler as TrepanSignalHandler,
@@ -96,10 +99,101 @@ class SignalManager(TrepanSignalManager):
             pass
         return True
 
+    # Actions we add to trepan3k's, each taking a file or directory
+    # name, and the SigHandler attribute each sets.
+    PATH_ACTIONS = {"dump": "dump_path", "profile": "profile_dir"}
+
+    def action(self, arg):
+        """Like trepan3k's action(), but also take "dump FILE", which
+        appends the Mathics3 stack of every thread to FILE each time the
+        signal comes in, "profile DIR", which starts and stops the
+        Mathics3 profiler and writes profiles to DIR, and "nodump" and
+        "noprofile"."""
+        args = arg.split() if arg else []
+        if not any(
+            word in self.PATH_ACTIONS or word[2:] in self.PATH_ACTIONS
+            for word in args[1:]
+        ):
+            return super().action(arg)
+
+        signame, rest = args[0], []
+        words = iter(args[1:])
+        result = True
+        for word in words:
+            if word in self.PATH_ACTIONS:
+                path = next(words, None)
+                if path is None:
+                    self.dbgr.intf[-1].errmsg(f"{word} needs a file or directory")
+                    return None
+                result = self.set_path_action(signame, word, path)
+            elif word.startswith("no") and word[2:] in self.PATH_ACTIONS:
+                result = self.set_path_action(signame, word[2:], None)
+            else:
+                rest.append(word)
+            if not result:
+                return result
+        if rest:
+            return super().action(" ".join([signame] + rest))
+        return result
+
+    def set_path_action(self, signame: str, action: str, path: Optional[str]):
+        """Turn on ``action``, "dump" or "profile", with ``path`` for signal
+        ``signame``, or turn it off if ``path`` is None. Turning an action
+        on turns stopping off."""
+        signame = self.is_name_or_number(signame)
+        if not signame or signame in fatal_signals:
+            return None
+        if signame not in self.sigs and not self.initialize_handler(signame):
+            return None
+        handler = self.sigs[signame]
+        if action == "profile" and path is None and profiler.profiler.running:
+            if handler.profile_dir is not None:
+                # Don't lose the profile being taken.
+                profiler.toggle(handler.profile_dir)
+        setattr(handler, self.PATH_ACTIONS[action], path)
+        if path is not None:
+            handler.b_stop = False
+        return self.check_and_adjust_sighandler(signame, self.sigs)
+
+    def set_dump(self, signame: str, path: Optional[str]):
+        """Have signal ``signame`` append the Mathics3 stack of every
+        thread to ``path`` and not stop, or stop dumping if ``path`` is
+        None."""
+        return self.set_path_action(signame, "dump", path)
+
+    def set_profile(self, signame: str, directory: Optional[str]):
+        """Have signal ``signame`` start and stop the Mathics3 profiler,
+        writing profiles to ``directory``, and not stop; or stop doing
+        that if ``directory`` is None."""
+        return self.set_path_action(signame, "profile", directory)
+
+    def print_info_signal_entry(self, signame):
+        super().print_info_signal_entry(signame)
+        handler = self.sigs.get(signame)
+        if handler is None:
+            return
+        if handler.dump_path is not None:
+            self.dbgr.intf[-1].msg(
+                f"{'':14}Mathics3 stacks are written to {handler.dump_path}"
+            )
+        if handler.profile_dir is not None:
+            self.dbgr.intf[-1].msg(
+                f"{'':14}Starts and stops the Mathics3 profiler;"
+                f" profiles go in {handler.profile_dir}"
+            )
+
     pass
 
 
 class SigHandler(TrepanSignalHandler):
+    # When not None, the Mathics3 stack of every thread is appended to
+    # this file when the signal comes in.
+    dump_path: Optional[str] = None
+
+    # When not None, the signal starts the Mathics3 profiler, or stops
+    # it and writes the profile to a file in this directory.
+    profile_dir: Optional[str] = None
+
     def handle(self, signum, frame):
         """This method is called when a signal is received."""
         core = self.dbgr.core
@@ -107,6 +201,27 @@ class SigHandler(TrepanSignalHandler):
             self.print_method(
                 f"\n(Mathics3 Trepan) Program received signal {self.signame}."
             )
+        if self.dump_path is not None:
+            try:
+                dump_all_stacks(self.dump_path)
+            except OSError as e:
+                message = f"Cannot write Mathics3 stacks to {self.dump_path}: {e}"
+            else:
+                message = f"Mathics3 stacks written to {self.dump_path}."
+            if self.print_method:
+                self.print_method(message)
+        if self.profile_dir is not None:
+            try:
+                path = profiler.toggle(self.profile_dir)
+            except OSError as e:
+                message = f"Cannot write the Mathics3 profile: {e}"
+            else:
+                if path is None:
+                    message = "Mathics3 profiler started."
+                else:
+                    message = f"Mathics3 profile written to {path}."
+            if self.print_method:
+                self.print_method(message)
         if self.print_stack:
             # Print Python's most-recent frame
             frame_lineno = (frame, frame.f_lineno)
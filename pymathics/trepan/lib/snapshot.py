@@ -0,0 +1,278 @@
+# -*- coding: utf-8 -*-
+#
+#   Copyright (C) 2024 Rocky Bernstein <rocky@gnu.org>
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Save the user definitions of a Mathics3 session to a file, and load
+them back.
+
+The file starts with a header, and then has one pickle record per
+Symbol, so neither saving nor loading has to hold more than one
+Symbol's definition in memory besides the session itself. A record is::
+
+    (name, attributes, is_numeric, values, formatvalues, options)
+
+where ``values`` maps a value list such as "downvalues" to the rules in
+it, ``formatvalues`` maps a form to its rules, and ``options`` maps an
+option name to its value. Rules are stored as (lhs, rhs, system)
+triples; patterns are compiled again when the rules are loaded.
+
+Expressions are stored as plain Python values, which pickle much
+smaller than Mathics3 elements do:
+
+  Symbol            its name, a str
+  Integer           int
+  MachineReal       float
+  Expression        [head, element, ...]
+  String, Rational, a tuple starting with one of the tags below
+  PrecisionReal,
+  Complex
+
+Only ``Rule``s are saved; rules that call Python functions belong to
+builtins and are already there when the file is loaded. Rules and
+options with other atoms in them, such as images, are left out too.
+
+So a file holds nothing but str, int, float, bool, list, tuple and
+dict values. Files can come from other machines, and unpickling an
+object can run code, so loading refuses any other kind of object.
+"""
+
+import pickle
+from typing import Dict, List, Tuple
+
+import mpmath
+import sympy
+
+from mathics.core.atoms import (
+    Complex,
+    Integer,
+    MachineReal,
+    PrecisionReal,
+    Rational,
+    String,
+)
+from mathics.core.definitions import Definition, Definitions
+from mathics.core.element import BaseElement
+from mathics.core.expression import Expression
+from mathics.core.list import ListExpression
+from mathics.core.rules import Rule
+from mathics.core.symbols import Symbol
+
+# First record in the file. The number is bumped whenever the record
+# layout changes.
+MAGIC = "Mathics3 definitions"
+VERSION = 2
+
+VALUE_LISTS = (
+    "ownvalues",
+    "downvalues",
+    "subvalues",
+    "upvalues",
+    "nvalues",
+    "defaultvalues",
+    "messages",
+)
+
+# Tags for the atoms that aren't stored as a bare Python value.
+STRING, RATIONAL, PRECISION_REAL, COMPLEX = "s", "q", "r", "c"
+
+
+class NotSaved(Exception):
+    """Raised by encode() for an element that can't be saved."""
+
+
+class DataUnpickler(pickle.Unpickler):
+    """Unpickler that only gives back plain data, never instances of
+    classes."""
+
+    def find_class(self, module: str, name: str):
+        raise pickle.UnpicklingError(
+            f"a definitions file can't hold a {module}.{name} object"
+        )
+
+
+def encode(element: BaseElement):
+    """Turn ``element`` into plain Python values; see the module
+    docstring. NotSaved is raised if there is an element we don't
+    save in it."""
+    # Test the most common kinds first.
+    if isinstance(element, Symbol):
+        return element.name
+    if isinstance(element, Expression):
+        return [encode(element.head)] + [encode(e) for e in element.elements]
+    if isinstance(element, Integer):
+        return element.value
+    if isinstance(element, MachineReal):
+        return element.value
+    if isinstance(element, String):
+        return (STRING, element.value)
+    if isinstance(element, Rational):
+        numerator, denominator = element.value.as_numer_denom()
+        return (RATIONAL, int(numerator), int(denominator))
+    if isinstance(element, PrecisionReal):
+        # The binary digits, exactly, and the precision in bits.
+        return (PRECISION_REAL, element.value._mpf_, element.value._prec)
+    if isinstance(element, Complex):
+        return (COMPLEX, encode(element.real), encode(element.imag))
+    # Images, graphs and the like.
+    raise NotSaved(type(element).__name__)
+
+
+def decode(value) -> BaseElement:
+    """The inverse of encode()."""
+    if isinstance(value, str):
+        return Symbol(value)
+    if isinstance(value, list):
+        elements = [decode(v) for v in value[1:]]
+        if value[0] == "System`List":
+            return ListExpression(*elements)
+        return Expression(decode(value[0]), *elements)
+    if isinstance(value, int):
+        return Integer(value)
+    if isinstance(value, float):
+        return MachineReal(value)
+    tag = value[0]
+    if tag == STRING:
+        return String(value[1])
+    if tag == RATIONAL:
+        return Rational(value[1], value[2])
+    if tag == PRECISION_REAL:
+        mpf, precision = value[1], value[2]
+        with mpmath.workprec(precision):
+            return PrecisionReal(
+                sympy.Float(mpmath.mpf(tuple(mpf)), precision=precision)
+            )
+    if tag == COMPLEX:
+        return Complex(decode(value[1]), decode(value[2]))
+    raise ValueError(f"unknown element tag {tag!r}")
+
+
+def encode_rules(rules: list) -> Tuple[List[tuple], int]:
+    """Return the encoded ``Rule``s in ``rules``, and the number of
+    other rules left out."""
+    encoded = []
+    for rule in rules:
+        if isinstance(rule, Rule):
+            try:
+                encoded.append(
+                    (encode(rule.pattern.expr), encode(rule.replace), rule.system)
+                )
+            except NotSaved:
+                pass
+    return encoded, len(rules) - len(encoded)
+
+
+def decode_rules(encoded: List[tuple]) -> List[Rule]:
+    return [
+        Rule(decode(lhs), decode(rhs), system=system) for lhs, rhs, system in encoded
+    ]
+
+
+def save_definitions(definitions: Definitions, path: str) -> Tuple[int, int, int]:
+    """Write the user definitions in ``definitions`` to ``path``. Return
+    the number of Symbols and rules written, and the number of rules
+    and options left out."""
+    symbol_count = rule_count = skipped = 0
+    with open(path, "wb") as f:
+        pickle.dump((MAGIC, VERSION), f, pickle.HIGHEST_PROTOCOL)
+        for name, definition in list(definitions.user.items()):
+            values: Dict[str, List[tuple]] = {}
+            for position in VALUE_LISTS:
+                rules, left_out = encode_rules(definition.get_values_list(position))
+                skipped += left_out
+                if rules:
+                    values[position] = rules
+                    rule_count += len(rules)
+            formatvalues = {}
+            for form, form_rules in definition.formatvalues.items():
+                rules, left_out = encode_rules(form_rules)
+                skipped += left_out
+                if rules:
+                    formatvalues[form] = rules
+                    rule_count += len(rules)
+            options = {}
+            # ClearAll[] leaves an empty list rather than a dict here.
+            for option, value in dict(definition.options).items():
+                try:
+                    options[option] = encode(value)
+                except NotSaved:
+                    skipped += 1
+            record = (
+                name,
+                definition.attributes,
+                definition.is_numeric,
+                values,
+                formatvalues,
+                options,
+            )
+            pickle.dump(record, f, pickle.HIGHEST_PROTOCOL)
+            symbol_count += 1
+    return symbol_count, rule_count, skipped
+
+
+def load_definitions(definitions: Definitions, path: str) -> Tuple[int, int]:
+    """Replace the user definitions of the Symbols saved in ``path`` by
+    save_definitions() with the saved ones. Symbols that aren't in the
+    file are left alone. Return the number of Symbols and rules loaded.
+
+    ValueError is raised if ``path`` isn't a file that
+    save_definitions() wrote.
+    """
+    symbol_count = rule_count = 0
+    with open(path, "rb") as f:
+        try:
+            header = DataUnpickler(f).load()
+        except Exception:
+            header = None
+        if header != (MAGIC, VERSION):
+            raise ValueError(f"{path} is not a version {VERSION} definitions file")
+        while True:
+            try:
+                record = DataUnpickler(f).load()
+            except EOFError:
+                break
+            except pickle.UnpicklingError as e:
+                raise ValueError(f"{path}: {e}")
+            name, attributes, is_numeric, values, formatvalues, options = record
+            definition = Definition(
+                name, attributes=attributes, is_numeric=is_numeric
+            )
+            for position, rules in values.items():
+                definition.set_values_list(position, decode_rules(rules))
+                rule_count += len(rules)
+            for form, rules in formatvalues.items():
+                definition.formatvalues[form] = decode_rules(rules)
+                rule_count += len(rules)
+            definition.options = {
+                option: decode(value) for option, value in options.items()
+            }
+            definitions.add_user_definition(name, definition)
+            symbol_count += 1
+    return symbol_count, rule_count
+
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+
+    from mathics.session import MathicsSession
+
+    session = MathicsSession()
+    session.evaluate("f[x_] := x^2 + 1/3; Attributes[g] = {Orderless}; y = {1.5, 2`30}")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "definitions.bin")
+        print(save_definitions(session.definitions, path), os.path.getsize(path))
+        session.evaluate("Clear[f, y]")
+        print(load_definitions(session.definitions, path))
+    print(session.evaluate("{f[2], y, Attributes[g]}"))
@@ -18,6 +18,7 @@
 
 import inspect
 import os.path as osp
+from time import perf_counter
 
 from typing import Optional, Tuple
 from trepan.lib.format import (
@@ -36,6 +37,7 @@ from mathics.core.builtin import Builtin
 from mathics.core.element import BaseElement
 from mathics.core.expression import Expression
 from mathics.core.pattern import ExpressionPattern
+from pymathics.trepan.lib import shadow_stack
 from pymathics.trepan.lib.format import format_element, pygments_format
 
 
@@ -213,10 +215,17 @@ def is_builtin_eval_fn(frame) -> bool:
     return isinstance(self_obj, Builtin)
 
 
-def print_expression_stack(proc_obj, count: int, style="none"):
+def print_expression_stack(proc_obj, count: Optional[int], style="none"):
     """
     Display the Python call stack but filtered so that we show only expresions.
+    If ``count`` is None, all expressions are shown.
     """
+    if shadow_stack.enabled:
+        entries = shadow_stack.get_stack()
+        if entries:
+            print_shadow_stack(proc_obj, entries, count, style=style)
+            return
+
     j = 0
     intf = proc_obj.intf[-1]
     n = len(proc_obj.stack)
@@ -236,10 +245,30 @@ def print_expression_stack(proc_obj, count: int, style="none"):
                 + format_stack_entry(proc_obj.debugger, frame_lineno, style=style)
             )
             j += 1
-            if j >= count:
+            if count is not None and j >= count:
                 break
 
 
+def print_shadow_stack(proc_obj, entries: list, count: Optional[int], style="none"):
+    """
+    Display the Mathics3 expression stack recorded in the shadow stack
+    ``entries``, newest first. Unlike print_expression_stack(), no
+    Python frames are consulted.
+    """
+    intf = proc_obj.intf[-1]
+    maxargstrsize = proc_obj.debugger.settings["maxargstrsize"]
+    now = perf_counter()
+    for j, entry in enumerate(reversed(entries[-count:] if count else entries)):
+        intf.msg_nocr(format_token(Arrow, "E>", style=style) if j == 0 else "E:")
+        mathics_str = format_element(entry.expr)
+        if len(mathics_str) > maxargstrsize:
+            mathics_str = f"{mathics_str[:maxargstrsize]}..."
+        intf.msg(
+            f"{j} ({entry.depth}) {pygments_format(mathics_str, style).rstrip()}"
+            f"  [{now - entry.start:.6f}s]"
+        )
+
+
 def print_builtin_stack(proc_obj, count: int, style="none"):
     """
     Display the Python call stack but filtered so that we Builtin calls.
@@ -290,7 +319,7 @@ def print_stack_trace(proc_obj, count=None, style="none", opts={}):
         if opts["builtin"]:
             print_builtin_stack(proc_obj, n, style=style)
         elif opts["expression"]:
-            print_expression_stack(proc_obj, n, style=style)
+            print_expression_stack(proc_obj, count, style=style)
         else:
             for i in range(n):
                 print_stack_entry(proc_obj, i, style=style, opts=opts)
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+#
+#   Copyright (C) 2024 Rocky Bernstein <rocky@gnu.org>
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Write the Mathics3 stack of every thread to a log file.
+
+This is meant for a signal handler ("handle USR1 dump FILE", or
+DebugStackDump[FILE]): it takes a look at a process that seems stuck
+and lets it go on right away, without stopping in the debugger.
+
+For each thread, the Mathics3 frames are listed newest first. When the
+shadow stack is kept ("set shadowstack on"), that is what is listed,
+with the depth of each expression and how long it has been evaluating.
+Otherwise, the Python frames of the thread, from sys._current_frames(),
+are sorted into expression frames and Builtin eval frames the same way
+"backtrace -e" and "backtrace -b" do; the depth is then the count of
+expression frames below, and elapsed times aren't known.
+
+Only heads are written, never whole expressions, so that a dump is
+quick and short however big the expressions are.
+"""
+
+import sys
+import threading
+from datetime import datetime
+from time import perf_counter
+from typing import List, Tuple
+
+from mathics.core.expression import Expression
+
+from pymathics.trepan.lib import shadow_stack
+from pymathics.trepan.lib.stack import format_eval_builtin_fn, is_builtin_eval_fn
+
+
+def head_name(expr) -> str:
+    try:
+        head = expr.get_head()
+    except AttributeError:
+        # Caught in the middle of being built.
+        return type(expr).__name__
+    return getattr(head, "name", None) or type(head).__name__
+
+
+def shadow_frame_lines(entries: list, now: float) -> List[str]:
+    return [
+        f"  E ({entry.depth}) {head_name(entry.expr)}  {now - entry.start:.6f}s"
+        for entry in reversed(entries)
+    ]
+
+
+def mathics_frames(frame) -> List[Tuple[str, str]]:
+    """Return an entry for each Mathics3 frame in ``frame`` and the
+    frames it was called from, newest first. An entry is ("E", head of
+    the expression) or ("B", Builtin eval function call)."""
+    entries = []
+    last_expr = None
+    while frame is not None:
+        if is_builtin_eval_fn(frame):
+            try:
+                call = format_eval_builtin_fn(frame, style=None)
+            except Exception:
+                call = type(frame.f_locals.get("self")).__name__
+            entries.append(("B", call))
+        else:
+            self_obj = frame.f_locals.get("self")
+            # An expression goes through several methods, each with its
+            # own frame; list it once.
+            if isinstance(self_obj, Expression) and self_obj is not last_expr:
+                entries.append(("E", head_name(self_obj)))
+                last_expr = self_obj
+        frame = frame.f_back
+    return entries
+
+
+def python_frame_lines(frame) -> List[str]:
+    """Return a line for each Mathics3 frame in ``frame`` and the frames
+    it was called from, newest first."""
+    entries = mathics_frames(frame)
+    lines = []
+    depth = sum(1 for kind, _ in entries if kind == "E")
+    for kind, text in entries:
+        if kind == "E":
+            lines.append(f"  E ({depth}) {text}")
+            depth -= 1
+        else:
+            lines.append(f"  B {text}")
+    return lines
+
+
+def format_all_stacks() -> List[str]:
+    """Return the lines of a dump of the Mathics3 stack of every
+    thread."""
+    now = perf_counter()
+    frames = sys._current_frames()
+    shadow_stacks = shadow_stack.get_all_stacks() if shadow_stack.enabled else {}
+    names = {thread.ident: thread.name for thread in threading.enumerate()}
+    lines = [f"Mathics3 stacks at {datetime.now().isoformat(timespec='seconds')}"]
+    for thread_id, frame in frames.items():
+        if thread_id in shadow_stacks:
+            frame_lines = shadow_frame_lines(shadow_stacks[thread_id], now)
+        else:
+            frame_lines = python_frame_lines(frame)
+        name = names.get(thread_id, "?")
+        if not frame_lines:
+            lines.append(f"Thread {name} ({thread_id}): no Mathics3 frames")
+            continue
+        lines.append(f"Thread {name} ({thread_id}):")
+        lines.extend(frame_lines)
+    return lines
+
+
+def dump_all_stacks(path: str, reason: str = ""):
+    """Append a dump of the Mathics3 stack of every thread to the file
+    ``path``, after ``reason`` if that is given."""
+    lines = format_all_stacks()
+    if reason:
+        lines.insert(1, reason)
+    with open(path, "a") as f:
+        f.write("\n".join(lines) + "\n\n")
+
+
+if __name__ == "__main__":
+    from mathics.session import MathicsSession
+
+    session = MathicsSession()
+    session.evaluate("f[x_] := (Print[x]; x)")
+    # Print goes through the session's output, which is called with the
+    # stack in place.
+    session.evaluation.output.out = lambda text: print(
+        "\n".join(format_all_stacks())
+    )
+    session.evaluate("f[1 + 2]")
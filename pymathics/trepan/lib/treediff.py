@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+#
+#   Copyright (C) 2024 Rocky Bernstein <rocky@gnu.org>
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Find where two Mathics3 expressions differ.
+
+Tracing shows each evaluation result as "orig = new", both in full.
+When a large expression changes in one place, that is slow to format
+and hard to read. With "set tracediff on", tracing shows only the
+positions that changed, as Part paths, with the old and new
+subexpressions there.
+
+diff() walks the two expression trees together. A pair of subtrees
+is skipped when it is the same object, which is common since
+rewritten expressions share their unchanged parts, or when the
+subtrees have the same structural hash. Hashes are kept in a cache
+keyed by object, so the unchanged parts of an expression are hashed
+only once while tracing. So the cost of a diff follows the size of
+what changed, not the size of the expression.
+"""
+
+import weakref
+from typing import Any, Dict, List, Optional, Tuple
+
+# When True, tracing shows evaluation results as changed positions.
+enabled: bool = False
+
+# Report at most this many changed positions; past this, diff()
+# gives up and the caller shows the expressions in full.
+MAX_CHANGES = 10
+
+# Most expressions whose hashes are cached; the cache is emptied when
+# it grows past this.
+HASH_CACHE_SIZE = 100000
+
+# id(expression) -> (weak reference to the expression, hash). The
+# reference tells whether an entry is still for the same expression,
+# since ids are reused once an expression is freed, without keeping
+# expressions alive.
+_hash_cache: Dict[int, Tuple[weakref.ref, int]] = {}
+
+Change = Tuple[Tuple[int, ...], Any, Any]
+
+
+def structural_hash(expr) -> int:
+    """Return a hash of ``expr`` that is the same for expressions that
+    are the same, caching those of compound expressions."""
+    elements = getattr(expr, "elements", None)
+    if elements is None:
+        return hash(expr)
+    key = id(expr)
+    cached = _hash_cache.get(key)
+    if cached is not None and cached[0]() is expr:
+        return cached[1]
+    value = hash(
+        (structural_hash(expr.head),) + tuple(structural_hash(e) for e in elements)
+    )
+    if len(_hash_cache) >= HASH_CACHE_SIZE:
+        _hash_cache.clear()
+    _hash_cache[key] = (weakref.ref(expr), value)
+    return value
+
+
+def diff(old, new) -> Optional[List[Change]]:
+    """Return the positions where ``new`` differs from ``old``, as a
+    list of (Part path, old subexpression, new subexpression). Part
+    path 0 is the head.
+
+    Return None if the whole expressions differ, or if there are more
+    than MAX_CHANGES changes, since then showing them in full is
+    clearer.
+    """
+    changes: List[Change] = []
+    if not _diff(old, new, (), changes) or not changes or changes[0][0] == ():
+        return None
+    return changes
+
+
+def _diff(old, new, path: Tuple[int, ...], changes: List[Change]) -> bool:
+    """Add the changes from ``old`` to ``new`` under ``path`` to
+    ``changes``. Return False if there are too many."""
+    if old is new:
+        return True
+    old_elements = getattr(old, "elements", None)
+    new_elements = getattr(new, "elements", None)
+    if old_elements is None or new_elements is None:
+        # At least one is an atom.
+        if old_elements is None and new_elements is None and old.sameQ(new):
+            return True
+    elif len(old_elements) == len(new_elements):
+        if structural_hash(old) == structural_hash(new):
+            return True
+        if not _diff(old.head, new.head, path + (0,), changes):
+            return False
+        for i, (old_element, new_element) in enumerate(
+            zip(old_elements, new_elements), 1
+        ):
+            if not _diff(old_element, new_element, path + (i,), changes):
+                return False
+        return True
+    changes.append((path, old, new))
+    return len(changes) <= MAX_CHANGES
+
+
+def format_path(path: Tuple[int, ...]) -> str:
+    return "[[" + ", ".join(str(i) for i in path) + "]]"
+
+
+if __name__ == "__main__":
+    from mathics.session import MathicsSession
+
+    session = MathicsSession()
+    big = session.evaluate("Table[i^2, {i, 1000}]")
+    changed = session.evaluate("ReplacePart[Table[i^2, {i, 1000}], 500 -> x]")
+    for path, old, new in diff(big, changed):
+        print(format_path(path), old, "->", new)
+    print(diff(big, session.evaluate("f[1]")))
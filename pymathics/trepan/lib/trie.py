@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+#
+#   Copyright (C) 2024 Rocky Bernstein <rocky@gnu.org>
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""A prefix tree of strings, used in completion.
+
+Finding the names that start with some prefix costs time proportional
+to the length of the prefix plus the number of matches, rather than to
+the number of names, which for Mathics3 Symbols can be in the tens of
+thousands.
+"""
+
+from typing import Any, Dict, Iterable, List, Tuple
+
+# Key in a node under which the value of a word ending at that node is
+# stored. No character compares equal to it.
+_END = None
+
+
+class PrefixTrie:
+    """A mapping from strings to values that can be searched by prefix."""
+
+    def __init__(self, words: Iterable[str] = ()):
+        self.root: Dict[Any, Any] = {}
+        self.size = 0
+        for word in words:
+            self.add(word)
+
+    def __contains__(self, word: str) -> bool:
+        node = self._find(word)
+        return node is not None and _END in node
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _find(self, prefix: str):
+        """Return the node for ``prefix``, or None if no word starts with
+        it."""
+        node = self.root
+        for ch in prefix:
+            node = node.get(ch)
+            if node is None:
+                return None
+        return node
+
+    def add(self, word: str, value: Any = None):
+        """Add ``word`` with ``value``. Adding a word that is already
+        present replaces its value."""
+        node = self.root
+        for ch in word:
+            child = node.get(ch)
+            if child is None:
+                child = node[ch] = {}
+            node = child
+        if _END not in node:
+            self.size += 1
+        node[_END] = value
+
+    def items(self, prefix: str = "") -> List[Tuple[str, Any]]:
+        """Return a sorted list of the (word, value) pairs whose word
+        starts with ``prefix``."""
+        node = self._find(prefix)
+        if node is None:
+            return []
+        result = []
+        stack = [(prefix, node)]
+        while stack:
+            word, node = stack.pop()
+            for ch, child in node.items():
+                if ch is _END:
+                    result.append((word, child))
+                else:
+                    stack.append((word + ch, child))
+        result.sort(key=lambda pair: pair[0])
+        return result
+
+    def complete(self, prefix: str = "") -> List[str]:
+        """Return a sorted list of the words that start with ``prefix``."""
+        return [word for word, _ in self.items(prefix)]
+
+
+if __name__ == "__main__":
+    trie = PrefixTrie(["backtrace", "break", "continue", "bt"])
+    print(len(trie), "break" in trie, "brea" in trie)
+    print(trie.complete("b"))
+    print(trie.complete("br"))
+    print(trie.complete("x"))
+    trie.add("up", "UpCommand")
+    print(trie.items("u"))
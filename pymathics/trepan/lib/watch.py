@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+#
+#   Copyright (C) 2024 Rocky Bernstein <rocky@gnu.org>
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Watchpoints on the values of Mathics3 Symbols.
+
+"watch x" reports each change to the OwnValues or DownValues of x,
+and by default stops in the debugger there.
+
+Rather than comparing values at every evaluation, the user Definition
+of a watched Symbol is switched to the WatchedDefinition subclass,
+which reports changes to its value lists as they are made. Nothing
+else is watched, so unwatched Symbols cost nothing, and a change to a
+watched one costs a name check.
+
+Some assignments don't change a Definition but replace it: ClearAll[]
+and Block[] go through Definitions.reset_user_definition() and
+Definitions.add_user_definition(). While there are watchpoints, those
+two methods are wrapped on the Definitions object in use so that the
+replacement gets watched too.
+"""
+
+from typing import Dict, Optional
+
+from mathics.core.definitions import Definition, Definitions, get_tag_position
+
+from pymathics.trepan.tracing import call_event_watch
+
+# The value lists that watchpoints report changes to.
+WATCHED_VALUES = ("ownvalues", "downvalues")
+
+
+class Watchpoint:
+    """A watch on the values of the Symbol with full name ``name``.
+    If ``stop`` is False, changes are shown but we don't stop."""
+
+    def __init__(self, name: str, stop: bool = True):
+        self.name = name
+        self.stop = stop
+        self.hits = 0
+
+
+# Full Symbol name -> its Watchpoint
+watchpoints: Dict[str, Watchpoint] = {}
+
+# The Definitions object whose methods we have wrapped, if any.
+hooked_definitions: Optional[Definitions] = None
+
+
+class WatchedDefinition(Definition):
+    """The Definition of a watched Symbol. Existing Definitions are
+    switched to this class, and back, by assigning ``__class__``."""
+
+    def __setattr__(self, attr: str, value):
+        # Clear[] and the like assign whole value lists.
+        if attr in WATCHED_VALUES:
+            old_value = self.__dict__.get(attr)
+            object.__setattr__(self, attr, value)
+            if old_value is not value and (old_value or value):
+                value_changed(self, attr)
+        else:
+            object.__setattr__(self, attr, value)
+
+    def add_rule_at(self, rule, position: str) -> bool:
+        result = super().add_rule_at(rule, position)
+        if position in WATCHED_VALUES:
+            value_changed(self, position)
+        return result
+
+    def remove_rule(self, lhs) -> bool:
+        result = super().remove_rule(lhs)
+        if result:
+            position = get_tag_position(lhs, self.name)
+            if position in WATCHED_VALUES:
+                value_changed(self, position)
+        return result
+
+
+def value_changed(definition: Definition, values_name: str):
+    """Report that list ``values_name`` of ``definition`` changed."""
+    watchpoint = watchpoints.get(definition.name)
+    if watchpoint is None:
+        return
+    watchpoint.hits += 1
+    call_event_watch(definition, values_name, watchpoint.stop)
+
+
+def replaced(old_definition: Optional[Definition], definition: Definition):
+    """Report the value lists that differ between the user Definition
+    ``old_definition`` and ``definition``, which has replaced it."""
+    for values_name in WATCHED_VALUES:
+        old_values = getattr(old_definition, values_name, None)
+        values = getattr(definition, values_name)
+        if old_values is not values and (old_values or values):
+            value_changed(definition, values_name)
+
+
+def watch_definition(definition: Definition):
+    if type(definition) is Definition:
+        definition.__class__ = WatchedDefinition
+
+
+def unwatch_definition(definition: Definition):
+    if type(definition) is WatchedDefinition:
+        definition.__class__ = Definition
+
+
+def hook_definitions(definitions: Definitions):
+    """Wrap the methods of ``definitions`` that replace user
+    Definitions, so that replacements of watched ones are watched."""
+    global hooked_definitions
+    if hooked_definitions is definitions:
+        return
+    if hooked_definitions is not None:
+        unhook_definitions()
+
+    reset_user_definition = definitions.reset_user_definition
+    add_user_definition = definitions.add_user_definition
+
+    def watched_reset_user_definition(name: str):
+        fullname = definitions.lookup_name(name)
+        old_definition = definitions.user.get(fullname)
+        reset_user_definition(name)
+        if fullname in watchpoints:
+            # Start the Symbol over with a watched, empty definition.
+            definition = definitions.get_user_definition(fullname)
+            watch_definition(definition)
+            replaced(old_definition, definition)
+
+    def watched_add_user_definition(name: str, definition: Definition):
+        fullname = definitions.lookup_name(name)
+        old_definition = definitions.user.get(fullname)
+        add_user_definition(name, definition)
+        if fullname in watchpoints:
+            watch_definition(definition)
+            replaced(old_definition, definition)
+
+    definitions.reset_user_definition = watched_reset_user_definition
+    definitions.add_user_definition = watched_add_user_definition
+    hooked_definitions = definitions
+
+
+def unhook_definitions():
+    """Undo hook_definitions()."""
+    global hooked_definitions
+    if hooked_definitions is None:
+        return
+    # The methods of the class show through again.
+    del hooked_definitions.reset_user_definition
+    del hooked_definitions.add_user_definition
+    hooked_definitions = None
+
+
+def add_watchpoint(definitions: Definitions, name: str, stop: bool = True) -> Watchpoint:
+    """Watch the values of Symbol ``name`` in ``definitions``, and
+    return the Watchpoint."""
+    fullname = definitions.lookup_name(name)
+    watchpoint = watchpoints[fullname] = Watchpoint(fullname, stop)
+    # A Symbol without values yet gets an empty user definition, so
+    # there is something to watch.
+    watch_definition(definitions.get_user_definition(fullname))
+    hook_definitions(definitions)
+    return watchpoint
+
+
+def delete_watchpoint(definitions: Definitions, name: str) -> bool:
+    """Stop watching the values of Symbol ``name``. Return False if it
+    wasn't watched."""
+    fullname = definitions.lookup_name(name)
+    if watchpoints.pop(fullname, None) is None:
+        return False
+    definition = definitions.user.get(fullname)
+    if definition is not None:
+        unwatch_definition(definition)
+    if not watchpoints:
+        unhook_definitions()
+    return True
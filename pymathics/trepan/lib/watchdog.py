@@ -0,0 +1,279 @@
+# -*- coding: utf-8 -*-
+#
+#   Copyright (C) 2024 Rocky Bernstein <rocky@gnu.org>
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Catch top-level queries that run longer than a time budget.
+
+With "DebugActivate[Timeout -> seconds]", the evaluate() methods of
+Evaluation and MathicsSession note when each thread starts its
+outermost query, and a watchdog thread sleeps until the earliest of
+these has gone on for ``seconds``. Until then, no event hook is set,
+so a query that finishes in time costs nothing more than the
+bookkeeping around it.
+
+When a query goes over its budget, the watchdog either:
+
+* appends the Mathics3 stack of every thread to a file, as
+  DebugStackDump[] does, and lets evaluation go on, or
+* sets an evaluate() call hook, which enters the debugger in the
+  thread that is over budget at its next evaluate() call, and then
+  takes itself out.
+
+Either happens once per query. A query stuck inside a single Python
+call, say to SymPy, is only stopped when that call returns; a dump
+sees it right away.
+"""
+
+import inspect
+import sys
+import threading
+from time import perf_counter
+from typing import Callable, Dict, List, Optional, Set
+
+import mathics.eval.tracing as eval_tracing
+
+
+class QueryEntry:
+    """The outermost query a thread is evaluating."""
+
+    def __init__(self):
+        self.start = perf_counter()
+        # How many evaluate() calls of this thread are active.
+        self.depth = 1
+        # Whether the watchdog has acted on this query.
+        self.fired = False
+
+
+class EvaluationWatchdog:
+    def __init__(self):
+        # Longest time in seconds a query may take. None means there
+        # is no limit.
+        self.timeout: Optional[float] = None
+
+        # When not None, dump stacks to this file rather than
+        # entering the debugger.
+        self.dump_path: Optional[str] = None
+
+        # Called with a message each time a query goes over budget.
+        self.log: Callable[[str], None] = lambda text: print(text, file=sys.stderr)
+
+        # Queries being evaluated, by thread id.
+        self.queries: Dict[int, QueryEntry] = {}
+
+        # Threads to enter the debugger in at their next evaluate() call.
+        self.overdue: Set[int] = set()
+
+        # The evaluate() call hook that was set before ours.
+        self.previous_hook: Optional[Callable] = None
+
+        self.condition = threading.Condition()
+        self.thread: Optional[threading.Thread] = None
+
+    def set_timeout(self, timeout: Optional[float], dump_path: Optional[str] = None):
+        """Set the time budget of each query to ``timeout`` seconds, or
+        turn the watchdog off if that is None. If ``dump_path`` is given,
+        a query over budget has the stacks dumped there rather than
+        stopping in the debugger."""
+        with self.condition:
+            self.timeout = timeout
+            self.dump_path = dump_path
+            if timeout is None:
+                self.overdue.clear()
+                self.disarm()
+            self.condition.notify()
+        if timeout is not None:
+            install()
+            if self.thread is None:
+                self.thread = threading.Thread(
+                    target=self.run, name="Mathics3 evaluation watchdog", daemon=True
+                )
+                self.thread.start()
+
+    def start_query(self):
+        thread_id = threading.get_ident()
+        with self.condition:
+            entry = self.queries.get(thread_id)
+            if entry is not None:
+                entry.depth += 1
+                return
+            self.queries[thread_id] = QueryEntry()
+            if self.timeout is not None:
+                self.condition.notify()
+
+    def end_query(self):
+        thread_id = threading.get_ident()
+        with self.condition:
+            entry = self.queries.get(thread_id)
+            if entry is None:
+                # The query was started before we were watching.
+                return
+            entry.depth -= 1
+            if entry.depth > 0:
+                return
+            del self.queries[thread_id]
+            if thread_id in self.overdue:
+                self.overdue.discard(thread_id)
+                if not self.overdue:
+                    self.disarm()
+
+    def run(self):
+        with self.condition:
+            while True:
+                timeout = self.timeout
+                waiting = [entry for entry in self.queries.values() if not entry.fired]
+                if timeout is None or not waiting:
+                    self.condition.wait()
+                    continue
+                now = perf_counter()
+                for thread_id, entry in list(self.queries.items()):
+                    if not entry.fired and now - entry.start >= timeout:
+                        entry.fired = True
+                        self.fire(thread_id, now - entry.start)
+                waiting = [entry for entry in self.queries.values() if not entry.fired]
+                if waiting:
+                    next_deadline = min(entry.start for entry in waiting) + timeout
+                    self.condition.wait(max(next_deadline - now, 0))
+                else:
+                    self.condition.wait()
+
+    def fire(self, thread_id: int, elapsed: float):
+        """Act on the query of ``thread_id`` that has been evaluating
+        for ``elapsed`` seconds. The caller holds ``condition``."""
+        thread_name = next(
+            (t.name for t in threading.enumerate() if t.ident == thread_id),
+            str(thread_id),
+        )
+        reason = (
+            f"Evaluation in thread {thread_name} has gone on for {elapsed:.1f}s, "
+            f"over the {self.timeout:g}s timeout."
+        )
+        if self.dump_path is not None:
+            # stackdump brings in trepan and pygments, which we don't
+            # want to load along with the module.
+            from pymathics.trepan.lib import stackdump
+
+            try:
+                stackdump.dump_all_stacks(self.dump_path, reason)
+            except Exception as e:
+                self.log(f"Cannot write stack dump to {self.dump_path}: {e}")
+            else:
+                self.log(f"{reason} Mathics3 stacks written to {self.dump_path}.")
+            return
+        self.log(f"{reason} Entering the debugger.")
+        self.overdue.add(thread_id)
+        self.arm()
+
+    def arm(self):
+        """Put our evaluate() call hook in front of the one set now."""
+        if eval_tracing.trace_evaluate_on_call is not deadline_hook:
+            self.previous_hook = eval_tracing.trace_evaluate_on_call
+            eval_tracing.trace_evaluate_on_call = deadline_hook
+
+    def disarm(self):
+        """Put back the evaluate() call hook we replaced."""
+        if eval_tracing.trace_evaluate_on_call is deadline_hook:
+            eval_tracing.trace_evaluate_on_call = self.previous_hook
+        self.previous_hook = None
+
+
+# The watchdog used by DebugActivate[].
+watchdog = EvaluationWatchdog()
+
+
+def enter_debugger(frame, expr, evaluation, status: str):
+    """Stop in the debugger at ``frame``, where ``expr`` is about to be
+    evaluated."""
+    from pymathics.trepan.tracing import get_debugger
+
+    core = get_debugger().core
+    if core.at_stop:
+        # Raised by, or run from, this thread's own stop.
+        return
+    old_trace_hook_suspend = core.trace_hook_suspend
+    core.trace_hook_suspend = True
+    core.execution_status = "Running"
+    core.stop_reason = f"evaluation over the {watchdog.timeout:g}s timeout"
+    try:
+        with core.stop_lock():
+            core.processor.event_processor(
+                frame, "evaluate-entry", (expr, evaluation, status, None)
+            )
+    finally:
+        core.trace_hook_suspend = old_trace_hook_suspend
+
+
+def deadline_hook(expr, evaluation, status: str, fn: Callable, orig_expr=None):
+    """The evaluate() call hook set once a query is over budget."""
+    previous_hook = watchdog.previous_hook
+    thread_id = threading.get_ident()
+    if thread_id in watchdog.overdue:
+        with watchdog.condition:
+            watchdog.overdue.discard(thread_id)
+            if not watchdog.overdue:
+                watchdog.disarm()
+        # Stop where debug_evaluate() would: in the caller of evaluate().
+        frame = inspect.currentframe()
+        if frame is not None and frame.f_back is not None:
+            frame = frame.f_back.f_back
+        enter_debugger(frame, expr, evaluation, status)
+    if previous_hook is not None:
+        return previous_hook(expr, evaluation, status, fn, orig_expr)
+    return False
+
+
+# (class, original method) for each evaluate() method we wrapped.
+_wrapped: List[tuple] = []
+
+
+def wrap_evaluate(method):
+    def evaluate(*args, **kwargs):
+        watchdog.start_query()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            watchdog.end_query()
+
+    evaluate.__doc__ = method.__doc__
+    evaluate.__wrapped__ = method
+    return evaluate
+
+
+def install():
+    """Have queries noted, once and for all. When there is no timeout,
+    this is only a little bookkeeping per query."""
+    from mathics.core.evaluation import Evaluation
+    from mathics.session import MathicsSession
+
+    if _wrapped:
+        return
+    for cls in (Evaluation, MathicsSession):
+        method = cls.evaluate
+        cls.evaluate = wrap_evaluate(method)
+        _wrapped.append((cls, method))
+
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+
+    from mathics.session import MathicsSession
+
+    session = MathicsSession()
+    dump_path = os.path.join(tempfile.mkdtemp(), "stacks.log")
+    watchdog.set_timeout(0.2, dump_path)
+    session.evaluate("Do[Expand[(x + y)^k], {k, 60}]")
+    watchdog.set_timeout(None)
+    with open(dump_path) as f:
+        print(f.read())
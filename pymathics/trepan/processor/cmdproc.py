@@ -35,7 +35,6 @@ import trepan.lib.file as Mfile
 import trepan.lib.stack as Mstack
 import trepan.lib.thred as Mthread
 import trepan.misc as Mmisc
-from trepan.processor.complete_rl import completer
 from pygments.console import colorize
 from tracer import EVENT2SHORT
 from trepan.processor import cmdfns
@@ -45,6 +44,13 @@ from trepan.vprocessor import Processor
 
 from pymathics.trepan.lib.stack import (format_eval_builtin_fn,
                                           is_builtin_eval_fn)
+from pymathics.trepan.processor.complete import completer
+from pymathics.trepan.processor.manifest import (
+    COMMAND_PACKAGE,
+    LazyCommand,
+    find_command_classnames,
+    read_manifest,
+)
 from pymathics.trepan.tracing import call_event_debug
 
 warned_file_mismatches = set()
@@ -254,7 +260,13 @@ def print_location(proc_obj):
         if "style" in proc_obj.debugger.settings:
             opts["style"] = proc_obj.settings("style")
 
-        pyficache.update_cache(filename)
+        # update_cache() throws away any highlighted text pyficache has
+        # for the file, and highlighting a big file like
+        # mathics/core/expression.py takes a good part of a second. So
+        # only read the file when we have not seen it before. The
+        # "reload_on_change" setting takes care of files that change.
+        if not pyficache.is_cached(filename):
+            pyficache.update_cache(filename)
         line = pyficache.getline(filename, lineno, opts)
         if not line:
             if (
@@ -407,7 +419,10 @@ class CommandProcessor(Processor):
         self.event2short["debugger"] = "$ "
         self.event2short["mpmath"] = "mp"
         self.event2short["SymPy"] = "SP"
+        self.event2short["Numpy"] = "np"
+        self.event2short["parse"] = "ps"
         self.event2short["Get"] = "<<"
+        self.event2short["watch"] = "w@"
 
         self.optional_modules = tuple()
         self.cmd_instances = self._populate_commands()
@@ -420,8 +435,13 @@ class CommandProcessor(Processor):
         self.cmd_name = ""
         self.cmd_queue = []  # Queued debugger commands
         self.completer = lambda text, state: completer(self, text, state)
+        # Prefix tries used in completion. See processor/complete.py.
+        self.completion_tries = None
+        self.symbol_index = None
         self.current_command = ""  # Current command getting run
         self.debug_nest = 1
+        # How many event_processor() calls are running; stops can nest.
+        self.stop_depth = 0
         self.display_mgr = Mdisplay.DisplayMgr()
         self.intf = core_obj.debugger.intf
         self.last_command = None  # Initially a no-op
@@ -550,11 +570,28 @@ class CommandProcessor(Processor):
         self.thread_name = Mthread.current_thread_name()
         self.frame_thread_name = self.thread_name
         self.set_prompt(prompt)
-        self.process_commands()
+        self.stop_depth += 1
+        try:
+            self.process_commands()
+        finally:
+            self.stop_depth -= 1
         if filename == "<string>":
             pyficache.remove_remap_file("<string>")
+        if self.stop_depth == 0:
+            self.release_stop()
         return self.event_processor
 
+    def release_stop(self):
+        """Drop what we hold for the stop we are leaving: frames, the
+        call stack and the event argument. Through these, a stop holds
+        the Evaluation and whatever expressions were around, which
+        would otherwise stay alive until the next stop."""
+        self.forget()
+        self.frame = self.botframe = self.list_object = None
+        self.event_arg = None
+        self.core.arg = self.core.event_arg = None
+        self.core.last_frame = None
+
     def forget(self):
         """Remove memory of state variables set in the command processor"""
 
@@ -1046,10 +1083,20 @@ class CommandProcessor(Processor):
         and scan for class names inside those files and for each class
         name, we will create an instance of that class. The set of
         DebuggerCommand class instances form set of possible debugger
-        commands."""
+        commands.
+
+        If the command manifest is up to date, we create a LazyCommand
+        for each command instead, and put off the imports until
+        the command is needed. See load_command()."""
         from pymathics.trepan.processor import command as Mcommand
 
         if hasattr(Mcommand, "__modules__"):
+            manifest = read_manifest(Mcommand.__modules__)
+            if manifest is not None:
+                return [
+                    LazyCommand(self, mod_name, entry)
+                    for mod_name, entry in manifest.items()
+                ]
             return self.populate_commands_easy_install(Mcommand)
         else:
             return self.populate_commands_pip(Mcommand)
@@ -1126,11 +1173,7 @@ class CommandProcessor(Processor):
                     pass
                 continue
 
-            classnames = [
-                tup[0]
-                for tup in inspect.getmembers(command_mod, inspect.isclass)
-                if ("DebuggerCommand" != tup[0] and tup[0].endswith("Command"))
-            ]
+            classnames = find_command_classnames(command_mod)
             for classname in classnames:
                 try:
                     instance = getattr(command_mod, classname)(self)
@@ -1142,6 +1185,27 @@ class CommandProcessor(Processor):
             pass
         return cmd_instances
 
+    def invalidate_completions(self):
+        """Arrange for the command, alias and macro names used in
+        completion to be reread. Call this after changing any of them."""
+        self.completion_tries = None
+
+    def load_command(self, cmd_name: str):
+        """Return the command object for command ``cmd_name``, importing
+        its module first if it is still a LazyCommand."""
+        cmd_obj = self.commands[cmd_name]
+        if not isinstance(cmd_obj, LazyCommand):
+            return cmd_obj
+        command_mod = importlib.import_module(f"{COMMAND_PACKAGE}.{cmd_name}")
+        instance = getattr(command_mod, cmd_obj.classname)(self)
+        self.commands[cmd_name] = instance
+        for i, cmd_instance in enumerate(self.cmd_instances):
+            if cmd_instance is cmd_obj:
+                self.cmd_instances[i] = instance
+                break
+            pass
+        return instance
+
     def _populate_cmd_lists(self):
         """Populate self.lists and hashes:
         self.commands, and self.aliases, self.category"""
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+# DO NOT EDIT. This file was generated by
+#   python -m pymathics.trepan.processor.manifest
+# See pymathics/trepan/processor/manifest.py.
+
+MODULES = ['alias', 'backtrace', 'base_cmd', 'base_submgr', 'continue', 'down', 'eval', 'frame',
+ 'goto', 'handle', 'help', 'info', 'kill', 'load', 'mathics3', 'printelement', 'python',
+ 'reload', 'reversefinish', 'reversestep', 'save', 'set', 'show', 'trepan3k', 'up',
+ 'watch']
+
+DIGESTS = {'alias': '3c8d19480d07c750',
+ 'backtrace': '7dac007cf9f0c636',
+ 'base_cmd': 'aceba9cc1bb6b273',
+ 'base_submgr': '91eb7dc6ae7eca08',
+ 'continue': 'f30443b9d3eafe76',
+ 'down': '8608f9893d9eb218',
+ 'eval': 'b5f160a31b81bee2',
+ 'frame': '5eb53a4af85de1b9',
+ 'goto': '6d58643dd3ca39e0',
+ 'handle': '8c9b393d3c4bb91a',
+ 'help': '75c1175228e39be8',
+ 'info': 'eeedf0d04b6285cb',
+ 'kill': '16364bf153a488c3',
+ 'load': 'e208e690c937e4d3',
+ 'mathics3': '31f9973cef21a60d',
+ 'printelement': '54624c3e60b5cde2',
+ 'python': '5b84e283f9e062bf',
+ 'reload': 'fa13ed7f3a3936ca',
+ 'reversefinish': 'cd5b03692de5983a',
+ 'reversestep': '428027c08b24e7c9',
+ 'save': '2c6852d4dbfce6dd',
+ 'set': '6fe6bd0d51982fe0',
+ 'show': '14de6cd750128a15',
+ 'trepan3k': '2525bc7f34919346',
+ 'up': '483ec4e546d3cb67',
+ 'watch': '0a1457d60784a6eb'}
+
+COMMANDS = {'alias': ('AliasCommand', (), 'support', 'Add an alias for a debugger command'),
+ 'backtrace': ('BacktraceCommand',
+               ('bt', 'where'),
+               'stack',
+               'Print backtrace of stack frames'),
+ 'continue': ('ContinueCommand',
+              ('c',),
+              'running',
+              'Continue execution of debugged program'),
+ 'down': ('DownCommand',
+          (),
+          'stack',
+          'Move stack frame to a more recent selected frame'),
+ 'eval': ('EvalCommand', (), 'data', 'Print value of Mathics3 expression EXP'),
+ 'frame': ('FrameCommand', (), 'stack', 'Select and print a stack frame'),
+ 'goto': ('GotoCommand', (), 'running', 'Move to a recorded evaluation event'),
+ 'handle': ('HandleCommand', (), 'running', 'Specify how to handle a signal'),
+ 'help': ('HelpCommand',
+          ('?',),
+          'support',
+          'Print commands or give help for command(s)'),
+ 'info': ('InfoCommand',
+          ('i',),
+          'status',
+          'Information about debugged program and its environment'),
+ 'kill': ('KillCommand',
+          ('kill!',),
+          'running',
+          'Send this process a POSIX signal ("9" for "kill -9")'),
+ 'load': ('LoadCommand', (), 'data', 'Load Mathics3 user definitions from a file'),
+ 'mathics3': ('Mathics3Command',
+              ('mathics', 'Mathics3'),
+              'data',
+              'Run Python as a command subshell'),
+ 'printelement': ('PrintElementCommand',
+                  ('print-element', 'pexp', 'pe'),
+                  'running',
+                  'Print a Mathics3 Expression nicely'),
+ 'python': ('PythonCommand',
+            ('py', 'interact', 'shell'),
+            'data',
+            'Run Python as a command subshell'),
+ 'reload': ('ReloadCommand', (), 'support', 'reload a Mathics3 Debugger command'),
+ 'reversefinish': ('ReverseFinishCommand',
+                   ('reverse-finish', 'rf'),
+                   'running',
+                   'Move back to where the recorded evaluation started'),
+ 'reversestep': ('ReverseStepCommand',
+                 ('reverse-step', 'rs'),
+                 'running',
+                 'Move back through the recorded evaluation events'),
+ 'save': ('SaveCommand', (), 'data', 'Save the Mathics3 user definitions to a file'),
+ 'set': ('SetCommand', (), 'data', 'Modify parts of the debugger environment'),
+ 'show': ('ShowCommand', (), 'status', 'Show parts of the debugger environment'),
+ 'trepan3k': ('Trepan3KCommand', (), 'data', 'Drop into the trepan3k debugger'),
+ 'up': ('UpCommand', (), 'stack', 'Move stack frame to an older selected frame'),
+ 'watch': ('WatchCommand',
+           (),
+           'breakpoints',
+           "Stop or print when a Symbol's values change")}
@@ -18,6 +18,13 @@ from trepan.processor.command.alias import AliasCommand as TrepanAliasCommand
 
 
 class AliasCommand(TrepanAliasCommand):
+    __doc__ = TrepanAliasCommand.__doc__
+
+    def run(self, args):
+        result = super().run(args)
+        self.proc.invalidate_completions()
+        return result
+
     pass
 
 if __name__ == "__main__":
@@ -18,6 +18,7 @@ from getopt import getopt, GetoptError
 
 # Our local modules
 from pymathics.trepan.processor.command.base_cmd import DebuggerCommand
+from pymathics.trepan.lib import shadow_stack
 from pymathics.trepan.lib.stack import print_stack_trace
 
 
@@ -36,6 +37,10 @@ class BacktraceCommand(DebuggerCommand):
        -b | --builtin - show Mathics3 builtin methods
        -e | --expr    - show Mathics3 Expressions
 
+    When the shadow stack is on (see `set shadowstack`), *-e* shows the
+    Mathics3 expressions recorded by the evaluation hooks, together with
+    how long each has been running, instead of scanning Python frames.
+
     Examples:
     ---------
 
@@ -79,6 +84,8 @@ class BacktraceCommand(DebuggerCommand):
 
         if len(args) > 0:
             at_most = len(self.proc.stack)
+            if bt_opts["expression"] and shadow_stack.enabled:
+                at_most = max(at_most, len(shadow_stack.get_stack()))
             if at_most == 0:
                 self.errmsg("Stack is empty.")
                 return False
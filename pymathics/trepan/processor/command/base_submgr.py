@@ -19,7 +19,8 @@ import inspect
 import re
 import sys
 
-from trepan.lib.complete import complete_token, complete_token_with_next
+from trepan.lib.complete import complete_token
+from pymathics.trepan.lib.trie import PrefixTrie
 from pymathics.trepan.processor.command.base_cmd import DebuggerCommand
 from pymathics.trepan.processor.subcmd import Subcmd
 
@@ -59,6 +60,8 @@ class SubcommandMgr(DebuggerCommand):
 
         self.cmds = Subcmd(name, self)
         self.name = name
+        # Trie of subcommand names used in completion
+        self.subcmd_trie = None
         self._load_debugger_subcommands(name, base)
         self.proc = proc
 
@@ -190,9 +193,10 @@ class SubcommandMgr(DebuggerCommand):
         return complete_token(self.subcmds.subcmds.keys(), prefix)
 
     def complete_token_with_next(self, prefix):
-        # from trepan.api import debug; debug()
-        result = complete_token_with_next(self.cmds.subcmds, prefix)
-        return result
+        subcmds = self.cmds.subcmds
+        if self.subcmd_trie is None or len(self.subcmd_trie) != len(subcmds):
+            self.subcmd_trie = PrefixTrie(subcmds)
+        return [[name, subcmds[name]] for name in self.subcmd_trie.complete(prefix)]
 
     def run(self, args):
         """Ooops -- the debugger author didn't redefine this run docstring."""
@@ -16,6 +16,7 @@
 #  along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from trepan.processor.command.base_cmd import DebuggerCommand
+from pymathics.trepan.processor.complete import complete_symbol
 from pymathics.trepan.processor.frame import find_builtin
 
 class EvalCommand(DebuggerCommand):
@@ -43,6 +44,9 @@ class EvalCommand(DebuggerCommand):
 
     DebuggerCommand.setup(locals(), category="data", need_stack=True)
 
+    def complete_line(self, text: str):
+        return complete_symbol(self.proc, text)
+
     def run(self, args):
         if 1 == len(args):
             if self.proc.current_source_text:
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+#  Copyright (C) 2024 Rocky Bernstein
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+from pymathics.trepan.lib import recorder
+from pymathics.trepan.processor.command.base_cmd import DebuggerCommand
+from pymathics.trepan.processor.command.reversestep import NOTHING_RECORDED
+
+
+class GotoCommand(DebuggerCommand):
+    """**goto** [*event-number*]
+
+    Move to recorded evaluation event *event-number*, and show the
+    expression and recursion depth there. Without an event number, go
+    back to the newest event, where the program is stopped. Nothing is
+    run again.
+
+    Event numbers are shown by `reverse-step`, `reverse-finish` and
+    `goto`. Events are recorded when `set record` is on.
+
+    Examples:
+    ---------
+
+        goto 1234   # event #1234
+        goto        # the newest event
+
+    See also:
+    ---------
+
+    `reverse-step`, `reverse-finish`, `set record`"""
+
+    short_help = "Move to a recorded evaluation event"
+
+    DebuggerCommand.setup(locals(), category="running", max_args=1)
+
+    def run(self, args):
+        if not recorder.events:
+            self.errmsg(NOTHING_RECORDED)
+            return
+        if len(args) == 1:
+            index = len(recorder.events) - 1
+        else:
+            number = self.proc.get_int(args[1], min_value=1, cmdname="goto")
+            if number is None:
+                return
+            index = recorder.index_of(number)
+            if index is None:
+                self.errmsg(
+                    f"Event #{number} is not recorded; events "
+                    f"#{recorder.events[0].number} to #{recorder.events[-1].number} are."
+                )
+                return
+        event = recorder.move_to(index)
+        self.msg(recorder.format_event(event, self.settings["style"]))
+
+
+if __name__ == "__main__":
+    pass
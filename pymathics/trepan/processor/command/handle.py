@@ -19,6 +19,57 @@ from trepan.processor.command.handle import HandleCommand as TrepanHandleCommand
 
 
 class HandleCommand(TrepanHandleCommand):
+    """**handle** [*signal-name* [*action1* *action2* ...]]
+
+    Specify how to handle a signal *signal-name*. *signal-name* can be a
+    signal name like `SIGINT` or a signal number like 2. The absolute
+    value is used for numbers so -9 is the same as 9 (`SIGKILL`). When
+    signal names are used, you can drop off the leading "SIG" if you want. Also
+    letter case is not important either.
+
+    Arguments are signals and actions to apply to those signals.
+    recognized actions include `stop`, `nostop`, `print`, `noprint`,
+    `pass`, `nopass`, `ignore`, `noignore`, `dump` *file*, `nodump`,
+    `profile` *directory* or `noprofile`.
+
+    `stop` means reenter debugger if this signal happens (implies `print` and
+    `nopass`).
+
+    `Print` means print a message if this signal happens.
+
+    `Pass` means let program see this signal; otherwise the program see it.
+
+    `Ignore` is a synonym for `nopass`; `noignore` is a synonym for `pass`.
+
+    `dump` *file* means append the Mathics3 stack of every thread to
+    *file* and go on without stopping (implies `nostop`). This is a way
+    to see what a process that seems stuck is doing, without stopping
+    it. With "set shadowstack on", how long each expression has been
+    evaluating is shown too.
+
+    `profile` *directory* means start the Mathics3 profiler, or stop it
+    if it is running, and go on without stopping (implies `nostop`).
+    On stop, the time spent in each Builtin function and the folded
+    Mathics3 stacks are written to a file in *directory* named after the
+    process id and the time. The profiler samples the stacks, so
+    nothing needs to have been turned on beforehand.
+
+    Without any action names the current settings are shown.
+
+    **Examples:**
+
+      handle INT         # Show current settings of SIGINT
+      handle SIGINT      # same as above
+      handle int         # same as above
+      handle 2           # Probably the same as above
+      handle -2          # the same as above
+      handle INT nostop  # Don't stop in the debugger on SIGINT
+      handle USR1 dump /tmp/stacks.log noprint
+                         # On SIGUSR1, log the Mathics3 stacks and go on
+      handle USR2 profile /tmp noprint
+                         # SIGUSR2 starts, and then stops, profiling
+    """
+
     pass
 
 
@@ -113,7 +113,7 @@ class HelpCommand(DebuggerCommand):
 
             command_name = Mcmdproc.resolve_name(self.proc, cmd_name)
             if command_name:
-                instance = self.proc.commands[command_name]
+                instance = self.proc.load_command(command_name)
                 if hasattr(instance, "help"):
                     return instance.help(args)
                 else:
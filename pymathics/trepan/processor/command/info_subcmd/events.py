@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+#   Copyright (C) 2024 Rocky Bernstein <rocky@gnu.org>
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from time import perf_counter
+
+from trepan.processor.command.base_subcmd import DebuggerSubcommand
+
+import pymathics.trepan.tracing as tracing
+
+
+class InfoEvents(DebuggerSubcommand):
+    """**info events** [ *event-name* ... ]
+
+    Show how many of each kind of event there have been since events
+    were last activated with `DebugActivate` or `TraceActivate`, and
+    how many per second. Events are listed most frequent first, so when
+    tracing is unexpectedly slow, the event flooding it is at the top.
+
+    For each kind of event the counts are:
+
+    * seen: the event hook was called
+
+    * filtered: an event filter ruled the event out
+
+    * dispatched: the event went to the debugger to stop in
+
+    * printed: the event was shown
+
+    Events that were not seen are left out unless they are named.
+
+    Examples:
+    ---------
+
+      info events              # all events seen
+      info events evaluation   # just "evaluation" events
+
+    See also:
+    ---------
+
+    `show events`, `show tracebudget`
+    """
+
+    min_abbrev = 2  # Need at least "info ev"
+    short_help = "Event counts and rates since activation"
+
+    def run(self, args):
+        for name in args:
+            if name not in tracing.TraceEventNames:
+                self.errmsg(
+                    f"Event name {name} is not one of: "
+                    f"{', '.join(tracing.TraceEventNames)}."
+                )
+                return
+
+        elapsed = perf_counter() - tracing.events_counted_since
+        rows = []
+        for event in tracing.TraceEvent:
+            seen = tracing.events_seen[event.value]
+            if (args and event.name not in args) or (not args and seen == 0):
+                continue
+            rows.append(
+                (
+                    event.name,
+                    seen,
+                    tracing.events_filtered[event.value],
+                    tracing.events_dispatched[event.value],
+                    tracing.events_printed[event.value],
+                )
+            )
+        if not rows:
+            self.msg(f"No events in the {elapsed:.1f} seconds since activation.")
+            return
+
+        rows.sort(key=lambda row: row[1], reverse=True)
+        self.msg(f"Events in the {elapsed:.1f} seconds since activation:")
+        self.msg(
+            f"{'event':12} {'seen':>10} {'seen/s':>10} {'filtered':>10}"
+            f" {'dispatched':>10} {'printed':>10}"
+        )
+        for name, seen, filtered, dispatched, printed in rows:
+            rate = seen / elapsed if elapsed > 0 else 0.0
+            self.msg(
+                f"{name:12} {seen:10} {rate:10.1f} {filtered:10}"
+                f" {dispatched:10} {printed:10}"
+            )
+        return
+
+
+if __name__ == "__main__":
+    from pymathics.trepan.processor.command import mock, info as Minfo
+
+    d, cp = mock.dbg_setup()
+    i = Minfo.InfoCommand(cp)
+    sub = InfoEvents(i)
+    tracing.events_seen[tracing.EVALUATION_EVENT] = 1000
+    tracing.events_filtered[tracing.EVALUATION_EVENT] = 990
+    tracing.events_dispatched[tracing.EVALUATION_EVENT] = 10
+    tracing.events_seen[tracing.APPLY_EVENT] = 50
+    tracing.events_printed[tracing.APPLY_EVENT] = 50
+    sub.run([])
+    sub.run(["Get"])
+    sub.run(["bogus"])
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+#   Copyright (C) 2024 Rocky Bernstein
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import sys
+from typing import Iterable, Tuple
+
+from trepan.processor.command.base_subcmd import DebuggerSubcommand
+
+from pymathics.trepan.lib import (
+    collapse,
+    eval_functions,
+    numpy_calls,
+    parse_stats,
+    recorder,
+    shadow_stack,
+    treediff,
+    watch,
+)
+
+
+def held_nodes(roots: Iterable) -> Tuple[int, int]:
+    """Return the number of distinct expressions and atoms reachable
+    from ``roots``, and roughly how many bytes they take."""
+    seen = set()
+    count = size = 0
+    stack = [root for root in roots if root is not None]
+    while stack:
+        element = stack.pop()
+        if id(element) in seen:
+            continue
+        seen.add(id(element))
+        count += 1
+        size += sys.getsizeof(element)
+        elements = getattr(element, "elements", None)
+        if elements is not None:
+            size += sys.getsizeof(elements)
+            stack.append(element.head)
+            stack.extend(elements)
+    return count, size
+
+
+class InfoMemory(DebuggerSubcommand):
+    """**info memory** [ **debugger** ]
+
+    Show what the debugger itself is holding on to, and so keeping
+    from being freed.
+
+    At a stop, the debugger holds the frames of the call stack and the
+    event argument; through them the Evaluation and the expressions
+    being worked on stay alive. These are let go when execution
+    resumes.
+
+    Some debugger features keep things across stops: recorded
+    evaluation events keep their expressions, and the shadow stack
+    keeps those of unfinished evaluations. For these the number of
+    expressions and atoms held, and roughly their size, is shown.
+
+    Examples:
+    ---------
+
+      info memory
+      info memory debugger
+
+    See also:
+    ---------
+
+    `set record`, `set shadowstack`, `info parses`
+    """
+
+    min_abbrev = 2  # Need at least "info me"
+    short_help = "What the debugger is holding in memory"
+
+    def run(self, args):
+        if args and args[0] != "debugger":
+            self.errmsg(f"Expecting 'debugger'; got: {args[0]}.")
+            return
+
+        proc = self.proc
+        self.msg("Held for this stop:")
+        if proc.frame is None and not proc.stack:
+            self.msg("  nothing; not stopped")
+        else:
+            self.msg(f"  call stack: {len(proc.stack or [])} frames")
+            arg = self.core.arg
+            self.msg(
+                "  event argument: "
+                + ("none" if arg is None else type(arg).__name__)
+            )
+
+        self.msg("Kept across stops:")
+        count, size = held_nodes(
+            expr
+            for event in recorder.events
+            for expr in (event.expr, event.orig_expr)
+        )
+        self.msg(
+            f"  recorded events: {len(recorder.events):,} of {recorder.window():,},"
+            f" holding {count:,} expressions and atoms, about {size:,} bytes"
+        )
+        stacks = shadow_stack.get_all_stacks()
+        entries = [entry for stack in stacks.values() for entry in stack]
+        count, size = held_nodes(entry.expr for entry in entries)
+        self.msg(
+            f"  shadow stack entries: {len(entries):,}"
+            f" in {len(stacks)} threads, holding {count:,} expressions and atoms,"
+            f" about {size:,} bytes"
+        )
+        self.msg(
+            f"  tree-diff hash cache: {len(treediff._hash_cache):,} entries;"
+            " expressions are weakly referenced"
+        )
+        self.msg(
+            "  collapsed trace lines not yet shown:"
+            f" {len(collapse.collapser.pending)}"
+        )
+        self.msg(f"  slowest parses kept: {len(parse_stats.slowest)}")
+        self.msg(f"  watchpoints: {len(watch.watchpoints)}")
+        self.msg(f"  hooked eval functions: {len(eval_functions.hooked)}")
+        self.msg(f"  modules with NumPy replaced: {len(numpy_calls.patched)}")
+        return
+
+
+if __name__ == "__main__":
+    from pymathics.trepan.processor.command import mock, info as Minfo
+
+    d, cp = mock.dbg_setup()
+    i = Minfo.InfoCommand(cp)
+    sub = InfoMemory(i)
+    sub.run([])
+    sub.run(["bogus"])
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+#   Copyright (C) 2024 Rocky Bernstein
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+from trepan.processor.command.base_subcmd import DebuggerSubcommand
+
+from pymathics.trepan.lib import parse_stats
+
+# The number of parses shown when no count is given.
+DEFAULT_COUNT = 10
+
+
+class InfoParses(DebuggerSubcommand):
+    """**info parses** [ *count* ]
+
+    Show totals for the parses of Mathics3 input since the `parse`
+    event was activated, and the *count* slowest of them, 10 by
+    default.
+
+    For each parse, the number of characters and tokens read, the
+    number of expressions and atoms in the result, and the time it took
+    are shown, along with the start of the input.
+
+    Parses are timed only while the `parse` event is active, e.g.
+    after `TraceActivate[parse -> True]`.
+
+    Examples:
+    ---------
+
+      info parses      # totals and the 10 slowest parses
+      info parses 3    # totals and the 3 slowest parses
+
+    See also:
+    ---------
+
+    `info events`
+    """
+
+    min_abbrev = 2  # Need at least "info pa"
+    short_help = "Slowest parses and parse totals"
+
+    def run(self, args):
+        count = DEFAULT_COUNT
+        if args:
+            count = self.proc.get_int(
+                args[0], min_value=1, default=DEFAULT_COUNT, cmdname="info parses"
+            )
+            if count is None:
+                return
+
+        if parse_stats.parse_count == 0:
+            self.msg("No parses have been timed.")
+            return
+
+        self.msg(
+            f"{parse_stats.parse_count:,} parses: "
+            f"{parse_stats.total_chars:,} chars, "
+            f"{parse_stats.total_tokens:,} tokens "
+            f"in {parse_stats.total_seconds * 1000:.3f} ms"
+        )
+        records = parse_stats.slowest_parses(count)
+        self.msg(f"Slowest {len(records)}:")
+        self.msg(f"{'ms':>10} {'chars':>10} {'tokens':>10} {'nodes':>10}  input")
+        for record in records:
+            where = f"{record.filename}: " if record.filename else ""
+            self.msg(
+                f"{record.seconds * 1000:10.3f} {record.chars:10,} {record.tokens:10,}"
+                f" {record.size:10,}  {where}{record.text}"
+            )
+        return
+
+
+if __name__ == "__main__":
+    from pymathics.trepan.processor.command import mock, info as Minfo
+
+    d, cp = mock.dbg_setup()
+    i = Minfo.InfoCommand(cp)
+    sub = InfoParses(i)
+    sub.run([])
+    parse_stats.add_record(parse_stats.ParseRecord(0.002, 5, 4, 4, "", "1 + 2"))
+    parse_stats.add_record(
+        parse_stats.ParseRecord(0.03, 3000, 2002, 1002, "big.m", "{a, a, a")
+    )
+    sub.run([])
+    sub.run(["1"])
+    sub.run(["0"])
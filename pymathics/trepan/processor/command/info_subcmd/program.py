@@ -16,8 +16,10 @@
 
 # Our local modules
 from trepan.processor.command.base_subcmd import DebuggerSubcommand
-from pymathics.trepan.lib.format import pygments_format
+from pymathics.trepan.lib import numpy_calls, parse_stats
+from pymathics.trepan.lib.format import format_element, pygments_format
 from pymathics.trepan.lib.stack import print_stack_trace
+from pymathics.trepan.tracing import VALUES_NAMES, format_eval_args
 
 
 class InfoProgram(DebuggerSubcommand):
@@ -66,6 +68,33 @@ class InfoProgram(DebuggerSubcommand):
             formatted_function = pygments_format(f"{callback_arg[0]}()", style=style)
             self.msg(f"SymPy function: {formatted_function}")
             # self.msg(f"mpmath method: {callback_arg[1]}")
+        elif event == "evalFunction":
+            callback_arg = self.core.arg
+            formatted_function = pygments_format(f"{callback_arg[0]}()", style=style)
+            self.msg(f"eval function: {formatted_function}")
+            self.msg(f"args: {format_eval_args(callback_arg[2])}")
+        elif event == "Numpy":
+            callback_arg = self.core.arg
+            formatted_function = pygments_format(f"{callback_arg[0]}()", style=style)
+            self.msg(f"NumPy function: {formatted_function}")
+            self.msg(f"args: {numpy_calls.format_args(callback_arg[2])}")
+        elif event == "parse":
+            record, expr = self.core.arg[1]
+            self.msg(f"Parsed: {parse_stats.format_record(record)}")
+            if record.filename:
+                self.msg(f"from: {record.filename}")
+            if expr is not None:
+                # The expression can be huge, so just show its head.
+                head = format_element(expr.get_head())
+                self.msg(f"Expression head: {pygments_format(head, style)}")
+        elif event == "watch":
+            name, values_name, rules = self.core.arg
+            formatted_rules = pygments_format(
+                "{" + ", ".join(format_element(rule) for rule in rules) + "}",
+                style=style,
+            )
+            self.msg(f"Watched Symbol: {name}")
+            self.msg(f"{VALUES_NAMES[values_name]}: {formatted_rules}")
 
 
         print_stack_trace(
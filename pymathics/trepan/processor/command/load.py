@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+#  Copyright (C) 2024 Rocky Bernstein
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import os.path as osp
+
+from pymathics.trepan.lib.snapshot import load_definitions
+from pymathics.trepan.processor.command.base_cmd import DebuggerCommand
+from pymathics.trepan.processor.complete import get_definitions
+
+
+class LoadCommand(DebuggerCommand):
+    """**load** **definitions** *file*
+
+    Read user definitions written by `save definitions` from *file* into
+    the evaluation being debugged. The definitions of each Symbol in the
+    file replace any that Symbol has now; Symbols that aren't in the
+    file are left as they are.
+
+    Only plain data is read from the file, so loading a file from
+    somewhere else can't run code in this process.
+
+    Examples:
+    ---------
+
+        load definitions /tmp/state.mx3
+
+    See also:
+    ---------
+
+    `save definitions`"""
+
+    short_help = "Load Mathics3 user definitions from a file"
+
+    DebuggerCommand.setup(
+        locals(), category="data", min_args=2, max_args=2, need_stack=True
+    )
+
+    def run(self, args):
+        if args[1] != "definitions":
+            self.errmsg(f'Expecting "definitions"; got "{args[1]}".')
+            return
+
+        definitions = get_definitions(self.proc)
+        if definitions is None:
+            self.errmsg("Cannot find the Mathics3 definitions from the current frame")
+            return
+
+        path = osp.expanduser(args[2])
+        try:
+            symbol_count, rule_count = load_definitions(definitions, path)
+        except Exception as e:
+            self.errmsg(f"Cannot load definitions from {path}: {e}")
+            return
+        self.msg(f"Loaded {symbol_count} Symbols with {rule_count} rules from {path}.")
+
+
+if __name__ == "__main__":
+    pass
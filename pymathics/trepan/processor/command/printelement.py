@@ -14,11 +14,13 @@
 #  You should have received a copy of the GNU General Public License
 #  along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import re
 from getopt import getopt, GetoptError
 
 from mathics.core.element import BaseElement
 from mathics.core.pattern import AtomPattern, ExpressionPattern
 from mathics.core.rules import FunctionApplyRule, Rule
+from trepan.processor.complete_rl import complete_identifier
 from pymathics.trepan.processor.command.base_cmd import DebuggerCommand
 from pymathics.trepan.lib.format import format_element, pygments_format
 
@@ -32,14 +34,17 @@ class PrintElementCommand(DebuggerCommand):
     we Mathics3 elements to be wrapped in lists, dictionaries, and tuples.
     """
 
-    from importlib import reload
-    import pymathics
-    reload(pymathics.trepan.lib.format)
-
     aliases = ("print-element", "pexp", "pe")
     short_help = "Print a Mathics3 Expression nicely"
     DebuggerCommand.setup(locals(), category="running", max_args=2, need_stack=True)
 
+    def complete_line(self, text: str):
+        # What we print is given as a Python expression.
+        match = re.search(r"[A-Za-z_][A-Za-z0-9_.]*$", text)
+        if match is None:
+            return []
+        return complete_identifier(self, match.group(0))
+
     def run(self, args):
         try:
             opts, args = getopt(args[1:], "hp", "help".split())
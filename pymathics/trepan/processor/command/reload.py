@@ -20,6 +20,7 @@ import inspect
 # Our local modules
 from pymathics.trepan.processor.command.base_cmd import DebuggerCommand
 from pymathics.trepan.processor.command.base_submgr import SubcommandMgr
+from pymathics.trepan.processor.manifest import find_command_classnames
 
 
 class ReloadCommand(DebuggerCommand):
@@ -50,13 +51,11 @@ class ReloadCommand(DebuggerCommand):
             if cmd_name not in proc.commands:
                 self.errmsg(f'command "{cmd_name}" not found as a debugger command')
                 return
-            command_module = importlib.import_module(proc.commands[cmd_name].__module__)
+            command_module = importlib.import_module(
+                proc.load_command(cmd_name).__module__
+            )
             importlib.reload(command_module)
-            classnames = [
-                tup[0]
-                for tup in inspect.getmembers(command_module, inspect.isclass)
-                if ("DebuggerCommand" != tup[0] and tup[0].endswith("Command"))
-            ]
+            classnames = find_command_classnames(command_module)
             if len(classnames) == 1:
                 try:
                     instance = getattr(command_module, classnames[0])(proc)
@@ -66,16 +65,22 @@ class ReloadCommand(DebuggerCommand):
                     )
                     return
 
-                # FIXME: should we also replace object in proc.cmd_instances?
+                old_instance = proc.commands[cmd_name]
                 proc.commands[cmd_name] = instance
+                for i, cmd_instance in enumerate(proc.cmd_instances):
+                    if cmd_instance is old_instance:
+                        proc.cmd_instances[i] = instance
+                        break
+                    pass
+                proc.invalidate_completions()
                 self.msg(f'reloaded command: "{cmd_name}"')
             pass
         else:
             assert len(args) == 3
-            subcmd_mgr = proc.commands.get(cmd_name)
-            if subcmd_mgr is None:
+            if cmd_name not in proc.commands:
                 self.errmsg(f"cannot find {cmd_name} in list of commands")
                 return
+            subcmd_mgr = proc.load_command(cmd_name)
             if not isinstance(subcmd_mgr, SubcommandMgr):
                 self.errmsg(f"command {cmd_name} does not have subcommands")
                 return
@@ -104,6 +109,7 @@ class ReloadCommand(DebuggerCommand):
                     return
 
                 subcmd_mgr.cmds.subcmds[subcmd_name] = instance
+                subcmd_mgr.subcmd_trie = None
                 self.msg(f'reloaded subcommand: "{cmd_name} {subcmd_name}"')
             return
 
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+#  Copyright (C) 2024 Rocky Bernstein
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+from pymathics.trepan.lib import recorder
+from pymathics.trepan.processor.command.base_cmd import DebuggerCommand
+from pymathics.trepan.processor.command.reversestep import NOTHING_RECORDED
+
+
+class ReverseFinishCommand(DebuggerCommand):
+    """**reverse-finish**
+
+    Move back, in the recording of evaluation events, to where the
+    evaluation that we are in started, and show the expression and
+    recursion depth there. That is the nearest earlier "Evaluating"
+    event at a smaller depth. Nothing is run again; the program stays
+    where it is stopped.
+
+    Events are recorded when `set record` is on.
+
+    See also:
+    ---------
+
+    `reverse-step`, `goto`, `set record`"""
+
+    aliases = ("reverse-finish", "rf")
+    short_help = "Move back to where the recorded evaluation started"
+
+    DebuggerCommand.setup(locals(), category="running", max_args=0)
+
+    def run(self, args):
+        index = recorder.cursor_index()
+        if index is None:
+            self.errmsg(NOTHING_RECORDED)
+            return
+        entry_index = recorder.enclosing_entry(index)
+        if entry_index is None:
+            self.errmsg(
+                "Where this evaluation started is no longer, or never was, recorded."
+            )
+            return
+        event = recorder.move_to(entry_index)
+        self.msg(recorder.format_event(event, self.settings["style"]))
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+#  Copyright (C) 2024 Rocky Bernstein
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+from pymathics.trepan.lib import recorder
+from pymathics.trepan.processor.command.base_cmd import DebuggerCommand
+
+NOTHING_RECORDED = (
+    "No evaluation events are recorded. Use 'set record on', "
+    "and run until we stop again."
+)
+
+
+class ReverseStepCommand(DebuggerCommand):
+    """**reverse-step** [*count*]
+
+    Move back *count* events, or 1 if *count* is not given, in the
+    recording of evaluation events, and show the expression and
+    recursion depth there. Nothing is run again; the program stays
+    where it is stopped.
+
+    Events are recorded when `set record` is on.
+
+    Examples:
+    ---------
+
+        reverse-step     # back one event
+        rs 10            # back ten events
+
+    See also:
+    ---------
+
+    `reverse-finish`, `goto`, `set record`"""
+
+    aliases = ("reverse-step", "rs")
+    short_help = "Move back through the recorded evaluation events"
+
+    DebuggerCommand.setup(locals(), category="running", max_args=1)
+
+    def run(self, args):
+        index = recorder.cursor_index()
+        if index is None:
+            self.errmsg(NOTHING_RECORDED)
+            return
+        count = self.proc.get_int(
+            args[1] if len(args) > 1 else None,
+            min_value=1,
+            cmdname="reverse-step",
+        )
+        if count is None:
+            return
+        if index - count < 0:
+            self.errmsg(
+                f"Only {index} earlier events are recorded; "
+                f"the oldest is #{recorder.events[0].number}."
+            )
+            return
+        event = recorder.move_to(index - count)
+        self.msg(recorder.format_event(event, self.settings["style"]))
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+#  Copyright (C) 2024 Rocky Bernstein
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import os.path as osp
+
+from pymathics.trepan.lib.snapshot import save_definitions
+from pymathics.trepan.processor.command.base_cmd import DebuggerCommand
+from pymathics.trepan.processor.complete import get_definitions
+
+
+class SaveCommand(DebuggerCommand):
+    """**save** **definitions** *file*
+
+    Write the user definitions of the evaluation being debugged to
+    *file*: the OwnValues, DownValues, UpValues, SubValues, NValues,
+    DefaultValues, FormatValues, messages, attributes and options of each
+    Symbol that has them. The file can be read back with `load
+    definitions`, in this session or another one, to get to the same
+    state without running everything that led to it.
+
+    Symbols are written one at a time, in a compact binary format.
+    Rules and options holding atoms other than numbers and strings,
+    images say, are left out.
+
+    Examples:
+    ---------
+
+        save definitions /tmp/state.mx3
+
+    See also:
+    ---------
+
+    `load definitions`"""
+
+    short_help = "Save the Mathics3 user definitions to a file"
+
+    DebuggerCommand.setup(
+        locals(), category="data", min_args=2, max_args=2, need_stack=True
+    )
+
+    def run(self, args):
+        if args[1] != "definitions":
+            self.errmsg(f'Expecting "definitions"; got "{args[1]}".')
+            return
+
+        definitions = get_definitions(self.proc)
+        if definitions is None:
+            self.errmsg("Cannot find the Mathics3 definitions from the current frame")
+            return
+
+        path = osp.expanduser(args[2])
+        try:
+            symbol_count, rule_count, skipped = save_definitions(definitions, path)
+        except Exception as e:
+            self.errmsg(f"Cannot save definitions to {path}: {e}")
+            return
+        self.msg(f"Saved {symbol_count} Symbols with {rule_count} rules to {path}.")
+        if skipped:
+            self.msg(
+                f"{skipped} rules and options that can't be saved, such as rules "
+                "that call Python functions, were left out."
+            )
+
+
+if __name__ == "__main__":
+    pass
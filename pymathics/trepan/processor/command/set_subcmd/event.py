@@ -27,6 +27,8 @@ from pymathics.trepan.tracing import (
     apply_builtin_fn_print,
     call_event_debug,
     call_event_get,
+    call_event_print,
+    return_event_print,
 )
 from mathics.core.rules import FunctionApplyRule
 
@@ -93,7 +95,8 @@ class SetEvent(DebuggerSubcommand):
                     tracing.hook_entry_fn = call_event_debug
                     tracing.run_sympy = tracing.run_sympy_traced
                 elif on_off == "trace":
-                    tracing.hook_entry_fn = tracing.call_event_print
+                    tracing.hook_entry_fn = call_event_print
+                    tracing.hook_exit_fn = return_event_print
                     tracing.run_sympy = tracing.run_sympy_traced
                 else:
                     tracing.run_sympy = tracing.run_fast
@@ -103,7 +106,8 @@ class SetEvent(DebuggerSubcommand):
                     tracing.hook_entry_fn = call_event_debug
                     tracing.run_mpmath = tracing.run_mpmath_traced
                 elif on_off == "trace":
-                    tracing.hook_entry_fn = tracing.call_event_print
+                    tracing.hook_entry_fn = call_event_print
+                    tracing.hook_exit_fn = return_event_print
                     tracing.run_mpmath = tracing.run_mpmath_traced
                 else:
                     tracing.run_mpmath = tracing.run_fast
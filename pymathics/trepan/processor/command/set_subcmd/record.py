@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+#   Copyright (C) 2024 Rocky Bernstein
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+from trepan.processor.cmdfns import get_onoff, show_onoff
+from trepan.processor.command.base_subcmd import DebuggerSetBoolSubcommand
+
+from pymathics.trepan.lib import recorder
+
+
+class SetRecord(DebuggerSetBoolSubcommand):
+    """**set record** [ **on** | **off** ]
+
+    Have the evaluation event hooks record each evaluate-entry,
+    evaluate-result and rewrite event, so that `reverse-step`,
+    `reverse-finish` and `goto` can move back through them.
+
+    Events hold references to the expressions involved, which are not
+    copied. Only the newest events are kept; see `set recordwindow`.
+    Turning recording on starts a new recording. Turning it off keeps
+    what was recorded. Only expressions that pass through an activated
+    evaluation hook are recorded, so activate `evaluation` tracing or
+    debugging as well.
+
+    Examples:
+    ---------
+
+      set record on   # record evaluation events
+      set record off  # stop recording
+
+    See also:
+    ---------
+
+    `show record`, `set recordwindow`, `reverse-step`
+    """
+
+    min_abbrev = len("rec")
+    short_help = "Set recording evaluation events"
+
+    def run(self, args):
+        if len(args) == 0:
+            args = ["on"]
+        try:
+            is_on = get_onoff(self.errmsg, args[0])
+        except ValueError:
+            return
+        if is_on and not recorder.enabled:
+            recorder.clear()
+        recorder.enabled = is_on
+        self.msg(f"Recording evaluation events is {show_onoff(is_on)}.")
+
+    pass
+
+
+if __name__ == "__main__":
+    from pymathics.trepan.processor.command import mock, set as Mset
+
+    d, cp = mock.dbg_setup()
+    s = Mset.SetCommand(cp)
+    sub = SetRecord(s)
+    for args in (["on"], ["off"], ["bogus"]):
+        sub.run(args)
+        pass
+    pass
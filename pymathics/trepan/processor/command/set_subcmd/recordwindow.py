@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+#   Copyright (C) 2024 Rocky Bernstein
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+from trepan.processor.cmdfns import get_an_int
+from trepan.processor.command.base_subcmd import DebuggerSubcommand
+
+from pymathics.trepan.lib import recorder
+
+
+class SetRecordWindow(DebuggerSubcommand):
+    """**set recordwindow** *count*
+
+    Keep at most the newest *count* recorded evaluation events. When
+    more come in, the oldest are dropped. The default is 10000.
+
+    Examples:
+    ---------
+
+      set recordwindow 100000
+
+    See also:
+    ---------
+
+    `set record`, `show record`
+    """
+
+    in_list = True
+    min_args = 1
+    max_args = 1
+    min_abbrev = len("recordw")
+    short_help = "Set the number of evaluation events to keep"
+
+    def run(self, args):
+        size = get_an_int(
+            self.errmsg,
+            args[0],
+            f"The number of events to keep should be a positive integer; got {args[0]}.",
+            min_value=1,
+        )
+        if size is None:
+            return
+        recorder.set_window(size)
+        self.msg(f"The newest {size} evaluation events are kept.")
+
+    pass
+
+
+if __name__ == "__main__":
+    from pymathics.trepan.processor.command import mock, set as Mset
+
+    d, cp = mock.dbg_setup()
+    s = Mset.SetCommand(cp)
+    sub = SetRecordWindow(s)
+    for args in (["100"], ["0"], ["bogus"]):
+        sub.run(args)
+        pass
+    pass
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+#   Copyright (C) 2024 Rocky Bernstein
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from trepan.processor.cmdfns import get_onoff, show_onoff
+from trepan.processor.command.base_subcmd import DebuggerSetBoolSubcommand
+
+from pymathics.trepan.lib import shadow_stack
+
+
+class SetShadowStack(DebuggerSetBoolSubcommand):
+    """**set shadowstack** [ **on** | **off** ]
+
+    Have the evaluation and apply event hooks keep their own record of
+    the Mathics3 expressions under evaluation.
+
+    With this on, `backtrace -e` reads that record rather than walking
+    and inspecting every Python frame. Only expressions that pass
+    through an activated event hook are recorded, so activate
+    `evaluation` or `apply` tracing or debugging as well.
+
+    Examples:
+    ---------
+
+      set shadowstack on   # keep a Mathics3 shadow stack
+      set shadowstack off  # stop keeping one
+
+    See also:
+    ---------
+
+    `show shadowstack`, `backtrace`
+    """
+
+    min_abbrev = len("sha")
+    short_help = "Set keeping a Mathics3 evaluation shadow stack"
+
+    def run(self, args):
+        if len(args) == 0:
+            args = ["on"]
+        try:
+            is_on = get_onoff(self.errmsg, args[0])
+        except ValueError:
+            return
+        if is_on != shadow_stack.enabled:
+            # Whatever was recorded before is no longer trustworthy.
+            shadow_stack.clear()
+        shadow_stack.enabled = is_on
+        self.msg(f"Shadow stack is {show_onoff(is_on)}.")
+
+    pass
+
+
+if __name__ == "__main__":
+    from pymathics.trepan.processor.command import mock, set as Mset
+
+    d, cp = mock.dbg_setup()
+    s = Mset.SetCommand(cp)
+    sub = SetShadowStack(s)
+    for args in (["on"], ["off"], ["bogus"]):
+        sub.run(args)
+        pass
+    pass
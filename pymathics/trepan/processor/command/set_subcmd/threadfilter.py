@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+#   Copyright (C) 2024 Rocky Bernstein
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import threading
+from typing import Optional
+
+from trepan.processor.command.base_subcmd import DebuggerSubcommand
+
+
+def find_thread(name_or_id: str) -> Optional[threading.Thread]:
+    """Return the live thread whose name or identifier is
+    ``name_or_id``, or None if there isn't one."""
+    for thread in threading.enumerate():
+        if name_or_id in (thread.name, str(thread.ident)):
+            return thread
+    return None
+
+
+class SetThreadFilter(DebuggerSubcommand):
+    """**set threadfilter** [ *thread-name* | *thread-id* | **.** | **off** ]
+
+    Only stop in the debugger for events in the given thread. Events in
+    other threads are ignored, and those threads never wait on the
+    debugger.
+
+    `.` is the thread we are stopped in now. `off` removes the filter,
+    so that events in any thread can stop.
+
+    Examples:
+    ---------
+
+      set threadfilter .             # only this thread
+      set threadfilter MainThread    # only the main thread
+      set threadfilter 140512236709696
+      set threadfilter off           # any thread
+
+    See also:
+    ---------
+
+    `show threadfilter`
+    """
+
+    in_list = True
+    min_args = 1
+    max_args = 1
+    min_abbrev = len("thr")
+    short_help = "Set the thread that the debugger stops in"
+
+    def run(self, args):
+        arg = args[0]
+        if arg == "off":
+            self.core.thread_filter = None
+            self.msg("Events in any thread stop.")
+            return
+        if arg == ".":
+            thread = threading.current_thread()
+        else:
+            thread = find_thread(arg)
+            if thread is None:
+                self.errmsg(f"No thread named or with identifier {arg}.")
+                return
+        self.core.thread_filter = thread.ident
+        self.msg(f"Only events in thread {thread.name} ({thread.ident}) stop.")
+
+    pass
+
+
+if __name__ == "__main__":
+    from pymathics.trepan.processor.command import mock, set as Mset
+
+    d, cp = mock.dbg_setup()
+    s = Mset.SetCommand(cp)
+    sub = SetThreadFilter(s)
+    for args in (["."], ["MainThread"], ["bogus"], ["off"]):
+        sub.run(args)
+        pass
+    pass
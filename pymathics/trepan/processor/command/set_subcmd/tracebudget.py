@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+#   Copyright (C) 2024 Rocky Bernstein
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+from trepan.processor.command.base_subcmd import DebuggerSubcommand
+
+from pymathics.trepan.lib.governor import governor
+
+
+def parse_budget(arg: str) -> float:
+    """Turn ``arg``, a percentage like "10%" or "10", into a fraction.
+    Raise ValueError if that can't be done."""
+    budget = float(arg[:-1] if arg.endswith("%") else arg) / 100
+    if not 0 < budget < 1:
+        raise ValueError(arg)
+    return budget
+
+
+class SetTraceBudget(DebuggerSubcommand):
+    """**set tracebudget** *percent*[**%**] | **off**
+
+    Limit the time spent handling trace and debug events to *percent*
+    of the time evaluating.
+
+    Every half second, the time spent in event handlers is compared
+    with the budget. When it is over, event handling is throttled a step:
+    from handling every event, to handling one event in a hundred, to
+    only counting events. Each step is reported. Time spent at the
+    debugger prompt is not counted.
+
+    Setting the budget again starts over with every event handled. `off`
+    removes the budget.
+
+    Examples:
+    ---------
+
+      set tracebudget 10%   # spend at most a tenth of the time on events
+      set tracebudget off   # handle every event, however long it takes
+
+    See also:
+    ---------
+
+    `show tracebudget`
+    """
+
+    in_list = True
+    min_args = 1
+    max_args = 1
+    min_abbrev = len("traceb")
+    short_help = "Set the share of time event handling may take"
+
+    def run(self, args):
+        arg = args[0]
+        if arg == "off":
+            governor.set_budget(None)
+            self.msg("Events are handled without a time budget.")
+            return
+        try:
+            budget = parse_budget(arg)
+        except ValueError:
+            self.errmsg(f"Expecting a percentage between 0 and 100 or 'off'; got {arg}.")
+            return
+        governor.log = self.msg
+        governor.set_budget(budget)
+        self.msg(f"Event handling may take {budget:.1%} of the time.")
+
+    pass
+
+
+if __name__ == "__main__":
+    from pymathics.trepan.processor.command import mock, set as Mset
+
+    d, cp = mock.dbg_setup()
+    s = Mset.SetCommand(cp)
+    sub = SetTraceBudget(s)
+    for args in (["10%"], ["2.5"], ["bogus"], ["150%"], ["off"]):
+        sub.run(args)
+        pass
+    pass
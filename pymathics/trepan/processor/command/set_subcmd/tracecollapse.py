@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+#   Copyright (C) 2024 Rocky Bernstein
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+from trepan.processor.cmdfns import get_onoff, show_onoff
+from trepan.processor.command.base_subcmd import DebuggerSetBoolSubcommand
+
+from pymathics.trepan.lib import collapse
+from pymathics.trepan.tracing import flush_trace_repeats
+
+
+class SetTraceCollapse(DebuggerSetBoolSubcommand):
+    """**set tracecollapse** [ **on** | **off** ]
+
+    When tracing evaluations, show a line that repeats the line before
+    it only once. When the run of repeats ends, a line like `(x 3,214)`
+    says how many times in a row it came up.
+
+    Repeats are spotted before anything is formatted, so they cost
+    little. This is on by default.
+
+    Examples:
+    ---------
+
+      set tracecollapse on   # collapse runs of repeated lines
+      set tracecollapse off  # show every line
+
+    See also:
+    ---------
+
+    `show tracecollapse`
+    """
+
+    min_abbrev = len("tracec")
+    short_help = "Set collapsing repeated evaluation-trace lines"
+
+    def run(self, args):
+        if len(args) == 0:
+            args = ["on"]
+        try:
+            is_on = get_onoff(self.errmsg, args[0])
+        except ValueError:
+            return
+        if not is_on:
+            flush_trace_repeats()
+        collapse.enabled = is_on
+        self.msg(f"Collapsing repeated trace lines is {show_onoff(is_on)}.")
+
+    pass
+
+
+if __name__ == "__main__":
+    from pymathics.trepan.processor.command import mock, set as Mset
+
+    d, cp = mock.dbg_setup()
+    s = Mset.SetCommand(cp)
+    sub = SetTraceCollapse(s)
+    for args in (["off"], ["on"], ["bogus"]):
+        sub.run(args)
+        pass
+    pass
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+#   Copyright (C) 2024 Rocky Bernstein
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+from trepan.processor.cmdfns import get_onoff, show_onoff
+from trepan.processor.command.base_subcmd import DebuggerSetBoolSubcommand
+
+from pymathics.trepan.lib import treediff
+
+
+class SetTraceDiff(DebuggerSetBoolSubcommand):
+    """**set tracediff** [ **on** | **off** ]
+
+    When tracing evaluations, show a result that differs from what was
+    evaluated in only a few places as those places: a Part path, with
+    the old and new subexpressions there. Otherwise, both expressions
+    are shown in full.
+
+    Finding the changes skips over the parts that are unchanged, so for
+    large expressions this is faster, as well as shorter, than showing
+    them in full.
+
+    Examples:
+    ---------
+
+      set tracediff on   # show what changed
+      set tracediff off  # show whole expressions
+
+    See also:
+    ---------
+
+    `show tracediff`
+    """
+
+    min_abbrev = len("traced")
+    short_help = "Set showing only what changed in traced evaluations"
+
+    def run(self, args):
+        if len(args) == 0:
+            args = ["on"]
+        try:
+            is_on = get_onoff(self.errmsg, args[0])
+        except ValueError:
+            return
+        treediff.enabled = is_on
+        self.msg(f"Showing only what changed is {show_onoff(is_on)}.")
+
+    pass
+
+
+if __name__ == "__main__":
+    from pymathics.trepan.processor.command import mock, set as Mset
+
+    d, cp = mock.dbg_setup()
+    s = Mset.SetCommand(cp)
+    sub = SetTraceDiff(s)
+    for args in (["on"], ["off"], ["bogus"]):
+        sub.run(args)
+        pass
+    pass
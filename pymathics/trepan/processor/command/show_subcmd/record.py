@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+#   Copyright (C) 2024 Rocky Bernstein
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+from trepan.processor.cmdfns import show_onoff
+from trepan.processor.command.base_subcmd import DebuggerSubcommand
+
+from pymathics.trepan.lib import recorder
+
+
+class ShowRecord(DebuggerSubcommand):
+    """**show record**
+
+    Show whether evaluation events are being recorded, how many are
+    kept and how many were dropped, and which event `reverse-step` and
+    friends are at.
+
+    See also:
+    ---------
+
+    `set record`, `set recordwindow`"""
+
+    min_abbrev = len("rec")
+    short_help = "Show recording evaluation events"
+
+    def run(self, args):
+        self.msg(f"Recording evaluation events is {show_onoff(recorder.enabled)}.")
+        events = recorder.events
+        self.msg(f"{len(events)} of at most {recorder.window()} events kept.")
+        if not events:
+            return
+        self.msg(
+            f"Events #{events[0].number} to #{events[-1].number}; "
+            f"{recorder.evicted()} older events were dropped."
+        )
+        if recorder.cursor is not None:
+            self.msg(f"At event #{recorder.cursor}.")
+
+    pass
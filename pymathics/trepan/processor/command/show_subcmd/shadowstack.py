@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+#   Copyright (C) 2024 Rocky Bernstein
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from trepan.processor.cmdfns import show_onoff
+from trepan.processor.command.base_subcmd import DebuggerShowBoolSubcommand
+
+from pymathics.trepan.lib import shadow_stack
+
+
+class ShowShadowStack(DebuggerShowBoolSubcommand):
+    """**show shadowstack**
+
+    Show whether the event hooks keep a Mathics3 evaluation shadow
+    stack, and if so, how many entries it has in each thread.
+
+    See also:
+    ---------
+
+    `set shadowstack`"""
+
+    min_abbrev = len("sha")
+    short_help = "Show keeping a Mathics3 evaluation shadow stack"
+
+    def run(self, args):
+        self.msg(f"Shadow stack is {show_onoff(shadow_stack.enabled)}.")
+        for thread_id, stack in shadow_stack.get_all_stacks().items():
+            self.msg(f"  thread {thread_id}: {len(stack)} entries")
+
+    pass
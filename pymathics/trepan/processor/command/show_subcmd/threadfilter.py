@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+#   Copyright (C) 2024 Rocky Bernstein
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import threading
+
+from trepan.processor.command.base_subcmd import DebuggerSubcommand
+
+
+class ShowThreadFilter(DebuggerSubcommand):
+    """**show threadfilter**
+
+    Show the thread that the debugger stops in, if it is limited to one.
+
+    See also:
+    ---------
+
+    `set threadfilter`"""
+
+    min_abbrev = len("thr")
+    short_help = "Show the thread that the debugger stops in"
+
+    def run(self, args):
+        thread_id = self.core.thread_filter
+        if thread_id is None:
+            self.msg("Events in any thread stop.")
+            return
+        for thread in threading.enumerate():
+            if thread.ident == thread_id:
+                self.msg(f"Only events in thread {thread.name} ({thread_id}) stop.")
+                return
+        self.msg(f"Only events in thread {thread_id} stop; it is no longer running.")
+
+    pass
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+#   Copyright (C) 2024 Rocky Bernstein
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+from trepan.processor.command.base_subcmd import DebuggerSubcommand
+
+from pymathics.trepan.lib.governor import governor
+
+
+class ShowTraceBudget(DebuggerSubcommand):
+    """**show tracebudget**
+
+    Show the share of time that event handling may take, how much it
+    took over the last half second, how event handling has been
+    throttled, and how many events were skipped.
+
+    See also:
+    ---------
+
+    `set tracebudget`"""
+
+    min_abbrev = len("traceb")
+    short_help = "Show the share of time event handling may take"
+
+    def run(self, args):
+        if governor.budget is None:
+            self.msg("Events are handled without a time budget.")
+            return
+        self.msg(
+            f"Event handling may take {governor.budget:.1%} of the time; "
+            f"it last took {governor.last_overhead:.1%}."
+        )
+        self.msg(f"Events handled: {governor.level_name}.")
+        for seconds, old_level, new_level, overhead in governor.changes:
+            self.msg(
+                f"  at {seconds:.1f}s: {old_level} -> {new_level} "
+                f"(took {overhead:.1%})"
+            )
+        if governor.skipped:
+            self.msg("Events skipped:")
+            for event_name, count in governor.skipped.most_common():
+                self.msg(f"  {event_name}: {count}")
+
+    pass
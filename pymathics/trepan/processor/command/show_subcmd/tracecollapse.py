@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+#   Copyright (C) 2024 Rocky Bernstein
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+from trepan.processor.cmdfns import show_onoff
+from trepan.processor.command.base_subcmd import DebuggerShowBoolSubcommand
+
+from pymathics.trepan.lib import collapse
+
+
+class ShowTraceCollapse(DebuggerShowBoolSubcommand):
+    """**show tracecollapse**
+
+    Show whether runs of repeated evaluation-trace lines are collapsed.
+
+    See also:
+    ---------
+
+    `set tracecollapse`"""
+
+    min_abbrev = len("tracec")
+    short_help = "Show collapsing repeated evaluation-trace lines"
+
+    def run(self, args):
+        self.msg(f"Collapsing repeated trace lines is {show_onoff(collapse.enabled)}.")
+
+    pass
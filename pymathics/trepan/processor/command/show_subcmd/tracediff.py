@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+#   Copyright (C) 2024 Rocky Bernstein
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+from trepan.processor.cmdfns import show_onoff
+from trepan.processor.command.base_subcmd import DebuggerShowBoolSubcommand
+
+from pymathics.trepan.lib import treediff
+
+
+class ShowTraceDiff(DebuggerShowBoolSubcommand):
+    """**show tracediff**
+
+    Show whether traced evaluation results show only what changed.
+
+    See also:
+    ---------
+
+    `set tracediff`"""
+
+    min_abbrev = len("traced")
+    short_help = "Show showing only what changed in traced evaluations"
+
+    def run(self, args):
+        self.msg(f"Showing only what changed is {show_onoff(treediff.enabled)}.")
+
+    pass
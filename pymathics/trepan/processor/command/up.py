@@ -44,6 +44,7 @@ class UpCommand(DebuggerCommand):
 
     `down` and `frame`."""
     signum = -1  # This is what distinguishes us from "down"
+    short_help = "Move stack frame to an older selected frame"
 
     DebuggerCommand.setup(locals(), category="stack", need_stack=True, max_args=2)
 
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+#  Copyright (C) 2024 Rocky Bernstein
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+from getopt import getopt, GetoptError
+
+from pymathics.trepan.lib import watch
+from pymathics.trepan.processor.command.base_cmd import DebuggerCommand
+from pymathics.trepan.processor.complete import complete_symbol, get_definitions
+
+
+class WatchCommand(DebuggerCommand):
+    """**watch** [**-p**] *symbol* ...
+
+    **watch** **-d** [*symbol* ...]
+
+    **watch**
+
+    Watch the values of Mathics3 Symbols. Each time an assignment,
+    `Clear`, `Unset` or `Block` changes the OwnValues or DownValues
+    of a watched Symbol, the new values are shown and we stop there.
+    With option -p, the values are shown but we don't stop.
+
+    Option -d stops watching the given Symbols, or all Symbols if none
+    are given. With no arguments, list the Symbols being watched.
+
+    Watching costs nothing for Symbols that aren't watched; there is
+    no stepping through evaluations to compare values.
+
+    Examples:
+    ---------
+
+        watch x         # stop when x is assigned or cleared
+        watch -p f      # show changes to the rules for f
+        watch -d x      # stop watching x
+        watch -d        # stop watching everything
+
+    See also:
+    ---------
+
+    `info program`"""
+
+    short_help = "Stop or print when a Symbol's values change"
+
+    DebuggerCommand.setup(locals(), category="breakpoints", need_stack=True)
+
+    def complete_line(self, text: str):
+        return complete_symbol(self.proc, text)
+
+    def run(self, args):
+        try:
+            opts, names = getopt(args[1:], "dhp", ["help"])
+        except GetoptError as err:
+            self.errmsg(str(err))
+            return
+
+        delete = False
+        stop = True
+        for o, _ in opts:
+            if o in ("-h", "--help"):
+                self.proc.commands["help"].run(["help", "watch"])
+                return
+            elif o == "-d":
+                delete = True
+            elif o == "-p":
+                stop = False
+
+        if not names and not delete:
+            self.list_watchpoints()
+            return
+
+        definitions = get_definitions(self.proc)
+        if definitions is None:
+            self.errmsg("Cannot find the Mathics3 definitions from the current frame")
+            return
+
+        if delete:
+            if not names:
+                names = list(watch.watchpoints)
+            for name in names:
+                if watch.delete_watchpoint(definitions, name):
+                    self.msg(f"No longer watching {definitions.lookup_name(name)}.")
+                else:
+                    self.errmsg(f"{name} is not being watched.")
+            return
+
+        for name in names:
+            watchpoint = watch.add_watchpoint(definitions, name, stop)
+            action = "Stop" if stop else "Print"
+            self.msg(f"{action} when the values of {watchpoint.name} change.")
+
+    def list_watchpoints(self):
+        if not watch.watchpoints:
+            self.msg("No Symbols are being watched.")
+            return
+        self.msg("Symbol                         Action  Changes")
+        for watchpoint in watch.watchpoints.values():
+            action = "stop" if watchpoint.stop else "print"
+            self.msg(f"{watchpoint.name:30} {action:7} {watchpoint.hits}")
+
+
+if __name__ == "__main__":
+    pass
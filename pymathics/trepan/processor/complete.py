@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+#   Copyright (C) 2024 Rocky Bernstein <rocky@gnu.org>
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""CommandProcessor GNU-readline/libedit completion routines.
+
+This follows trepan.processor.complete_rl. The difference is that
+candidates come from prefix tries which are built once and kept on
+the command processor, instead of from scanning all commands, aliases
+and macros each time. Mathics3 Symbol names from the definitions of
+the evaluation being debugged are indexed the same way, for commands
+like "eval" and "printelement".
+"""
+
+import re
+from typing import List, Optional
+
+from trepan.lib.complete import next_token
+
+from pymathics.trepan.lib.trie import PrefixTrie
+
+# A Mathics3 Symbol name, possibly with a context, at the end of some text.
+END_SYMBOL_RE = re.compile(r"[$A-Za-z][$`A-Za-z0-9]*$")
+
+
+def command_tries(proc_obj):
+    """Return the tries of command names, alias names and macro names
+    of ``proc_obj``. Alias names map to the name of their command.
+
+    The tries are rebuilt after CommandProcessor.invalidate_completions()
+    is called, or when the number of commands, aliases or macros
+    changes.
+    """
+    key = (len(proc_obj.commands), len(proc_obj.aliases), len(proc_obj.macros))
+    tries = proc_obj.completion_tries
+    if tries is None or tries[0] != key:
+        alias_trie = PrefixTrie()
+        for alias_name, cmd_name in proc_obj.aliases.items():
+            alias_trie.add(alias_name, cmd_name)
+        tries = proc_obj.completion_tries = (
+            key,
+            PrefixTrie(proc_obj.commands),
+            alias_trie,
+            PrefixTrie(proc_obj.macros),
+        )
+    return tries[1:]
+
+
+def get_definitions(proc_obj):
+    """Return the Mathics3 Definitions of the evaluation that the
+    current frame is part of, or None if we can't find one."""
+    frame = proc_obj.curframe
+    while frame is not None:
+        evaluation = frame.f_locals.get("evaluation")
+        definitions = getattr(evaluation, "definitions", None)
+        if definitions is not None:
+            return definitions
+        frame = frame.f_back
+    return None
+
+
+def symbol_trie(proc_obj) -> Optional[PrefixTrie]:
+    """Return a trie of the Mathics3 Symbol names defined in the
+    evaluation being debugged. Each name is in there with its context
+    and without.
+
+    The trie is kept on ``proc_obj``. When names are added to the
+    definitions, only the new names are indexed.
+    """
+    definitions = get_definitions(proc_obj)
+    if definitions is None:
+        return None
+
+    key = (
+        len(definitions.builtin),
+        len(definitions.pymathics),
+        len(definitions.user),
+    )
+    index = proc_obj.symbol_index
+    if index is None or index[0] is not definitions:
+        index = proc_obj.symbol_index = [definitions, None, PrefixTrie(), set()]
+    if index[1] != key:
+        _, _, trie, indexed_names = index
+        for name in definitions.get_names() - indexed_names:
+            trie.add(name)
+            trie.add(name.rsplit("`", 1)[-1])
+            indexed_names.add(name)
+        index[1] = key
+    return index[2]
+
+
+def complete_symbol(proc_obj, text: str) -> List[str]:
+    """Complete the Mathics3 Symbol name that ``text`` ends with."""
+    match = END_SYMBOL_RE.search(text)
+    if match is None:
+        return []
+    trie = symbol_trie(proc_obj)
+    if trie is None:
+        return []
+    prefix = match.group(0)
+
+    # readline replaces just the text after its last word delimiter,
+    # and both "`" and "$" are delimiters. So that is all we give back.
+    cut = max(prefix.rfind("`"), prefix.rfind("$")) + 1
+    return [name[cut:] for name in trie.complete(prefix)]
+
+
+def completer(proc_obj, line: str, state: int) -> list:
+    """Return the completions of ``line``, followed by None."""
+    next_blank_pos, token = next_token(line, 0)
+    commands, aliases, macros = command_tries(proc_obj)
+
+    match_pairs = [
+        [cmd_name, proc_obj.commands[cmd_name]]
+        for cmd_name in commands.complete(token)
+    ]
+    matched_names = {pair[0] for pair in match_pairs}
+    for alias_name, cmd_name in aliases.items(token):
+        if cmd_name not in matched_names and cmd_name in proc_obj.commands:
+            match_pairs.append([alias_name, proc_obj.commands[cmd_name]])
+    for macro_name in macros.complete(token):
+        match_pairs.append([macro_name, None])
+
+    if len(line) == next_blank_pos:
+        if len(match_pairs) == 1 and match_pairs[0][0] == token:
+            # Add space to advance completion on next tab-complete
+            match_pairs[0][0] += " "
+            pass
+        return sorted([pair[0] for pair in match_pairs]) + [None]
+
+    # We are past the command name. An exact name wins over longer ones
+    # that it is a prefix of.
+    if token in proc_obj.commands:
+        cmd_obj = proc_obj.commands[token]
+    elif token in proc_obj.aliases:
+        cmd_obj = proc_obj.commands.get(proc_obj.aliases[token])
+    elif len(match_pairs) == 1:
+        cmd_obj = match_pairs[0][1]
+    else:
+        # Matched multiple items in the middle of the string
+        # We can't handle this so do nothing.
+        return [None]
+    return next_complete(line, next_blank_pos, cmd_obj) + [None]
+
+
+def next_complete(line: str, next_blank_pos: int, cmd_obj) -> list:
+    """Complete what comes after position ``next_blank_pos`` in ``line``
+    for command or subcommand ``cmd_obj``."""
+    if cmd_obj is None:
+        return []
+    if hasattr(cmd_obj, "complete_line"):
+        # The rest of the line is something like a Mathics3 expression,
+        # rather than space-separated tokens.
+        return cmd_obj.complete_line(line[next_blank_pos:].lstrip())
+
+    next_blank_pos, token = next_token(line, next_blank_pos)
+    if hasattr(cmd_obj, "complete_token_with_next"):
+        match_pairs = cmd_obj.complete_token_with_next(token)
+        if len(match_pairs) == 0:
+            return []
+        if (
+            next_blank_pos == len(line)
+            and 1 == len(match_pairs)
+            and match_pairs[0][0] == token
+        ):
+            # Add space to advance completion on next tab-complete
+            match_pairs[0][0] += " "
+            pass
+        if next_blank_pos >= len(line):
+            return sorted([pair[0] for pair in match_pairs])
+        elif len(match_pairs) == 1:
+            return next_complete(line, next_blank_pos, match_pairs[0][1])
+        else:
+            return sorted([pair[0] for pair in match_pairs])
+    elif hasattr(cmd_obj, "complete"):
+        return list(cmd_obj.complete(token))
+    return []
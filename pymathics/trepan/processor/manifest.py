@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+#
+#   Copyright (C) 2024 Rocky Bernstein <rocky@gnu.org>
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""The debugger command manifest and lazily-loaded commands.
+
+Importing every command module, and every subcommand module under
+that, is a big part of what it costs to bring up the debugger the
+first time. Most of a session only uses a handful of commands, though.
+
+The manifest, processor/command/_manifest.py, records for each command
+module the things we need to know before a command is run: its class
+name, aliases, category and short help. The command processor starts
+out with a LazyCommand for each entry, and the module is imported the
+first time anything else about the command is needed.
+
+The manifest also records a digest of each command module's source.
+When a module was changed after the manifest was generated, the
+manifest is not used, and every command is imported as before.
+
+The manifest is generated. After adding, removing or changing the
+aliases, category or short help of a command, run::
+
+    python -m pymathics.trepan.processor.manifest
+
+or "make manifest" from the top of the source tree.
+"""
+
+import hashlib
+import importlib
+import inspect
+import os.path as osp
+import pprint
+import sys
+from typing import Dict, List, Optional, Tuple
+
+# Module name -> (class name, aliases, category, short help)
+ManifestEntry = Tuple[str, Tuple[str, ...], str, str]
+
+COMMAND_PACKAGE = "pymathics.trepan.processor.command"
+COMMAND_DIR = osp.join(osp.dirname(__file__), "command")
+MANIFEST_PATH = osp.join(COMMAND_DIR, "_manifest.py")
+
+MANIFEST_HEADER = '''\
+# -*- coding: utf-8 -*-
+# DO NOT EDIT. This file was generated by
+#   python -m pymathics.trepan.processor.manifest
+# See pymathics/trepan/processor/manifest.py.
+
+'''
+
+
+def find_command_classnames(command_mod) -> list:
+    """Return the names of the debugger command classes defined in
+    module ``command_mod``."""
+    return [
+        tup[0]
+        for tup in inspect.getmembers(command_mod, inspect.isclass)
+        if ("DebuggerCommand" != tup[0] and tup[0].endswith("Command"))
+    ]
+
+
+def module_digest(mod_name: str) -> Optional[str]:
+    """Return a digest of the source of command module ``mod_name``, or
+    None if it can't be read."""
+    try:
+        with open(osp.join(COMMAND_DIR, f"{mod_name}.py"), "rb") as f:
+            return hashlib.sha1(f.read()).hexdigest()[:16]
+    except OSError:
+        return None
+
+
+def read_manifest(modules) -> Optional[Dict[str, ManifestEntry]]:
+    """Return the command manifest if it exists and describes exactly
+    the command modules in ``modules``, as they are now. Otherwise
+    return None, and the caller should import the commands the slow
+    way."""
+    try:
+        from pymathics.trepan.processor.command._manifest import (
+            COMMANDS,
+            DIGESTS,
+            MODULES,
+        )
+    except ImportError:
+        return None
+    if set(MODULES) != set(modules):
+        return None
+    for mod_name, digest in DIGESTS.items():
+        if module_digest(mod_name) != digest:
+            return None
+    return COMMANDS
+
+
+def build_manifest() -> Tuple[List[str], Dict[str, ManifestEntry]]:
+    """Import every command module and collect what goes into the
+    manifest: the list of modules scanned and the commands found."""
+    from pymathics.trepan.processor import command as Mcommand
+
+    modules = sorted(Mcommand.__modules__)
+    commands = {}
+    for mod_name in modules:
+        command_mod = importlib.import_module(f"{COMMAND_PACKAGE}.{mod_name}")
+        # Skip command classes that the module imports from elsewhere.
+        classnames = [
+            classname
+            for classname in find_command_classnames(command_mod)
+            if getattr(command_mod, classname).__module__ == command_mod.__name__
+        ]
+        if len(classnames) == 0:
+            # For example, base_cmd.py.
+            continue
+        elif len(classnames) > 1:
+            # We only know how to describe one command per module.
+            # Leaving the module out makes the manifest stale, so that
+            # commands are loaded the slow way.
+            print(
+                f"Skipping {mod_name}: found {len(classnames)} command classes",
+                file=sys.stderr,
+            )
+            modules.remove(mod_name)
+            continue
+        classname = classnames[0]
+        command_class = getattr(command_mod, classname)
+        commands[mod_name] = (
+            classname,
+            tuple(command_class.aliases),
+            command_class.category,
+            command_class.short_help,
+        )
+    return modules, commands
+
+
+def write_manifest(path: str = MANIFEST_PATH) -> Dict[str, ManifestEntry]:
+    """Build the manifest and write it as a Python module to ``path``."""
+    modules, commands = build_manifest()
+    digests = {mod_name: module_digest(mod_name) for mod_name in modules}
+    with open(path, "w") as f:
+        f.write(MANIFEST_HEADER)
+        f.write("MODULES = ")
+        f.write(pprint.pformat(modules, width=88, compact=True))
+        f.write("\n\n")
+        f.write("DIGESTS = ")
+        f.write(pprint.pformat(digests, width=88))
+        f.write("\n\n")
+        f.write("COMMANDS = ")
+        f.write(pprint.pformat(commands, width=88))
+        f.write("\n")
+    return commands
+
+
+class LazyCommand:
+    """Stand-in for a debugger command whose module has not been imported
+    yet.
+
+    The attributes in the manifest are answered directly. Asking for
+    anything else, for example "run" or "min_args", loads the real
+    command, which from then on replaces us in the command processor.
+    """
+
+    def __init__(self, proc, mod_name: str, entry: ManifestEntry):
+        self.proc = proc
+        self.name = mod_name
+        self.classname, self.aliases, self.category, self.short_help = entry
+
+    def __getattr__(self, attr: str):
+        return getattr(self.proc.load_command(self.name), attr)
+
+    def __repr__(self) -> str:
+        return f"<LazyCommand {self.name}>"
+
+
+if __name__ == "__main__":
+    commands = write_manifest()
+    print(f"Wrote {len(commands)} commands to {MANIFEST_PATH}")
@@ -1,19 +1,32 @@
 import inspect
 import re
+import sys
+import threading
 import time
 from enum import Enum
-from typing import Callable
+from typing import Callable, Optional
 
+import mathics.eval.files_io.files as io_files
 import mathics.eval.tracing as eval_tracing
 from mathics.core.evaluation import Evaluation
 from mathics.core.rules import FunctionApplyRule
 from mathics.core.symbols import (
+    BaseElement,
     Symbol,
     SymbolConstant,
     strip_context,
 )
-from trepan.debugger import Trepan
-
+from pymathics.trepan.lib import (
+    collapse,
+    eval_functions,
+    numpy_calls,
+    parse_stats,
+    recorder,
+    scope,
+    shadow_stack,
+    treediff,
+)
+from pymathics.trepan.lib.governor import governor
 from pymathics.trepan.lib.format import format_element, pygments_format
 
 from typing import Dict, List
@@ -51,14 +64,137 @@ event_filters: Dict[str, List[str]] = {
     "evalMethod": [],
     "evalFunction": [],
     "mpmath": [],
+    "parse": [],
 }
 
+# Event counts, one list per kind of count, each indexed by TraceEvent
+# value; slot 0 is unused. The lists are allocated once, so that the
+# event hooks only add one to a list item. "info events" shows them.
+EVENT_COUNT_SIZE = len(TraceEvent) + 1
+events_seen: List[int] = [0] * EVENT_COUNT_SIZE
+events_filtered: List[int] = [0] * EVENT_COUNT_SIZE
+events_dispatched: List[int] = [0] * EVENT_COUNT_SIZE
+events_printed: List[int] = [0] * EVENT_COUNT_SIZE
+
+# When the counts were last reset, which is when events were last
+# activated.
+events_counted_since = time.perf_counter()
+
+# Event names used by the hooks, by Mathics3's TraceEvent and by
+# trace_dispatch(), mapped to TraceEvent values.
+EVENT_INDEX: Dict[str, int] = {
+    **{event.name: event.value for event in TraceEvent},
+    "debugger": TraceEvent.Debugger.value,
+    "evaluate": TraceEvent.evaluation.value,
+    "evaluate-entry": TraceEvent.evaluation.value,
+    "evaluate-result": TraceEvent.evaluation.value,
+}
+
+APPLY_EVENT = TraceEvent.apply.value
+APPLY_BOX_EVENT = TraceEvent.applyBox.value
+EVALUATION_EVENT = TraceEvent.evaluation.value
+EVAL_METHOD_EVENT = TraceEvent.evalMethod.value
+GET_EVENT = TraceEvent.Get.value
+EVAL_FUNCTION_EVENT = TraceEvent.evalFunction.value
+NUMPY_EVENT = TraceEvent.Numpy.value
+PARSE_EVENT = TraceEvent.parse.value
+
 
+def reset_event_counts():
+    """Set all event counts to zero, and start timing rates afresh."""
+    global events_counted_since
+    for counts in (events_seen, events_filtered, events_dispatched, events_printed):
+        counts[:] = [0] * EVENT_COUNT_SIZE
+    events_counted_since = time.perf_counter()
+
+
+# The DebugREPL object. It is created on first use by get_debugger(),
+# or ahead of time in a background thread by prewarm_debugger().
 dbg = None
+dbg_lock = threading.Lock()
+prewarm_thread: Optional[threading.Thread] = None
 
 saved_methods: Dict[str, Callable] = {}
 
 
+# Modules with the source lines that events usually stop at. When
+# prewarming, we have pyficache read and highlight these ahead of time.
+PREWARM_SOURCE_MODULES = (
+    "mathics.core.expression",
+    "mathics.core.rules",
+    "mathics.eval.tracing",
+)
+
+
+def build_debugger(prewarm: bool = False):
+    """Create the DebugREPL object, and set ``dbg`` to it once it is
+    fully built. If ``prewarm`` is True, we also import all of the
+    debugger commands and highlight the source text in
+    PREWARM_SOURCE_MODULES, rather than doing this on first use."""
+    global dbg
+    with dbg_lock:
+        if dbg is not None:
+            return
+        from pymathics.trepan.lib.repl import DebugREPL
+
+        debugger = DebugREPL()
+        if prewarm:
+            processor = debugger.core.processor
+            for cmd_name in list(processor.commands.keys()):
+                processor.load_command(cmd_name)
+
+            import pyficache
+
+            opts = {
+                "output": debugger.settings["highlight"],
+                "style": debugger.settings["style"],
+            }
+            for module_name in PREWARM_SOURCE_MODULES:
+                filename = getattr(sys.modules.get(module_name), "__file__", None)
+                if filename is not None:
+                    # Read the file the same way print_location() does.
+                    pyficache.update_cache(filename)
+                    pyficache.getlines(filename, opts)
+        dbg = debugger
+
+
+def get_debugger():
+    """Return the DebugREPL object, creating it if needed. If it is
+    being built in the background, we wait for that to finish."""
+    if dbg is None:
+        build_debugger()
+
+    # signal.signal() can only be called from the main thread, so when
+    # the debugger was built in the background, its signal manager is
+    # set up here.
+    if dbg.sigmgr is None and threading.current_thread() is threading.main_thread():
+        from pymathics.trepan.lib.sighandler import SignalManager
+
+        dbg.sigmgr = SignalManager(dbg)
+    return dbg
+
+
+def tracing_all_events() -> bool:
+    """Return True if the debugger exists and "set trace" is on, so
+    that it wants to see events even when they are filtered out."""
+    return dbg is not None and dbg.settings["trace"]
+
+
+def prewarm_debugger():
+    """Start building the DebugREPL object in a background thread, so
+    that the first event doesn't have to wait for it."""
+    global prewarm_thread
+    if dbg is not None or prewarm_thread is not None:
+        return
+    prewarm_thread = threading.Thread(
+        target=build_debugger,
+        args=(True,),
+        name="Mathics3 Debugger prewarm",
+        daemon=True,
+    )
+    prewarm_thread.start()
+
+
 def apply_builtin_fn_traced_common(
     self, expression, vars, options: dict, evaluation, trace_boxing: bool
 ):
@@ -66,7 +202,8 @@ def apply_builtin_fn_traced_common(
     Common routine to trace debugger on a Mathics apply function.
     """
     vars_noctx = dict(((strip_context(s), vars[s]) for s in vars))
-    if self.pass_expression:
+    # Newer Mathics3 FunctionApplyRules no longer have pass_expression.
+    if getattr(self, "pass_expression", False):
         vars_noctx["expression"] = expression
 
     if options and self.check_options:
@@ -81,13 +218,24 @@ def apply_builtin_fn_traced_common(
         args = (self, expression, vars, options, evaluation)
         skip_call = eval_tracing.hook_entry_fn(TraceEvent.apply, *args)
     else:
+        event_index = APPLY_BOX_EVENT if trace_boxing else APPLY_EVENT
+        events_seen[event_index] += 1
+        events_filtered[event_index] += 1
         skip_call = False
 
     if not skip_call:
-        if options:
-            return self.function(evaluation=evaluation, options=options, **vars_noctx)
-        else:
-            return self.function(evaluation=evaluation, **vars_noctx)
+        if shadow_stack.enabled:
+            shadow_stack.push(expression, evaluation.recursion_depth)
+        try:
+            if options:
+                return self.function(
+                    evaluation=evaluation, options=options, **vars_noctx
+                )
+            else:
+                return self.function(evaluation=evaluation, **vars_noctx)
+        finally:
+            if shadow_stack.enabled:
+                shadow_stack.pop(expression)
 
 
 def apply_builtin_box_fn_traced(
@@ -108,6 +256,15 @@ def apply_builtin_fn_traced(
     )
 
 
+def print_apply(expression):
+    """Show that ``expression`` is being applied."""
+    events_printed[APPLY_EVENT] += 1
+    dbg = get_debugger()
+    style = dbg.settings["style"]
+    mathics_str = format_element(expression)
+    dbg.core.processor.msg(f"apply: {pygments_format(mathics_str, style)}")
+
+
 def apply_builtin_fn_print(
     self, expression, vars, options: dict, evaluation: Evaluation
 ):
@@ -115,39 +272,47 @@ def apply_builtin_fn_print(
     Run debugger on a builtin function call.
     """
     vars_noctx = dict(((strip_context(s), vars[s]) for s in vars))
-    if self.pass_expression:
+    # Newer Mathics3 FunctionApplyRules no longer have pass_expression.
+    if getattr(self, "pass_expression", False):
         vars_noctx["expression"] = expression
 
     if options and self.check_options:
         if not self.check_options(options, evaluation):
             return None
 
-    global dbg
-    if dbg is None:
-        from pymathics.trepan.lib.repl import DebugREPL
-
-        dbg = DebugREPL()
-
-    style = dbg.settings["style"]
-    mathics_str = format_element(expression)
-    msg = dbg.core.processor.msg
-    msg(f"apply: {pygments_format(mathics_str, style)}")
-
-    if options:
-        return self.function(evaluation=evaluation, options=options, **vars_noctx)
-    else:
-        return self.function(evaluation=evaluation, **vars_noctx)
+    events_seen[APPLY_EVENT] += 1
+    if governor.budget is None:
+        print_apply(expression)
+    elif governor.admit("apply"):
+        token = governor.start()
+        print_apply(expression)
+        governor.charge(token)
+
+    if shadow_stack.enabled:
+        shadow_stack.push(expression, evaluation.recursion_depth)
+    try:
+        if options:
+            return self.function(evaluation=evaluation, options=options, **vars_noctx)
+        else:
+            return self.function(evaluation=evaluation, **vars_noctx)
+    finally:
+        if shadow_stack.enabled:
+            shadow_stack.pop(expression)
 
 
 def call_event_debug(event: TraceEvent, fn: Callable, *args) -> bool:
     """
     A somewhat generic function to show an event-traced call.
     """
-    global dbg
-    if dbg is None:
-        from pymathics.trepan.lib.repl import DebugREPL
+    event_index = EVENT_INDEX[event.name]
+    events_seen[event_index] += 1
+    token = None
+    if governor.budget is not None:
+        if not governor.admit(event.name):
+            return False
+        token = governor.start()
 
-        dbg = DebugREPL()
+    dbg = get_debugger()
 
     msg = dbg.core.processor.msg
 
@@ -156,12 +321,24 @@ def call_event_debug(event: TraceEvent, fn: Callable, *args) -> bool:
         style = dbg.settings["style"]
         mathics_str = format_element(args[0])
         msg(f"{event.name}: {pygments_format(mathics_str, style)}")
+    elif event == TraceEvent.evalFunction:
+        name = eval_functions.full_name(fn)
+        msg(f"{event.name} call  : {name}({format_eval_args(args)})")
+    elif event == TraceEvent.parse:
+        # args[0] is a parse_stats.ParseRecord.
+        record = args[0]
+        msg(f"{event.name}: {parse_stats.format_record(record)}: {record.text}")
+    elif event == TraceEvent.Numpy:
+        # fn is a numpy_calls.TracedFunction. Arrays can be big, so
+        # show only what they are like.
+        msg(f"{event.name} call  : {fn.name}{numpy_calls.format_args(args)}")
     else:
         if type(fn) is type or inspect.ismethod(fn) or inspect.isfunction(fn):
             name = f"{fn.__module__}.{fn.__qualname__}"
         else:
             name = str(fn)
         msg(f"{event.name} call  : {name}{args[:3]}")
+    events_printed[event_index] += 1
 
     # Note: there may be a temptation to go back a frame, i.e. use
     # `f_back` to `current_frame`. However, keeping the frame `call_event_debug`,
@@ -173,20 +350,207 @@ def call_event_debug(event: TraceEvent, fn: Callable, *args) -> bool:
     # Remove any "Tracing." from event string.
     event_str = str(event).split(".")[-1]
     dbg.core.execution_status = "Running"
-    dbg.core.trace_dispatch(current_frame, event_str, (fn, args))
+    try:
+        dbg.core.trace_dispatch(current_frame, event_str, (fn, args))
+    finally:
+        if token is not None:
+            governor.charge(token)
 
     return False
 
 
+# For each thread, whether each traced mpmath or SymPy call still
+# running was shown. return_event_print() shows the result of only
+# those that were.
+call_print_state = threading.local()
+
+
+def call_event_print(event, fn: Callable, *args) -> bool:
+    """
+    Count, then show, an event-traced call when tracing.
+    """
+    event_index = EVENT_INDEX[event.name]
+    events_seen[event_index] += 1
+    shown = getattr(call_print_state, "shown", None)
+    if shown is None:
+        shown = call_print_state.shown = []
+    if governor.budget is None:
+        shown.append(True)
+        events_printed[event_index] += 1
+        return eval_tracing.call_event_print(event, fn, *args)
+    if not governor.admit(event.name):
+        shown.append(False)
+        return False
+    shown.append(True)
+    events_printed[event_index] += 1
+    token = governor.start()
+    try:
+        return eval_tracing.call_event_print(event, fn, *args)
+    finally:
+        governor.charge(token)
+
+
+def return_event_print(event, result):
+    """
+    Show the result of an event-traced call when its call was shown.
+    """
+    shown = getattr(call_print_state, "shown", None)
+    if shown and not shown.pop():
+        return result
+    if governor.budget is None:
+        return eval_tracing.return_event_print(event, result)
+    token = governor.start()
+    try:
+        return eval_tracing.return_event_print(event, result)
+    finally:
+        governor.charge(token)
+
+
+def run_numpy_call(function, args: tuple, kwargs: dict, msg: Callable = print):
+    """
+    Run NumPy function ``function``, a numpy_calls.TracedFunction, and
+    show its result and how long it took using ``msg``.
+    """
+    start = time.perf_counter()
+    result = function.fn(*args, **kwargs)
+    seconds = time.perf_counter() - start
+    msg(f"Numpy result: {numpy_calls.format_result(result, seconds)}")
+    return result
+
+
+def trace_numpy_call(function, args: tuple, kwargs: dict):
+    """
+    Show a NumPy call and its result when tracing.
+    """
+    events_seen[NUMPY_EVENT] += 1
+    if governor.budget is None:
+        events_printed[NUMPY_EVENT] += 1
+        print(f"Numpy call  : {function.name}{numpy_calls.format_args(args, kwargs)}")
+        return run_numpy_call(function, args, kwargs)
+    if not governor.admit("Numpy"):
+        return function.fn(*args, **kwargs)
+    events_printed[NUMPY_EVENT] += 1
+    token = governor.start()
+    try:
+        print(f"Numpy call  : {function.name}{numpy_calls.format_args(args, kwargs)}")
+        return run_numpy_call(function, args, kwargs)
+    finally:
+        governor.charge(token)
+
+
+def debug_numpy_call(function, args: tuple, kwargs: dict):
+    """
+    Event dispatch wrapper function for NumPy calls. The result is
+    shown only for a call we stopped at.
+    """
+    core = get_debugger().core
+    stop_count = core.stop_count
+    call_event_debug(TraceEvent.Numpy, function, *args)
+    if core.stop_count == stop_count:
+        return function.fn(*args, **kwargs)
+    return run_numpy_call(function, args, kwargs, core.processor.msg)
+
+
+def format_eval_arg(arg) -> str:
+    """
+    Show an argument of an eval_Xxx() function call.
+    """
+    if isinstance(arg, Evaluation):
+        return "evaluation"
+    if isinstance(arg, BaseElement):
+        return format_element(arg)
+    if isinstance(arg, (list, tuple)):
+        formatted = ", ".join(format_eval_arg(element) for element in arg)
+        if isinstance(arg, list):
+            return f"[{formatted}]"
+        return f"({formatted},)" if len(arg) == 1 else f"({formatted})"
+    if callable(arg) and hasattr(arg, "__qualname__"):
+        # E.g. evaluation.message
+        return arg.__qualname__
+    return repr(arg)
+
+
+def format_eval_args(args: tuple) -> str:
+    """
+    Show the first few arguments of an eval_Xxx() function call.
+    """
+    parts = [format_eval_arg(arg) for arg in args[:3]]
+    if len(args) > 3:
+        parts.append("...")
+    return ", ".join(parts)
+
+
+def trace_eval_function(function, args: tuple):
+    """
+    Show a call to an eval_Xxx() function of mathics.eval when tracing.
+    """
+    events_seen[EVAL_FUNCTION_EVENT] += 1
+    token = None
+    if governor.budget is not None:
+        if not governor.admit("evalFunction"):
+            return
+        token = governor.start()
+    events_printed[EVAL_FUNCTION_EVENT] += 1
+    name = eval_functions.full_name(function)
+    print(f"evalFunction call  : {name}({format_eval_args(args)})")
+    if token is not None:
+        governor.charge(token)
+
+
+def debug_eval_function(function, args: tuple):
+    """
+    Event dispatch wrapper function for eval_Xxx() calls.
+    """
+    call_event_debug(TraceEvent.evalFunction, function, *args)
+
+
+def trace_parse(record, expr):
+    """
+    Show a parse's statistics when tracing.
+    """
+    events_seen[PARSE_EVENT] += 1
+    token = None
+    if governor.budget is not None:
+        if not governor.admit("parse"):
+            return
+        token = governor.start()
+    events_printed[PARSE_EVENT] += 1
+    print(f"parse: {parse_stats.format_record(record)}: {record.text}")
+    if token is not None:
+        governor.charge(token)
+
+
+def debug_parse(record, expr):
+    """
+    Event dispatch wrapper function for parses. We stop after the parse,
+    when its statistics are known.
+    """
+    call_event_debug(
+        TraceEvent.parse, parse_stats.untraced_parse_returning_code, record, expr
+    )
+
+
+def print_get_line(line_number: int, text: str):
+    """
+    Count, then show, a line read by Get (<<) when tracing.
+    """
+    events_seen[GET_EVENT] += 1
+    events_printed[GET_EVENT] += 1
+    io_files.print_line_number_and_text(line_number, text)
+
+
 def call_event_get(line_number: int, text: str) -> bool:
     """
     Event dispatch wrapper function for Get (<<).
     """
-    global dbg
-    if dbg is None:
-        from pymathics.trepan.lib.repl import DebugREPL
+    events_seen[GET_EVENT] += 1
+    token = None
+    if governor.budget is not None:
+        if not governor.admit("Get"):
+            return False
+        token = governor.start()
 
-        dbg = DebugREPL()
+    dbg = get_debugger()
 
     current_frame = inspect.currentframe()
     if current_frame is not None:
@@ -198,17 +562,63 @@ def call_event_get(line_number: int, text: str) -> bool:
         msg_fn(f"**Reading** **file**: {text}")
     else:
         msg_fn("%5d: %s" % (line_number, text.rstrip()))
+    events_printed[GET_EVENT] += 1
     f_locals = current_frame.f_locals
     if "path" in f_locals:
         file_path = f_locals["path"]
     else:
         f_locals = current_frame.f_back.f_locals
         file_path = f_locals["feeder"].filename
-    dbg.core.trace_dispatch(current_frame, "Get", (file_path, (line_number, text)))
+    try:
+        dbg.core.trace_dispatch(
+            current_frame, "Get", (file_path, (line_number, text))
+        )
+    finally:
+        if token is not None:
+            governor.charge(token)
 
     return False
 
 
+# Modules whose frames are skipped when stopping at a watchpoint.
+WATCH_SKIP_MODULES = ("mathics.core.definitions", "pymathics.trepan.lib.watch")
+
+# How value lists are named in messages.
+VALUES_NAMES = {"ownvalues": "OwnValues", "downvalues": "DownValues"}
+
+
+def call_event_watch(definition, values_name: str, stop: bool):
+    """
+    Show a change to list ``values_name``, "ownvalues" or "downvalues",
+    of the Definition of a watched Symbol. If ``stop`` is True, also
+    stop in the debugger.
+    """
+    dbg = get_debugger()
+    style = dbg.settings["style"]
+    rules = getattr(definition, values_name)
+    values_str = "{" + ", ".join(format_element(rule) for rule in rules) + "}"
+    dbg.core.processor.msg(
+        f"watch: {VALUES_NAMES[values_name]}[{definition.name}] = "
+        f"{pygments_format(values_str, style)}"
+    )
+    if not stop:
+        return
+
+    # Skip over the watchpoint code, and the Definitions code, to
+    # where the change was asked for.
+    current_frame = inspect.currentframe().f_back
+    while (
+        current_frame is not None
+        and current_frame.f_globals.get("__name__") in WATCH_SKIP_MODULES
+    ):
+        current_frame = current_frame.f_back
+
+    dbg.core.execution_status = "Running"
+    dbg.core.trace_dispatch(
+        current_frame, "watch", (definition.name, values_name, list(rules))
+    )
+
+
 # Should this be here?
 def call_trepan3k(proc_obj):
     """
@@ -216,6 +626,9 @@ def call_trepan3k(proc_obj):
     """
     core_obj = proc_obj.core
     if core_obj.python_debugger is None:
+        # trepan3k's own debugger pulls in a lot, and is rarely needed.
+        from trepan.debugger import Trepan
+
         debug_opts = {
             "settings": core_obj.debugger.settings,
             "interface": proc_obj.intf[-1],
@@ -230,16 +643,57 @@ def call_trepan3k(proc_obj):
     return
 
 
-def debug_evaluate(self, evaluation, status: str, orig_expr=None):
+def evaluation_is_filtered_out(event_str: str, expr) -> bool:
+    """Return True if the event filters for ``event_str``, which is
+    "evaluate-entry" or "evaluate-result", rule out stopping for the
+    evaluation of ``expr``."""
+    event_filter = event_filters.get(event_str)
+    if event_filter is None:
+        return False
+    if event_str == "evaluate-result":
+        # If any of the evaluation-result filters uses a short name, then we will take the
+        # short name of the original expression.
+        # TODO: Think about if we should allow short names in event filters or whether we should
+        # always fill those in based on $Context or $ContextPath.
+        use_short = all(name.find("`") == -1 for name in event_filter)
+        return expr.get_name(short=use_short) not in event_filter
+    return expr.get_name() not in event_filter
+
+
+def debug_evaluate(self, evaluation, status: str, fn: Callable, orig_expr=None):
     """
     Called from a decorated Python @trace_evaluate .evaluate()
     method when DebugActivate["evaluation" -> True]
     """
-    global dbg
-    if dbg is None:
-        from pymathics.trepan.lib.repl import DebugREPL
+    events_seen[EVALUATION_EVENT] += 1
+    if shadow_stack.enabled:
+        if status == "Evaluating":
+            shadow_stack.push(self, evaluation.recursion_depth)
+        else:
+            shadow_stack.pop(orig_expr)
+    if recorder.enabled:
+        recorder.record(status, self, evaluation.recursion_depth, orig_expr)
+
+    # Most evaluations are filtered out. Check that before anything
+    # else, so that we don't build the debugger, say, right after
+    # DebugActivate[] returns, and don't pay for dispatching.
+    if status == "Evaluating":
+        event_str = "evaluate-entry"
+        filtered_out = evaluation_is_filtered_out(event_str, self)
+    else:
+        event_str = "evaluate-result"
+        filtered_out = evaluation_is_filtered_out(event_str, orig_expr)
+    if filtered_out and not tracing_all_events():
+        events_filtered[EVALUATION_EVENT] += 1
+        return
+
+    token = None
+    if governor.budget is not None:
+        if not governor.admit(event_str):
+            return
+        token = governor.start()
 
-        dbg = DebugREPL()
+    dbg = get_debugger()
 
     current_frame = inspect.currentframe()
     if current_frame is not None:
@@ -248,30 +702,36 @@ def debug_evaluate(self, evaluation, status: str, orig_expr=None):
             current_frame = current_frame.f_back
 
     dbg.core.execution_status = "Running"
-    event_str = "evaluate-entry" if status == "Evaluating" else "evaluate-result"
-    dbg.core.trace_dispatch(
-        current_frame, event_str, (self, evaluation, status, orig_expr)
-    )
+    try:
+        dbg.core.trace_dispatch(
+            current_frame, event_str, (self, evaluation, status, orig_expr)
+        )
+    finally:
+        if token is not None:
+            governor.charge(token)
 
 
 def debug_eval_method(method_name: str, *args, **kwargs):
-    global dbg
-    if dbg is None:
-        from pymathics.trepan.lib.repl import DebugREPL
-
-        dbg = DebugREPL()
+    method = saved_methods.get(method_name)
+    events_seen[EVAL_METHOD_EVENT] += 1
+    if governor.budget is None or governor.admit("evalMethod"):
+        token = governor.start() if governor.budget is not None else None
+        dbg = get_debugger()
 
-    current_frame = inspect.currentframe()
-    if current_frame is not None:
-        current_frame = current_frame.f_back
+        current_frame = inspect.currentframe()
         if current_frame is not None:
             current_frame = current_frame.f_back
+            if current_frame is not None:
+                current_frame = current_frame.f_back
 
-    dbg.core.execution_status = "Running"
-    method = saved_methods.get(method_name)
-    dbg.core.trace_dispatch(
-        current_frame, "evalMethod", (method_name, method, *args, *kwargs)
-    )
+        dbg.core.execution_status = "Running"
+        try:
+            dbg.core.trace_dispatch(
+                current_frame, "evalMethod", (method_name, method, *args, *kwargs)
+            )
+        finally:
+            if token is not None:
+                governor.charge(token)
     if method is not None:
         return method(*args, **kwargs)
 
@@ -322,17 +782,100 @@ def trace_evaluate(expr, evaluation, status: str, fn: Callable, orig_expr=None):
     method when TraceActivate["evaluate" -> True]
     """
 
+    if shadow_stack.enabled:
+        if status == "Evaluating":
+            shadow_stack.push(expr, evaluation.recursion_depth)
+        else:
+            shadow_stack.pop(orig_expr)
+    if recorder.enabled:
+        recorder.record(status, expr, evaluation.recursion_depth, orig_expr)
+
+    events_seen[EVALUATION_EVENT] += 1
+    if scope.names is not None:
+        depth = evaluation.recursion_depth
+        scope_state = scope.state
+        if not (
+            scope_state.start_depth < depth <= scope_state.max_depth
+        ) and not scope.admit(expr, depth, status):
+            events_filtered[EVALUATION_EVENT] += 1
+            return
+    if governor.budget is None:
+        print_evaluation(expr, evaluation, status, fn, orig_expr)
+    elif governor.admit("evaluation"):
+        token = governor.start()
+        print_evaluation(expr, evaluation, status, fn, orig_expr)
+        governor.charge(token)
+
+
+def start_evaluation_line(key, indents: str, msg):
+    """
+    Count a line of evaluation tracing that is about to be shown, and
+    if it is the first after a run of repeats, show the run's length.
+    """
+    events_printed[EVALUATION_EVENT] += 1
+    if key is not None:
+        collapse.collapser.new_line(key, indents, msg, print_evaluation)
+
+
+def flush_trace_repeats():
+    """
+    Show the length of the run of repeated evaluation-trace lines, if
+    the last line shown was repeated.
+    """
+    if collapse.collapser.period:
+        collapse.collapser.flush(get_debugger().core.processor.msg, print_evaluation)
+
+
+def print_changes(
+    indents: str, status: str, orig_expr, expr, arrow: str, msg, style, key=None
+) -> bool:
+    """
+    Show an evaluation result as just the positions where ``expr``
+    differs from ``orig_expr``. Return False, having shown nothing,
+    if that wouldn't be shorter than showing both in full.
+    """
+    changes = treediff.diff(orig_expr, expr)
+    if changes is None:
+        return False
+    start_evaluation_line(key, indents, msg)
+    head = format_element(orig_expr.head)
+    msg(f"{indents}{status}: {pygments_format(head, style)}[...] changed at:")
+    for path, old, new in changes:
+        change_str = format_element(old) + arrow + format_element(new)
+        msg(
+            f"{indents}  {treediff.format_path(path)}: "
+            f"{pygments_format(change_str, style)}"
+        )
+    return True
+
+
+def print_evaluation(
+    expr, evaluation, status: str, fn: Callable, orig_expr=None, depth=None
+):
+    """
+    The printing part of trace_evaluate(). ``depth`` is the recursion
+    depth to show the line at, when that is not the current one.
+    """
     if evaluation.definitions.timing_trace_evaluation:
         evaluation.print_out(time.time() - evaluation.start_time)
 
-    global dbg
-    if dbg is None:
-        from pymathics.trepan.lib.repl import DebugREPL
-
-        dbg = DebugREPL()
+    dbg = get_debugger()
 
     msg = dbg.core.processor.msg
     style = dbg.settings["style"]
+    if depth is None:
+        depth = evaluation.recursion_depth
+    indents = "  " * depth
+
+    # Decide whether this line repeats lines shown just before it
+    # before formatting, or comparing, anything.
+    key = None
+    if collapse.enabled:
+        key = collapse.line_key(status, depth, expr, orig_expr)
+        if collapse.collapser.is_repeat(
+            key, (expr, evaluation, status, fn, orig_expr, depth)
+        ):
+            return
 
     # Test and dispose of various situations where showing information
     # is pretty useless: evaluating a Symbol is the Symbol.
@@ -355,10 +898,7 @@ def trace_evaluate(expr, evaluation, status: str, fn: Callable, orig_expr=None):
         # repeating the output.
         return
 
-    indents = "  " * evaluation.recursion_depth
-
     if orig_expr is not None:
-        formatted_orig_expr = format_element(orig_expr)
         if fn.__name__ == "rewrite_apply_eval_step":
             if orig_expr != expr[0]:
                 if status == "Returning":
@@ -369,7 +909,13 @@ def trace_evaluate(expr, evaluation, status: str, fn: Callable, orig_expr=None):
                         return
                 else:
                     arrow = " = "
+                if treediff.enabled and print_changes(
+                    indents, status, orig_expr, expr[0], arrow, msg, style, key
+                ):
+                    return
+                formatted_orig_expr = format_element(orig_expr)
                 formatted_expr = format_element(expr[0])
+                start_evaluation_line(key, indents, msg)
                 msg(
                     f"{indents}{status}: "
                     + pygments_format(
@@ -377,14 +923,21 @@ def trace_evaluate(expr, evaluation, status: str, fn: Callable, orig_expr=None):
                     )
                 )
         else:
+            if treediff.enabled and print_changes(
+                indents, status, orig_expr, expr, " = ", msg, style, key
+            ):
+                return
+            formatted_orig_expr = format_element(orig_expr)
             formatted_expr = format_element(expr)
             assign_str = f"{formatted_orig_expr} = {formatted_expr}"
+            start_evaluation_line(key, indents, msg)
             msg(
                 f"{indents}{status}: "
                 f"{pygments_format(assign_str, style)}"
             )
     elif not hasattr(fn, "__name__") or fn.__name__ != "rewrite_apply_eval_step":
         formatted_expr = format_element(expr)
+        start_evaluation_line(key, indents, msg)
         msg(f"{indents}{status}: {pygments_format(formatted_expr, style)}")
 
 